@@ -9,32 +9,45 @@ from .base_events import *
 from .coroutines import *
 from .events import *
 from .exceptions import *
+from .files import *
 from .futures import *
+from .instruments import *
 from .locks import *
+from .pools import *
 from .protocols import *
 from .runners import *
 from .queues import *
+from .resolvers import *
 from .streams import *
 from .subprocess import *
 from .tasks import *
+from .timers import *
 from .transports import *
 
 # Exposed for _asynciomodule.c to implement now deprecated
 # Task.all_tasks() method.  This function will be removed in 3.9.
 from .tasks import _all_tasks_compat  # NoQA
 
+# Not in __all__: 'from asyncio import *' would shadow the builtin map().
+from .tasks import map  # NoQA
+
 __all__ = (base_events.__all__ +
            coroutines.__all__ +
            events.__all__ +
            exceptions.__all__ +
+           files.__all__ +
            futures.__all__ +
+           instruments.__all__ +
            locks.__all__ +
+           pools.__all__ +
            protocols.__all__ +
            runners.__all__ +
            queues.__all__ +
+           resolvers.__all__ +
            streams.__all__ +
            subprocess.__all__ +
            tasks.__all__ +
+           timers.__all__ +
            transports.__all__)
 
 if sys.platform == 'win32':  # pragma: no cover
@@ -40,10 +40,13 @@ from . import coroutines
 from . import events
 from . import exceptions
 from . import futures
+from . import instruments
 from . import protocols
+from . import resolvers
 from . import sslproto
 from . import staggered
 from . import tasks
+from . import timers
 from . import transports
 from . import trsock
 from .log import logger
@@ -389,6 +392,7 @@ class BaseEventLoop(events.AbstractEventLoop):
         self._stopping = False
         self._ready = collections.deque()
         self._scheduled = []
+        self._timer_wheel = None
         self._default_executor = None
         self._internal_fds = 0
         # Identifier of the thread running the event loop, or None if the
@@ -402,6 +406,8 @@ class BaseEventLoop(events.AbstractEventLoop):
         self.slow_callback_duration = 0.1
         self._current_handle = None
         self._task_factory = None
+        self._resolver = None
+        self._instrument = None
         self._coroutine_origin_tracking_enabled = False
         self._coroutine_origin_tracking_saved_depth = None
 
@@ -457,6 +463,67 @@ class BaseEventLoop(events.AbstractEventLoop):
         """Return a task factory, or None if the default one is in use."""
         return self._task_factory
 
+    def set_resolver(self, resolver):
+        """Set the resolver used by loop.getaddrinfo().
+
+        If resolver is None, socket.getaddrinfo() is called in the default
+        executor, the default.
+        """
+        if resolver is not None and not isinstance(
+                resolver, resolvers.AbstractResolver):
+            raise TypeError('resolver must be an AbstractResolver or None')
+        self._resolver = resolver
+
+    def get_resolver(self):
+        """Return the resolver of the loop, or None if none is set."""
+        return self._resolver
+
+    def set_timer_wheel(self, wheel):
+        """Set a TimerWheel scheduling the timers of the loop.
+
+        If wheel is None, timers are scheduled with a heap, the default.
+        The timers already scheduled are moved to the new scheduler.  A
+        wheel can only be used by one loop.
+        """
+        if wheel is not None and not isinstance(wheel, timers.TimerWheel):
+            raise TypeError('timer wheel must be a TimerWheel or None')
+        if wheel is self._timer_wheel:
+            return
+        if wheel is not None:
+            wheel.start(self.time())
+        if self._timer_wheel is not None:
+            handles = self._timer_wheel.timers()
+            self._timer_wheel.clear()
+        else:
+            handles = []
+            for handle in self._scheduled:
+                handle._scheduled = False
+                if not handle._cancelled:
+                    handles.append(handle)
+            self._scheduled = []
+            self._timer_cancelled_count = 0
+        self._timer_wheel = wheel
+        for handle in handles:
+            self._schedule_timer(handle)
+
+    def get_timer_wheel(self):
+        """Return the TimerWheel of the loop, or None for the heap."""
+        return self._timer_wheel
+
+    def set_instrument(self, instrument):
+        """Set a LoopInstrument receiving the measurements of the loop.
+
+        If instrument is None, the loop is not instrumented, the default.
+        """
+        if instrument is not None and not isinstance(
+                instrument, instruments.LoopInstrument):
+            raise TypeError('instrument must be a LoopInstrument or None')
+        self._instrument = instrument
+
+    def get_instrument(self):
+        """Return the instrument of the loop, or None if none is set."""
+        return self._instrument
+
     def _make_socket_transport(self, sock, protocol, waiter=None, *,
                                extra=None, server=None):
         """Create socket transport."""
@@ -666,6 +733,8 @@ class BaseEventLoop(events.AbstractEventLoop):
         self._closed = True
         self._ready.clear()
         self._scheduled.clear()
+        if self._timer_wheel is not None:
+            self._timer_wheel.clear()
         self._executor_shutdown_called = True
         executor = self._default_executor
         if executor is not None:
@@ -729,10 +798,16 @@ class BaseEventLoop(events.AbstractEventLoop):
         timer = events.TimerHandle(when, callback, args, self, context)
         if timer._source_traceback:
             del timer._source_traceback[-1]
-        heapq.heappush(self._scheduled, timer)
-        timer._scheduled = True
+        self._schedule_timer(timer)
         return timer
 
+    def _schedule_timer(self, timer):
+        if self._timer_wheel is not None:
+            self._timer_wheel.add(timer)
+        else:
+            heapq.heappush(self._scheduled, timer)
+            timer._scheduled = True
+
     def call_soon(self, callback, *args, context=None):
         """Arrange for a callback to be called as soon as possible.
 
@@ -846,6 +921,11 @@ class BaseEventLoop(events.AbstractEventLoop):
 
     async def getaddrinfo(self, host, port, *,
                           family=0, type=0, proto=0, flags=0):
+        if self._resolver is not None:
+            return await self._resolver.getaddrinfo(
+                host, port, family=family, type=type, proto=proto,
+                flags=flags)
+
         if self._debug:
             getaddr_func = self._getaddrinfo_debug
         else:
@@ -1192,7 +1272,8 @@ class BaseEventLoop(events.AbstractEventLoop):
     async def start_tls(self, transport, protocol, sslcontext, *,
                         server_side=False,
                         server_hostname=None,
-                        ssl_handshake_timeout=None):
+                        ssl_handshake_timeout=None,
+                        ssl_session=None):
         """Upgrade transport to TLS.
 
         Return a new transport that *protocol* should start using
@@ -1210,12 +1291,16 @@ class BaseEventLoop(events.AbstractEventLoop):
             raise TypeError(
                 f'transport {transport!r} is not supported by start_tls()')
 
+        if ssl_session is not None and server_side:
+            raise ValueError('ssl_session is only meaningful on the client side')
+
         waiter = self.create_future()
         ssl_protocol = sslproto.SSLProtocol(
             self, protocol, sslcontext, waiter,
             server_side, server_hostname,
             ssl_handshake_timeout=ssl_handshake_timeout,
-            call_connection_made=False)
+            call_connection_made=False,
+            ssl_session=ssl_session)
 
         # Pause early so that "ssl_protocol.data_received()" doesn't
         # have a chance to get called before "ssl_protocol.connection_made()".
@@ -1808,7 +1893,10 @@ class BaseEventLoop(events.AbstractEventLoop):
     def _timer_handle_cancelled(self, handle):
         """Notification that a TimerHandle has been cancelled."""
         if handle._scheduled:
-            self._timer_cancelled_count += 1
+            if self._timer_wheel is not None:
+                self._timer_wheel.remove(handle)
+            else:
+                self._timer_cancelled_count += 1
 
     def _run_once(self):
         """Run one full iteration of the event loop.
@@ -1818,6 +1906,7 @@ class BaseEventLoop(events.AbstractEventLoop):
         'call_later' callbacks.
         """
 
+        wheel = self._timer_wheel
         sched_count = len(self._scheduled)
         if (sched_count > _MIN_SCHEDULED_TIMER_HANDLES and
             self._timer_cancelled_count / sched_count >
@@ -1848,12 +1937,31 @@ class BaseEventLoop(events.AbstractEventLoop):
             # Compute the desired timeout.
             when = self._scheduled[0]._when
             timeout = min(max(0, when - self.time()), MAXIMUM_SELECT_TIMEOUT)
-
+        elif wheel is not None:
+            when = wheel.next_deadline()
+            if when is not None:
+                timeout = min(max(0, when - self.time()),
+                              MAXIMUM_SELECT_TIMEOUT)
+
+        instrument = self._instrument
+        if instrument is not None:
+            select_start = self.time()
         event_list = self._selector.select(timeout)
         self._process_events(event_list)
 
         # Handle 'later' callbacks that are ready.
-        end_time = self.time() + self._clock_resolution
+        now = self.time()
+        end_time = now + self._clock_resolution
+        lag = 0.0
+        if wheel is not None:
+            nready = len(self._ready)
+            wheel.advance(end_time, self._ready)
+            if instrument is not None and len(self._ready) > nready:
+                # The wheel adds the timers in the order of their deadlines.
+                lag = max(0.0, now - self._ready[nready]._when)
+        elif (instrument is not None and self._scheduled and
+                self._scheduled[0]._when < end_time):
+            lag = max(0.0, now - self._scheduled[0]._when)
         while self._scheduled:
             handle = self._scheduled[0]
             if handle._when >= end_time:
@@ -1869,6 +1977,7 @@ class BaseEventLoop(events.AbstractEventLoop):
         # they will be run the next time (after another I/O poll).
         # Use an idiom that is thread-safe without using locks.
         ntodo = len(self._ready)
+        time_callbacks = instrument is not None and instrument.time_callbacks
         for i in range(ntodo):
             handle = self._ready.popleft()
             if handle._cancelled:
@@ -1882,12 +1991,26 @@ class BaseEventLoop(events.AbstractEventLoop):
                     if dt >= self.slow_callback_duration:
                         logger.warning('Executing %s took %.3f seconds',
                                        _format_handle(handle), dt)
+                    if time_callbacks:
+                        instrument.callback_done(handle, dt)
                 finally:
                     self._current_handle = None
+            elif time_callbacks:
+                t0 = self.time()
+                handle._run()
+                instrument.callback_done(handle, self.time() - t0)
             else:
                 handle._run()
         handle = None  # Needed to break cycles when an exception occurs.
 
+        if instrument is not None:
+            if wheel is None:
+                ntimers = len(self._scheduled) - self._timer_cancelled_count
+            else:
+                ntimers = len(wheel)
+            instrument.iteration_done(ntodo, ntimers, now - select_start,
+                                      self.time() - now, lag)
+
     def _set_coroutine_origin_tracking(self, enabled):
         if bool(enabled) == bool(self._coroutine_origin_tracking_enabled):
             return
@@ -372,7 +372,8 @@ class AbstractEventLoop:
     async def start_tls(self, transport, protocol, sslcontext, *,
                         server_side=False,
                         server_hostname=None,
-                        ssl_handshake_timeout=None):
+                        ssl_handshake_timeout=None,
+                        ssl_session=None):
         """Upgrade a transport to TLS.
 
         Return a new transport that *protocol* should start using
@@ -550,6 +551,30 @@ class AbstractEventLoop:
     def get_task_factory(self):
         raise NotImplementedError
 
+    # Name resolution.
+
+    def set_resolver(self, resolver):
+        raise NotImplementedError
+
+    def get_resolver(self):
+        raise NotImplementedError
+
+    # Timer scheduling.
+
+    def set_timer_wheel(self, wheel):
+        raise NotImplementedError
+
+    def get_timer_wheel(self):
+        raise NotImplementedError
+
+    # Instrumentation.
+
+    def set_instrument(self, instrument):
+        raise NotImplementedError
+
+    def get_instrument(self):
+        raise NotImplementedError
+
     # Error handlers.
 
     def get_exception_handler(self):
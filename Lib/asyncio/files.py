@@ -0,0 +1,352 @@
+"""Asynchronous file I/O on a thread pool."""
+
+__all__ = ('AsyncFile', 'open_file')
+
+import concurrent.futures
+import errno
+import functools
+import io
+import os
+import threading
+
+from . import events
+from . import tasks
+
+
+# Threads of the pool shared by the files opened by open_file(): blocking
+# file system calls do not benefit from more, and the pool must not grow
+# with the number of operations in flight.
+_MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+_READ_CHUNK_SIZE = 2 ** 16  # 64 KiB
+
+_HAVE_PREAD = hasattr(os, 'pread') and hasattr(os, 'preadv')
+_HAVE_PWRITE = hasattr(os, 'pwritev')
+
+try:
+    _IOV_MAX = os.sysconf('SC_IOV_MAX')
+except (AttributeError, ValueError, OSError):
+    _IOV_MAX = 16
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = concurrent.futures.ThreadPoolExecutor(
+                _MAX_WORKERS, thread_name_prefix='asyncio_file')
+        return _executor
+
+
+async def open_file(file, mode='rb', *, opener=None, executor=None):
+    """Open a file and return an AsyncFile object.
+
+    file, mode and opener have the same meaning as for the built-in open()
+    function; only binary modes are supported.  The blocking calls are
+    made in executor, by default a bounded thread pool shared by the files
+    opened by this function.
+    """
+    if 'b' not in mode:
+        raise ValueError(f"open_file() only supports binary modes, "
+                         f"not {mode!r}")
+    loop = events.get_running_loop()
+    if executor is None:
+        executor = _get_executor()
+    raw = await loop.run_in_executor(
+        executor, functools.partial(io.open, file, mode, buffering=0,
+                                    opener=opener))
+    try:
+        pos = raw.tell() if raw.seekable() else None
+    except BaseException:
+        raw.close()
+        raise
+    return AsyncFile(raw, pos, loop, executor)
+
+
+class AsyncFile:
+    """A binary file with coroutine methods, returned by open_file().
+
+    The file keeps its own position.  On platforms providing os.pread()
+    and os.pwritev(), reads and writes are made at an explicit offset, so
+    concurrent reads of one file proceed in parallel instead of being
+    serialized by seeks.  Writes are queued and those issued while another
+    batch is in progress are made together, with a single os.pwritev()
+    call when they are contiguous.
+    """
+
+    def __init__(self, raw, pos, loop, executor):
+        self._raw = raw
+        self._fd = raw.fileno()
+        self._pos = pos
+        self._append = 'a' in raw.mode
+        self._loop = loop
+        self._executor = executor
+        # Serializes the seek-based fallbacks of the worker threads.
+        self._lock = threading.Lock()
+        self._writes = []
+        self._write_batch = None
+        self._pending = set()
+        self._closing = False
+
+    def __repr__(self):
+        info = [self.__class__.__name__, f'name={self.name!r}',
+                f'mode={self.mode!r}']
+        if self.closed:
+            info.append('closed')
+        return '<{}>'.format(' '.join(info))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    @property
+    def name(self):
+        return self._raw.name
+
+    @property
+    def mode(self):
+        return self._raw.mode
+
+    @property
+    def closed(self):
+        return self._closing
+
+    def fileno(self):
+        return self._fd
+
+    def seekable(self):
+        return self._pos is not None
+
+    def tell(self):
+        """Return the current position of the file."""
+        self._check_closed()
+        self._check_seekable()
+        return self._pos
+
+    async def seek(self, offset, whence=os.SEEK_SET):
+        """Change the position of the file and return the new position.
+
+        Queued writes are made first.
+        """
+        self._check_closed()
+        self._check_seekable()
+        await self._drain_writes()
+        if whence == os.SEEK_SET:
+            pos = offset
+        elif whence == os.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == os.SEEK_END:
+            st = await tasks.shield(self._run(os.fstat, self._fd))
+            pos = st.st_size + offset
+        else:
+            raise ValueError(f'invalid whence ({whence!r}, should be '
+                             f'{os.SEEK_SET}, {os.SEEK_CUR} or {os.SEEK_END})')
+        if pos < 0:
+            raise OSError(22, 'Invalid argument')
+        self._pos = pos
+        return pos
+
+    async def read(self, size=-1):
+        """Read up to size bytes, or until EOF if size is negative."""
+        self._check_closed()
+        await self._drain_writes()
+        offset = self._pos
+        if size is None or size < 0:
+            data = await tasks.shield(self._run(self._readall, offset))
+            if offset is not None:
+                self._pos = offset + len(data)
+            return data
+        if offset is not None:
+            # Reserve the range, so that a concurrent read starts after it.
+            self._pos += size
+        data = await tasks.shield(self._run(self._read, size, offset))
+        self._advanced(offset, size, len(data))
+        return data
+
+    async def readinto(self, b):
+        """Read up to len(b) bytes into b, and return the number read."""
+        self._check_closed()
+        await self._drain_writes()
+        b = memoryview(b).cast('B')
+        offset = self._pos
+        if offset is not None:
+            self._pos += len(b)
+        n = await tasks.shield(self._run(self._readinto, b, offset))
+        self._advanced(offset, len(b), n)
+        return n
+
+    async def write(self, b):
+        """Write the bytes-like object b and return its length.
+
+        The write is queued and made by the thread pool together with the
+        other writes queued in the meantime.  Cancelling write() does not
+        cancel the write: it is still made, at the position reserved for
+        it, and flush() waits for it.
+        """
+        self._check_closed()
+        b = memoryview(b).cast('B')
+        if not b:
+            return 0
+        offset = None if self._append else self._pos
+        if offset is not None:
+            self._pos += len(b)
+        waiter = self._loop.create_future()
+        self._writes.append((offset, b, waiter))
+        if self._write_batch is None:
+            self._start_writes()
+        # Like reads, a write cannot be taken back once the position moved
+        # past it: a later write may already be queued after it.
+        await tasks.shield(waiter)
+        return len(b)
+
+    async def flush(self):
+        """Wait until the queued writes are made."""
+        self._check_closed()
+        await self._drain_writes()
+
+    async def close(self):
+        """Close the file once the operations in progress are done.
+
+        Queued writes are made first.  Closing an already closed file has
+        no effect.
+        """
+        if self._closing:
+            return
+        self._closing = True
+        try:
+            await self._drain_writes()
+            if self._pending:
+                await tasks.wait(self._pending)
+        finally:
+            await self._loop.run_in_executor(self._executor, self._raw.close)
+
+    def _check_closed(self):
+        if self._closing:
+            raise ValueError('I/O operation on closed file.')
+
+    def _check_seekable(self):
+        if self._pos is None:
+            raise io.UnsupportedOperation('File or stream is not seekable.')
+
+    def _advanced(self, offset, size, n):
+        # A short read means EOF was reached: move back to it, together with
+        # the position reserved by any concurrent read started since.
+        if offset is not None and n < size and self._pos > offset + n:
+            self._pos = offset + n
+
+    def _run(self, func, *args):
+        # Callers shield the future: cancelling it would not stop the
+        # thread, and close() must wait for the thread to be done.
+        fut = self._loop.run_in_executor(self._executor, func, *args)
+        self._pending.add(fut)
+        fut.add_done_callback(self._pending.discard)
+        return fut
+
+    async def _drain_writes(self):
+        # The exceptions of the batches are raised by the write() calls.
+        while self._write_batch is not None:
+            await tasks.wait([self._write_batch])
+
+    def _start_writes(self):
+        batch, self._writes = self._writes, []
+        # Merge the contiguous writes so that each run is one system call.
+        runs = []
+        for offset, b, waiter in batch:
+            if (runs and offset is not None and runs[-1][0] is not None
+                    and runs[-1][0] + runs[-1][1] == offset):
+                runs[-1][1] += len(b)
+                runs[-1][2].append(b)
+            else:
+                runs.append([offset, len(b), [b]])
+        self._write_batch = self._run(self._write_runs, runs)
+        self._write_batch.add_done_callback(
+            functools.partial(self._writes_done, batch))
+
+    def _writes_done(self, batch, fut):
+        exc = None if fut.cancelled() else fut.exception()
+        if exc is None and self._append and self._pos is not None:
+            self._pos = fut.result()
+        for offset, b, waiter in batch:
+            if waiter.done():
+                continue
+            if fut.cancelled():
+                waiter.cancel()
+            elif exc is not None:
+                waiter.set_exception(exc)
+            else:
+                waiter.set_result(None)
+        if self._writes:
+            self._start_writes()
+        else:
+            self._write_batch = None
+
+    # The methods below run in the thread pool.
+
+    def _read(self, size, offset):
+        if offset is not None and _HAVE_PREAD:
+            return os.pread(self._fd, size, offset)
+        with self._lock:
+            if offset is not None:
+                self._raw.seek(offset)
+            return self._raw.read(size) or b''
+
+    def _readinto(self, b, offset):
+        if offset is not None and _HAVE_PREAD:
+            return os.preadv(self._fd, [b], offset)
+        with self._lock:
+            if offset is not None:
+                self._raw.seek(offset)
+            return self._raw.readinto(b) or 0
+
+    def _readall(self, offset):
+        chunks = []
+        while True:
+            chunk = self._read(_READ_CHUNK_SIZE, offset)
+            if not chunk:
+                return b''.join(chunks)
+            chunks.append(chunk)
+            if offset is not None:
+                offset += len(chunk)
+
+    def _write_runs(self, runs):
+        for offset, size, buffers in runs:
+            if offset is not None and _HAVE_PWRITE:
+                _pwritev_all(self._fd, buffers, offset)
+                continue
+            with self._lock:
+                if offset is not None:
+                    self._raw.seek(offset)
+                for b in buffers:
+                    while b:
+                        n = self._raw.write(b)
+                        if not n:
+                            raise _no_write_error()
+                        b = b[n:]
+        if self._append and self._pos is not None:
+            return os.lseek(self._fd, 0, os.SEEK_CUR)
+
+
+def _no_write_error():
+    # A write of no bytes would be retried forever.
+    return OSError(errno.EIO, 'write made no progress')
+
+
+def _pwritev_all(fd, buffers, offset):
+    i = 0
+    while i < len(buffers):
+        n = os.pwritev(fd, buffers[i:i + _IOV_MAX], offset)
+        if not n:
+            raise _no_write_error()
+        offset += n
+        while n:
+            if n >= len(buffers[i]):
+                n -= len(buffers[i])
+                i += 1
+            else:
+                buffers[i] = buffers[i][n:]
+                n = 0
@@ -0,0 +1,84 @@
+"""Instrumentation of event loops."""
+
+__all__ = ('LoopInstrument', 'LoopStats')
+
+import bisect
+
+
+class LoopInstrument:
+    """Receiver of the measurements of an event loop.
+
+    An instrument is set with loop.set_instrument().  The loop calls
+    iteration_done() at the end of each iteration, and callback_done()
+    after each callback if time_callbacks is true, which costs two clock
+    reads per callback.  Unlike the debug mode, this is cheap enough to
+    be left on in production, provided the methods are fast: they are
+    called from the loop.
+    """
+
+    time_callbacks = False
+
+    def iteration_done(self, callbacks, timers, select_time, run_time, lag):
+        """Called at the end of an iteration of the loop.
+
+        callbacks is the number of callbacks the iteration ran, and timers
+        the number of timers left scheduled.  select_time is the time spent
+        polling for I/O events, idle time included, and run_time the time
+        spent running the callbacks.  lag is how late the most overdue
+        timer of the iteration ran, in seconds, or 0.
+        """
+
+    def callback_done(self, handle, duration):
+        """Called after running handle, which took duration seconds."""
+
+
+class LoopStats(LoopInstrument):
+    """Instrument accumulating the measurements of a loop.
+
+    If time_callbacks is true, the durations of the callbacks are counted
+    in histogram: histogram[i] is the number of callbacks which took up to
+    buckets[i] seconds and more than buckets[i-1], the last item counting
+    the callbacks which took more than buckets[-1].
+    """
+
+    def __init__(self, *, time_callbacks=False,
+                 buckets=(0.0001, 0.001, 0.01, 0.1, 1.0)):
+        self.time_callbacks = time_callbacks
+        self.buckets = tuple(sorted(buckets))
+        self.reset()
+
+    def __repr__(self):
+        return (f'<{self.__class__.__name__} iterations={self.iterations} '
+                f'callbacks={self.callbacks} max_ready={self.max_ready} '
+                f'select_time={self.select_time:.3f} '
+                f'run_time={self.run_time:.3f} max_lag={self.max_lag:.3f}>')
+
+    def reset(self):
+        """Reset the measurements."""
+        self.iterations = 0
+        self.callbacks = 0
+        # The most callbacks run by an iteration.
+        self.max_ready = 0
+        # The number of timers at the end of the last iteration.
+        self.timers = 0
+        self.select_time = 0.0
+        self.run_time = 0.0
+        self.max_lag = 0.0
+        self.max_callback_time = 0.0
+        self.histogram = [0] * (len(self.buckets) + 1)
+
+    def iteration_done(self, callbacks, timers, select_time, run_time, lag):
+        self.iterations += 1
+        self.callbacks += callbacks
+        if callbacks > self.max_ready:
+            self.max_ready = callbacks
+        self.timers = timers
+        self.select_time += select_time
+        self.run_time += run_time
+        if lag > self.max_lag:
+            self.max_lag = lag
+
+    def callback_done(self, handle, duration):
+        self.histogram[bisect.bisect_left(self.buckets, duration)] += 1
+        if duration > self.max_callback_time:
+            self.max_callback_time = duration
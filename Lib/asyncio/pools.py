@@ -0,0 +1,282 @@
+"""Pool of stream connections to a server."""
+
+__all__ = ('ConnectionPool',)
+
+import collections
+
+try:
+    import ssl
+except ImportError:  # pragma: no cover
+    ssl = None
+
+from . import events
+from . import streams
+
+
+class ConnectionPool:
+    """Pool of connections to host and port, as opened by open_connection().
+
+    Connections released to the pool are kept open for idle_timeout seconds
+    (forever if None) to be handed to the next acquire() call, which saves
+    the connection and TLS handshakes.  At most max_size connections are
+    open at a time, acquire() waiting for one to be released beyond that.
+
+    An idle connection is checked before being reused: it is closed instead
+    if the server closed it or sent data.  TLS connections resume the TLS
+    session of the previous connection when the server allows it.
+
+    ssl is None (no TLS), True (TLS with a default context) or an
+    ssl.SSLContext.  The other keyword arguments are passed to
+    loop.create_connection().
+    """
+
+    def __init__(self, host, port, *, ssl=None, server_hostname=None,
+                 ssl_handshake_timeout=None, max_size=10, idle_timeout=60.0,
+                 limit=streams._DEFAULT_LIMIT, **kwds):
+        if max_size < 1:
+            raise ValueError('max_size must be at least 1')
+        if idle_timeout is not None and idle_timeout < 0:
+            raise ValueError('idle_timeout must be positive or zero')
+        if ssl is True:
+            ssl = _create_default_context()
+        elif not ssl:
+            ssl = None
+            if server_hostname is not None:
+                raise ValueError('server_hostname is only meaningful with ssl')
+            if ssl_handshake_timeout is not None:
+                raise ValueError(
+                    'ssl_handshake_timeout is only meaningful with ssl')
+        if ssl is not None and server_hostname is None:
+            server_hostname = host
+        self._host = host
+        self._port = port
+        self._ssl = ssl
+        self._server_hostname = server_hostname
+        self._ssl_handshake_timeout = ssl_handshake_timeout
+        self._ssl_session = None
+        self._max_size = max_size
+        self._idle_timeout = idle_timeout
+        self._limit = limit
+        self._kwds = kwds
+        self._loop = None
+        # Idle connections as [reader, writer, expiry handle] lists, the
+        # most recently released last.
+        self._idle = []
+        # {writer: reader} of the acquired connections.
+        self._in_use = {}
+        # Open connections, including the ones being opened.
+        self._size = 0
+        self._waiters = collections.deque()
+        self._closed = False
+
+    def __repr__(self):
+        info = [f'{self._host}:{self._port}']
+        if self._ssl is not None:
+            info.append('ssl')
+        if self._closed:
+            info.append('closed')
+        info.append(f'size={self._size}/{self._max_size}')
+        info.append(f'idle={len(self._idle)}')
+        return f'<{self.__class__.__name__} {" ".join(info)}>'
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    @property
+    def size(self):
+        """The number of open connections, idle or not."""
+        return self._size
+
+    @property
+    def idle(self):
+        """The number of idle connections."""
+        return len(self._idle)
+
+    @property
+    def max_size(self):
+        return self._max_size
+
+    def is_closed(self):
+        return self._closed
+
+    async def acquire(self):
+        """Return a (reader, writer) pair connected to the server.
+
+        An idle connection is reused if there is one, otherwise a new one
+        is opened, after waiting for a connection to be released if max_size
+        connections are open.  The connection must be given back with
+        release().
+        """
+        loop = events.get_running_loop()
+        if self._loop is None:
+            self._loop = loop
+        elif self._loop is not loop:
+            raise RuntimeError(f'{self!r} is bound to a different event loop')
+
+        while True:
+            if self._closed:
+                raise RuntimeError('the connection pool is closed')
+            while self._idle:
+                reader, writer, handle = self._idle.pop()
+                if handle is not None:
+                    handle.cancel()
+                if _is_healthy(reader, writer):
+                    self._in_use[writer] = reader
+                    return reader, writer
+                self._close_connection(writer)
+            if self._size < self._max_size:
+                break
+            waiter = loop.create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except BaseException:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+                if waiter.done() and not waiter.cancelled():
+                    # Woken up and cancelled: wake up another waiter.
+                    self._wakeup()
+                raise
+
+        self._size += 1
+        try:
+            reader, writer = await self._connect(loop)
+        except BaseException:
+            self._size -= 1
+            self._wakeup()
+            raise
+        self._update_ssl_session(writer)
+        self._in_use[writer] = reader
+        return reader, writer
+
+    def release(self, writer, *, discard=False):
+        """Give back a connection returned by acquire().
+
+        The connection is closed if discard is true, for example when a
+        request failed half way, or if it is not healthy; it is kept for
+        later acquire() calls otherwise.
+        """
+        try:
+            reader = self._in_use.pop(writer)
+        except KeyError:
+            raise ValueError(
+                f'{writer!r} was not acquired from this pool') from None
+        if discard or self._closed or not _is_healthy(reader, writer):
+            self._close_connection(writer)
+        else:
+            self._update_ssl_session(writer)
+            entry = [reader, writer, None]
+            if self._idle_timeout is not None:
+                entry[2] = self._loop.call_later(
+                    self._idle_timeout, self._expire, entry)
+            self._idle.append(entry)
+        self._wakeup()
+
+    def connection(self):
+        """Return an asynchronous context manager for a connection.
+
+        The context manager acquires a (reader, writer) pair and releases
+        it on exit, discarding it if the block raised an exception::
+
+            async with pool.connection() as (reader, writer):
+                ...
+        """
+        return _PooledConnection(self)
+
+    async def close(self):
+        """Close the idle connections, and the others when released.
+
+        Pending and later acquire() calls raise RuntimeError.
+        """
+        self._closed = True
+        writers = []
+        while self._idle:
+            reader, writer, handle = self._idle.pop()
+            if handle is not None:
+                handle.cancel()
+            self._close_connection(writer)
+            writers.append(writer)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+        for writer in writers:
+            try:
+                await writer.wait_closed()
+            except (OSError, RuntimeError):
+                pass
+
+    async def _connect(self, loop):
+        reader = streams.StreamReader(limit=self._limit, loop=loop)
+        protocol = streams.StreamReaderProtocol(reader, loop=loop)
+        transport, _ = await loop.create_connection(
+            lambda: protocol, self._host, self._port, **self._kwds)
+        if self._ssl is not None:
+            # TLS is started separately to resume the last TLS session.
+            try:
+                transport = await loop.start_tls(
+                    transport, protocol, self._ssl,
+                    server_hostname=self._server_hostname,
+                    ssl_handshake_timeout=self._ssl_handshake_timeout,
+                    ssl_session=self._ssl_session)
+            except BaseException:
+                transport.close()
+                raise
+            protocol._replace_transport(transport)
+        return reader, streams.StreamWriter(transport, protocol, reader, loop)
+
+    def _update_ssl_session(self, writer):
+        # With TLS 1.3 the session is only known once the server sent
+        # a ticket after the handshake, so it is checked at each release.
+        ssl_object = writer.get_extra_info('ssl_object')
+        if ssl_object is not None:
+            session = ssl_object.session
+            if session is not None:
+                self._ssl_session = session
+
+    def _close_connection(self, writer):
+        self._size -= 1
+        writer.close()
+
+    def _expire(self, entry):
+        self._idle.remove(entry)
+        self._close_connection(entry[1])
+
+    def _wakeup(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+
+class _PooledConnection:
+
+    def __init__(self, pool):
+        self._pool = pool
+        self._writer = None
+
+    async def __aenter__(self):
+        reader, self._writer = await self._pool.acquire()
+        return reader, self._writer
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._pool.release(self._writer, discard=exc_type is not None)
+
+
+def _is_healthy(reader, writer):
+    # The server closed the connection, or sent data nobody asked for, or
+    # a previous request left data unread: the connection can't be reused.
+    return (not writer.is_closing() and not reader._eof
+            and not reader._buffer and reader.exception() is None)
+
+
+def _create_default_context():
+    if ssl is None:
+        raise RuntimeError('Python ssl module is not available')
+    return ssl.create_default_context()
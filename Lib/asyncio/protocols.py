@@ -5,6 +5,8 @@ __all__ = (
     'SubprocessProtocol', 'BufferedProtocol',
 )
 
+import weakref
+
 
 class BaseProtocol:
     """Common base class for protocol interfaces.
@@ -218,3 +220,29 @@ def _feed_data_to_buffered_proto(proto, data):
             proto.buffer_updated(buf_len)
             data = data[buf_len:]
             data_len = len(data)
+
+
+# Receive buffers of the buffered protocols which only use them from
+# get_buffer() to buffer_updated(), such as StreamReaderProtocol and
+# SSLProtocol.  Rather than one buffer per connection, each event loop
+# keeps one spare buffer of each size, shared by its idle connections.
+_spare_buffers = weakref.WeakKeyDictionary()
+
+
+def _take_buffer(loop, size):
+    """Return a writable memoryview of size bytes for a read on loop."""
+    spare = _spare_buffers.get(loop)
+    if spare:
+        buf = spare.pop(size, None)
+        if buf is not None:
+            return buf
+    return memoryview(bytearray(size))
+
+
+def _release_buffer(loop, buf):
+    """Give back a buffer from _take_buffer() once the data received into
+    it is consumed."""
+    spare = _spare_buffers.get(loop)
+    if spare is None:
+        spare = _spare_buffers[loop] = {}
+    spare.setdefault(len(buf), buf)
@@ -62,13 +62,35 @@ class Queue:
 
     # End of the overridable methods.
 
-    def _wakeup_next(self, waiters):
-        # Wake up the next waiter (if any) that isn't cancelled.
-        while waiters:
+    def _wakeup_next(self, waiters, count=1):
+        # Wake up the next count waiters (if any) that aren't cancelled.
+        while waiters and count:
             waiter = waiters.popleft()
             if not waiter.done():
                 waiter.set_result(None)
-                break
+                count -= 1
+
+    async def _wait(self, waiters, blocked):
+        # Wait to be woken up by the other side of the queue, which
+        # blocked() tells whether it's still needed.
+        waiter = self._loop.create_future()
+        waiters.append(waiter)
+        try:
+            await waiter
+        except:
+            waiter.cancel()  # Just in case waiter is not done yet.
+            try:
+                # Clean waiters from canceled waiters.
+                waiters.remove(waiter)
+            except ValueError:
+                # The waiter could be removed from waiters by a previous
+                # put_nowait or get_nowait call.
+                pass
+            if not blocked() and not waiter.cancelled():
+                # We were woken up by put_nowait() or get_nowait(), but
+                # can't take the call.  Wake up the next in line.
+                self._wakeup_next(waiters)
+            raise
 
     def __repr__(self):
         return f'<{type(self).__name__} at {id(self):#x} {self._format()}>'
@@ -122,24 +144,7 @@ class Queue:
         slot is available before adding item.
         """
         while self.full():
-            putter = self._loop.create_future()
-            self._putters.append(putter)
-            try:
-                await putter
-            except:
-                putter.cancel()  # Just in case putter is not done yet.
-                try:
-                    # Clean self._putters from canceled putters.
-                    self._putters.remove(putter)
-                except ValueError:
-                    # The putter could be removed from self._putters by a
-                    # previous get_nowait call.
-                    pass
-                if not self.full() and not putter.cancelled():
-                    # We were woken up by get_nowait(), but can't take
-                    # the call.  Wake up the next in line.
-                    self._wakeup_next(self._putters)
-                raise
+            await self._wait(self._putters, self.full)
         return self.put_nowait(item)
 
     def put_nowait(self, item):
@@ -150,9 +155,38 @@ class Queue:
         if self.full():
             raise QueueFull
         self._put(item)
+        if not self._unfinished_tasks:
+            self._finished.clear()
         self._unfinished_tasks += 1
-        self._finished.clear()
-        self._wakeup_next(self._getters)
+        if self._getters:
+            self._wakeup_next(self._getters)
+
+    async def put_many(self, items):
+        """Put the items of an iterable into the queue.
+
+        The items are added in order, as many at a time as there are free
+        slots, waiting for free slots while the queue is full.  Each batch of
+        items added wakes up at most one waiting getter per item.
+
+        If the call is cancelled, the items added before stay in the queue.
+        """
+        items = list(items)
+        start = 0
+        while start < len(items):
+            while self.full():
+                await self._wait(self._putters, self.full)
+            if self._maxsize <= 0:
+                stop = len(items)
+            else:
+                stop = min(len(items), start + self._maxsize - self.qsize())
+            for i in range(start, stop):
+                self._put(items[i])
+            if not self._unfinished_tasks:
+                self._finished.clear()
+            self._unfinished_tasks += stop - start
+            if self._getters:
+                self._wakeup_next(self._getters, stop - start)
+            start = stop
 
     async def get(self):
         """Remove and return an item from the queue.
@@ -160,26 +194,29 @@ class Queue:
         If queue is empty, wait until an item is available.
         """
         while self.empty():
-            getter = self._loop.create_future()
-            self._getters.append(getter)
-            try:
-                await getter
-            except:
-                getter.cancel()  # Just in case getter is not done yet.
-                try:
-                    # Clean self._getters from canceled getters.
-                    self._getters.remove(getter)
-                except ValueError:
-                    # The getter could be removed from self._getters by a
-                    # previous put_nowait call.
-                    pass
-                if not self.empty() and not getter.cancelled():
-                    # We were woken up by put_nowait(), but can't take
-                    # the call.  Wake up the next in line.
-                    self._wakeup_next(self._getters)
-                raise
+            await self._wait(self._getters, self.empty)
         return self.get_nowait()
 
+    async def get_many(self, max_items=None):
+        """Remove and return a list of items from the queue.
+
+        If queue is empty, wait until an item is available, then return all
+        the items available, or the first max_items of them if max_items is
+        not None.  The putters waiting for the free slots are woken up at
+        once.
+        """
+        if max_items is not None and max_items < 1:
+            raise ValueError('max_items must be at least 1')
+        while self.empty():
+            await self._wait(self._getters, self.empty)
+        count = self.qsize()
+        if max_items is not None and max_items < count:
+            count = max_items
+        items = [self._get() for _ in range(count)]
+        if self._putters:
+            self._wakeup_next(self._putters, count)
+        return items
+
     def get_nowait(self):
         """Remove and return an item from the queue.
 
@@ -188,7 +225,8 @@ class Queue:
         if self.empty():
             raise QueueEmpty
         item = self._get()
-        self._wakeup_next(self._putters)
+        if self._putters:
+            self._wakeup_next(self._putters)
         return item
 
     def task_done(self):
@@ -0,0 +1,116 @@
+"""Pluggable name resolvers for event loops."""
+
+__all__ = ('AbstractResolver', 'ThreadedResolver', 'CachingResolver')
+
+import collections
+import socket
+import time
+
+from . import events
+from . import tasks
+
+
+class AbstractResolver:
+    """Abstract name resolver, set on a loop with loop.set_resolver().
+
+    loop.getaddrinfo(), and through it the methods connecting sockets and
+    creating servers, use the resolver of the loop.
+    """
+
+    async def getaddrinfo(self, host, port, *,
+                          family=0, type=0, proto=0, flags=0):
+        """Resolve host and port like socket.getaddrinfo()."""
+        raise NotImplementedError
+
+
+class ThreadedResolver(AbstractResolver):
+    """Resolver calling socket.getaddrinfo() in the default executor.
+
+    This is what event loops do without a resolver.
+    """
+
+    async def getaddrinfo(self, host, port, *,
+                          family=0, type=0, proto=0, flags=0):
+        loop = events.get_running_loop()
+        return await loop.run_in_executor(
+            None, socket.getaddrinfo, host, port, family, type, proto, flags)
+
+
+class CachingResolver(AbstractResolver):
+    """Resolver caching the results of another resolver.
+
+    Results are kept for ttl seconds, and at most maxsize of them are kept,
+    the least recently used being dropped first.  Concurrent lookups of the
+    same name share a single call to the resolver.  Errors are not cached.
+    """
+
+    def __init__(self, resolver=None, *, ttl=30.0, maxsize=1024):
+        if ttl < 0:
+            raise ValueError('ttl must be positive or zero')
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1')
+        if resolver is None:
+            resolver = ThreadedResolver()
+        self._resolver = resolver
+        self._ttl = ttl
+        self._maxsize = maxsize
+        # {key: (expiry, infos)}, the least recently used first.
+        self._cache = collections.OrderedDict()
+        # {key: (loop, task)} of the lookups in progress.
+        self._lookups = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return (f'<{self.__class__.__name__} ttl={self._ttl} '
+                f'maxsize={self._maxsize} entries={len(self._cache)} '
+                f'hits={self.hits} misses={self.misses}>')
+
+    @property
+    def resolver(self):
+        return self._resolver
+
+    def clear(self):
+        """Remove all the cached results."""
+        self._cache.clear()
+
+    async def getaddrinfo(self, host, port, *,
+                          family=0, type=0, proto=0, flags=0):
+        key = (host, port, family, type, proto, flags)
+        entry = self._cache.get(key)
+        if entry is not None:
+            expiry, infos = entry
+            if time.monotonic() < expiry:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return list(infos)
+            del self._cache[key]
+        self.misses += 1
+
+        loop = events.get_running_loop()
+        lookup = self._lookups.get(key)
+        if lookup is None or lookup[0] is not loop:
+            task = loop.create_task(self._lookup(key))
+            # An eager task factory may have run the lookup already.
+            if not task.done():
+                self._lookups[key] = (loop, task)
+        else:
+            task = lookup[1]
+        # The lookup goes on for the other callers if this one is cancelled.
+        return list(await tasks.shield(task))
+
+    async def _lookup(self, key):
+        host, port, family, type, proto, flags = key
+        try:
+            infos = await self._resolver.getaddrinfo(
+                host, port, family=family, type=type, proto=proto,
+                flags=flags)
+        finally:
+            lookup = self._lookups.get(key)
+            if lookup is not None and lookup[1] is tasks.current_task():
+                del self._lookups[key]
+        if self._ttl:
+            self._cache[key] = (time.monotonic() + self._ttl, infos)
+            if len(self._cache) > self._maxsize:
+                self._cache.popitem(last=False)
+        return infos
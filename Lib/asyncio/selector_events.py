@@ -9,6 +9,8 @@ __all__ = 'BaseSelectorEventLoop',
 import collections
 import errno
 import functools
+import itertools
+import os
 import selectors
 import socket
 import warnings
@@ -29,6 +31,17 @@ from . import trsock
 from .log import logger
 
 
+_HAVE_SENDMSG = hasattr(socket.socket, 'sendmsg')
+if _HAVE_SENDMSG:
+    try:
+        _IOV_MAX = os.sysconf('SC_IOV_MAX')
+    except (AttributeError, ValueError, OSError):
+        _HAVE_SENDMSG = False
+    else:
+        if _IOV_MAX < 2:
+            _HAVE_SENDMSG = False
+
+
 def _test_selector_event(selector, fd, event):
     # Test if the selector is monitoring 'event' events
     # for the file descriptor 'fd'.
@@ -749,6 +762,13 @@ class _SelectorSocketTransport(_SelectorTransport):
     _start_tls_compatible = True
     _sendfile_compatible = constants._SendfileMode.TRY_NATIVE
 
+    # The write buffer is a deque of chunks which are flushed with a single
+    # sendmsg() call.  Large chunks are queued without copying them; writes
+    # smaller than this are copied into a bytearray at the end of the deque
+    # so that many small writes don't turn into many small chunks.
+    _buffer_factory = collections.deque
+    _small_write_size = 16 * 1024
+
     def __init__(self, loop, sock, protocol, waiter=None,
                  extra=None, server=None):
 
@@ -757,6 +777,7 @@ class _SelectorSocketTransport(_SelectorTransport):
         self._eof = False
         self._paused = False
         self._empty_waiter = None
+        self._buffer_size = 0
 
         # Disable the Nagle algorithm -- small writes will be
         # sent without waiting for the TCP ACK.  This generally
@@ -914,23 +935,134 @@ class _SelectorSocketTransport(_SelectorTransport):
                 self._fatal_error(exc, 'Fatal write error on socket transport')
                 return
             else:
-                data = data[n:]
-                if not data:
+                if n == len(data) and not isinstance(data, memoryview):
                     return
+                if n:
+                    # Queue the rest without copying it.
+                    data = memoryview(data).cast('B')[n:]
+                    if not data:
+                        return
             # Not all was written; register write handler.
             self._loop._add_writer(self._sock_fd, self._write_ready)
 
         # Add it to the buffer.
-        self._buffer.extend(data)
+        self._buffer_append(data)
+        self._maybe_pause_protocol()
+
+    def writelines(self, list_of_data):
+        """Write a list (or any iterable) of data bytes to the transport.
+
+        Large chunks are not joined: they are queued individually and
+        sent with as few system calls as possible.
+        """
+        list_of_data = list(list_of_data)
+        if not list_of_data:
+            return
+        # Joining small chunks is cheaper than queuing them one at a time.
+        # Only the ends of the list are checked so that the test stays
+        # cheap; that is enough for uniform lists and for a small header
+        # followed by a large body.
+        small = self._small_write_size
+        if len(list_of_data[0]) < small and len(list_of_data[-1]) < small:
+            self.write(b''.join(list_of_data))
+            return
+
+        if self._eof:
+            raise RuntimeError('Cannot call writelines() after write_eof()')
+        if self._empty_waiter is not None:
+            raise RuntimeError('unable to writelines; sendfile is in progress')
+        for data in list_of_data:
+            if not isinstance(data, (bytes, bytearray, memoryview)):
+                raise TypeError(f'data argument must be a bytes-like object, '
+                                f'not {type(data).__name__!r}')
+
+        if self._conn_lost:
+            if any(list_of_data):
+                if (self._conn_lost >=
+                        constants.LOG_THRESHOLD_FOR_CONNLOST_WRITES):
+                    logger.warning('socket.send() raised exception.')
+                self._conn_lost += 1
+            return
+
+        was_empty = not self._buffer
+        for data in list_of_data:
+            if data:
+                self._buffer_append(data)
+        if not self._buffer:
+            return
+
+        if was_empty:
+            # Optimization: try to send now.
+            try:
+                self._buffer_send()
+            except (BlockingIOError, InterruptedError):
+                pass
+            except (SystemExit, KeyboardInterrupt):
+                raise
+            except BaseException as exc:
+                self._fatal_error(exc, 'Fatal write error on socket transport')
+                return
+            if not self._buffer:
+                return
+            # Not all was written; register write handler.
+            self._loop._add_writer(self._sock_fd, self._write_ready)
+
         self._maybe_pause_protocol()
 
+    def _buffer_append(self, data):
+        buffer = self._buffer
+        size = len(data) if not isinstance(data, memoryview) else data.nbytes
+        if size < self._small_write_size:
+            if buffer and type(buffer[-1]) is bytearray:
+                buffer[-1] += data
+            else:
+                buffer.append(bytearray(data))
+        elif type(data) is bytes:
+            buffer.append(data)
+        else:
+            data = memoryview(data).cast('B')
+            if not data.readonly:
+                # The caller may modify a mutable buffer after write()
+                # returns, so it has to be copied.
+                data = bytes(data)
+            buffer.append(data)
+        self._buffer_size += size
+
+    def _buffer_send(self):
+        """Send as much of the write buffer as one system call accepts."""
+        buffer = self._buffer
+        if len(buffer) > 1 and _HAVE_SENDMSG:
+            n = self._sock.sendmsg(itertools.islice(buffer, _IOV_MAX))
+        else:
+            n = self._sock.send(buffer[0])
+        self._buffer_size -= n
+        while n:
+            data = buffer[0]
+            size = len(data)
+            if size > n:
+                if type(data) is bytearray:
+                    del data[:n]
+                else:
+                    buffer[0] = memoryview(data)[n:]
+                break
+            buffer.popleft()
+            n -= size
+
+    def _force_close(self, exc):
+        super()._force_close(exc)
+        if not self._buffer:
+            self._buffer_size = 0
+
+    def get_write_buffer_size(self):
+        return self._buffer_size
+
     def _write_ready(self):
         assert self._buffer, 'Data should not be empty'
 
         if self._conn_lost:
             return
         try:
-            n = self._sock.send(self._buffer)
+            self._buffer_send()
         except (BlockingIOError, InterruptedError):
             pass
         except (SystemExit, KeyboardInterrupt):
@@ -938,12 +1070,11 @@ class _SelectorSocketTransport(_SelectorTransport):
         except BaseException as exc:
             self._loop._remove_writer(self._sock_fd)
             self._buffer.clear()
+            self._buffer_size = 0
             self._fatal_error(exc, 'Fatal write error on socket transport')
             if self._empty_waiter is not None:
                 self._empty_waiter.set_exception(exc)
         else:
-            if n:
-                del self._buffer[:n]
             self._maybe_resume_protocol()  # May append to buffer.
             if not self._buffer:
                 self._loop._remove_writer(self._sock_fd)
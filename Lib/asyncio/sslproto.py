@@ -32,6 +32,13 @@ _DO_HANDSHAKE = "DO_HANDSHAKE"
 _WRAPPED = "WRAPPED"
 _SHUTDOWN = "SHUTDOWN"
 
+# While the transport is buffering data, application writes smaller than
+# this are copied into a buffer shared with the other small writes of the
+# same event loop iteration, which are then encrypted in as few TLS records
+# as possible and sent with one transport write.  They are sent right away
+# once this much data is waiting.
+_WRITE_COALESCE_SIZE = 64 * 1024
+
 
 class _SSLPipe(object):
     """An SSL "Pipe".
@@ -53,7 +60,8 @@ class _SSLPipe(object):
 
     max_size = 256 * 1024   # Buffer size passed to read()
 
-    def __init__(self, context, server_side, server_hostname=None):
+    def __init__(self, context, server_side, server_hostname=None,
+                 session=None):
         """
         The *context* argument specifies the ssl.SSLContext to use.
 
@@ -63,10 +71,14 @@ class _SSLPipe(object):
         The optional *server_hostname* argument can be used to specify the
         hostname you are connecting to. You may only specify this parameter if
         the _ssl module supports Server Name Indication (SNI).
+
+        The optional *session* argument is an ssl.SSLSession of an earlier
+        connection, which a client side transport tries to resume.
         """
         self._context = context
         self._server_side = server_side
         self._server_hostname = server_hostname
+        self._session = session
         self._state = _UNWRAPPED
         self._incoming = ssl.MemoryBIO()
         self._outgoing = ssl.MemoryBIO()
@@ -117,7 +129,8 @@ class _SSLPipe(object):
         self._sslobj = self._context.wrap_bio(
             self._incoming, self._outgoing,
             server_side=self._server_side,
-            server_hostname=self._server_hostname)
+            server_hostname=self._server_hostname,
+            session=self._session)
         self._state = _DO_HANDSHAKE
         self._handshake_cb = callback
         ssldata, appdata = self.feed_ssldata(b'', only_handshake=True)
@@ -157,7 +170,7 @@ class _SSLPipe(object):
     def feed_ssldata(self, data, only_handshake=False):
         """Feed SSL record level data into the pipe.
 
-        The data must be a bytes instance. It is OK to send an empty bytes
+        The data must be a bytes-like object. It is OK to send an empty bytes
         instance. This can be used to get ssldata for a handshake initiated by
         this endpoint.
 
@@ -170,9 +183,10 @@ class _SSLPipe(object):
         be acknowledged by calling shutdown().
         """
         if self._state == _UNWRAPPED:
-            # If unwrapped, pass plaintext data straight through.
+            # If unwrapped, pass plaintext data straight through.  The
+            # data may be a view of a receive buffer which is reused.
             if data:
-                appdata = [data]
+                appdata = [bytes(data)]
             else:
                 appdata = []
             return ([], appdata)
@@ -195,12 +209,16 @@ class _SSLPipe(object):
                 # Handshake done: execute the wrapped block
 
             if self._state == _WRAPPED:
-                # Main state: read data from SSL until close_notify
-                while True:
+                # Main state: read data from SSL until close_notify.  Stop
+                # when there is nothing left to read rather than on the
+                # SSLWantReadError raised by one more read().
+                while self._incoming.pending or self._sslobj.pending():
                     chunk = self._sslobj.read(self.max_size)
                     appdata.append(chunk)
                     if not chunk:  # close_notify
                         break
+                else:
+                    self._need_ssldata = True
 
             elif self._state == _SHUTDOWN:
                 # Call shutdown() until it doesn't raise anymore.
@@ -229,6 +247,45 @@ class _SSLPipe(object):
             ssldata.append(self._outgoing.read())
         return (ssldata, appdata)
 
+    def write_ssldata(self, data):
+        """Feed SSL record level data into a wrapped pipe.
+
+        Unlike feed_ssldata(), the data is only buffered: the plaintext data
+        is then read with read_appdata_into().
+        """
+        assert self._state == _WRAPPED
+        self._incoming.write(data)
+
+    @property
+    def ssldata_pending(self):
+        """Whether record level data fed with write_ssldata() may still
+        hold plaintext data."""
+        return bool(self._incoming.pending or self._sslobj.pending())
+
+    def read_appdata_into(self, buffer):
+        """Decrypt plaintext data into *buffer*, in wrapped mode.
+
+        Return the number of bytes read, 0 on an SSL "close_notify" alert,
+        or None if more record level data is needed.  The alert must be
+        acknowledged by calling shutdown().  Record level data to send back,
+        for a renegotiation, can be read with read_ssldata().
+        """
+        self._need_ssldata = False
+        try:
+            return self._sslobj.read(len(buffer), buffer)
+        except ssl.SSLError as exc:
+            exc_errno = getattr(exc, 'errno', None)
+            if exc_errno not in (
+                    ssl.SSL_ERROR_WANT_READ, ssl.SSL_ERROR_WANT_WRITE,
+                    ssl.SSL_ERROR_SYSCALL):
+                raise
+            self._need_ssldata = (exc_errno == ssl.SSL_ERROR_WANT_READ)
+            return None
+
+    def read_ssldata(self):
+        """Return the record level data waiting to be sent, or b''."""
+        return self._outgoing.read()
+
     def feed_appdata(self, data, offset=0):
         """Feed plaintext data into the pipe.
 
@@ -253,13 +310,32 @@ class _SSLPipe(object):
                 ssldata = []
             return (ssldata, len(data))
 
-        ssldata = []
+        offset = self.write_appdata(data, offset)
+        # See if there's any record level data back for us.
+        if self._outgoing.pending:
+            ssldata = [self._outgoing.read()]
+        else:
+            ssldata = []
+        return (ssldata, offset)
+
+    def write_appdata(self, data, offset=0):
+        """Encrypt plaintext data into the pipe.
+
+        Like feed_appdata(), but the record level data is kept in the pipe
+        until read_ssldata() is called, so that the records of several
+        writes can be sent at once.  Return the offset.
+        """
+        assert 0 <= offset <= len(data)
         view = memoryview(data)
-        while True:
+        if self._state == _UNWRAPPED:
+            # pass through data in unwrapped mode
+            self._outgoing.write(view[offset:])
+            return len(view)
+
+        while offset < len(view):
             self._need_ssldata = False
             try:
-                if offset < len(view):
-                    offset += self._sslobj.write(view[offset:])
+                offset += self._sslobj.write(view[offset:])
             except ssl.SSLError as exc:
                 # It is not allowed to call write() after unwrap() until the
                 # close_notify is acknowledged. We return the condition to the
@@ -272,13 +348,8 @@ class _SSLPipe(object):
                                      ssl.SSL_ERROR_SYSCALL):
                     raise
                 self._need_ssldata = (exc_errno == ssl.SSL_ERROR_WANT_READ)
-
-            # See if there's any record level data back for us.
-            if self._outgoing.pending:
-                ssldata.append(self._outgoing.read())
-            if offset == len(view) or self._need_ssldata:
                 break
-        return (ssldata, offset)
+        return offset
 
 
 class _SSLProtocolTransport(transports._FlowControlMixin,
@@ -366,7 +437,8 @@ class _SSLProtocolTransport(transports._FlowControlMixin,
 
     def get_write_buffer_size(self):
         """Return the current size of the write buffer."""
-        return self._ssl_protocol._transport.get_write_buffer_size()
+        return (self._ssl_protocol._transport.get_write_buffer_size() +
+                self._ssl_protocol._write_buffer_size)
 
     @property
     def _protocol_paused(self):
@@ -401,17 +473,22 @@ class _SSLProtocolTransport(transports._FlowControlMixin,
         self._closed = True
 
 
-class SSLProtocol(protocols.Protocol):
+class SSLProtocol(protocols.BufferedProtocol):
     """SSL protocol.
 
     Implementation of SSL on top of a socket using incoming and outgoing
     buffers which are ssl.MemoryBIO objects.
+
+    Record level data is received into a buffer which the connections of
+    the event loop share between reads, and once the handshake is done,
+    plaintext data is decrypted straight into the buffer of the application
+    protocol if it is a buffered protocol.
     """
 
     def __init__(self, loop, app_protocol, sslcontext, waiter,
                  server_side=False, server_hostname=None,
                  call_connection_made=True,
-                 ssl_handshake_timeout=None):
+                 ssl_handshake_timeout=None, ssl_session=None):
         if ssl is None:
             raise RuntimeError('stdlib ssl module not available')
 
@@ -432,6 +509,7 @@ class SSLProtocol(protocols.Protocol):
         else:
             self._server_hostname = None
         self._sslcontext = sslcontext
+        self._ssl_session = ssl_session
         # SSL-specific extra info. More info are set when the handshake
         # completes.
         self._extra = dict(sslcontext=sslcontext)
@@ -439,6 +517,14 @@ class SSLProtocol(protocols.Protocol):
         # App data write buffering
         self._write_backlog = collections.deque()
         self._write_buffer_size = 0
+        # Last backlog entry receiving small writes, and the call sending
+        # it at the end of the event loop iteration.
+        self._write_coalesce = None
+        self._write_flush_handle = None
+
+        # Record level data receive buffer, taken from the spare buffer of
+        # the event loop for each read
+        self._ssl_buffer = None
 
         self._waiter = waiter
         self._loop = loop
@@ -477,7 +563,8 @@ class SSLProtocol(protocols.Protocol):
         self._transport = transport
         self._sslpipe = _SSLPipe(self._sslcontext,
                                  self._server_side,
-                                 self._server_hostname)
+                                 self._server_hostname,
+                                 self._ssl_session)
         self._start_handshake()
 
     def connection_lost(self, exc):
@@ -503,6 +590,11 @@ class SSLProtocol(protocols.Protocol):
         self._wakeup_waiter(exc)
         self._app_protocol = None
         self._sslpipe = None
+        # A transport may still hold the buffer: it is not given back.
+        self._ssl_buffer = None
+        if self._write_flush_handle is not None:
+            self._write_flush_handle.cancel()
+            self._write_flush_handle = None
 
     def pause_writing(self):
         """Called when the low-level transport's buffer goes over
@@ -516,17 +608,53 @@ class SSLProtocol(protocols.Protocol):
         """
         self._app_protocol.resume_writing()
 
+    def get_buffer(self, n):
+        """Return the buffer receiving SSL data."""
+        buf = self._ssl_buffer
+        if buf is None:
+            buf = self._ssl_buffer = protocols._take_buffer(
+                self._loop, _SSLPipe.max_size)
+        return buf
+
+    def buffer_updated(self, nbytes):
+        """Called when some SSL data is received into the buffer."""
+        buf = self._ssl_buffer
+        self._ssl_buffer = None
+        try:
+            self._feed_ssldata(buf[:nbytes])
+        finally:
+            # The data was copied to the incoming BIO, or to bytes objects.
+            protocols._release_buffer(self._loop, buf)
+
     def data_received(self, data):
         """Called when some SSL data is received.
 
         The argument is a bytes object.
         """
-        if self._sslpipe is None:
+        self._feed_ssldata(data)
+
+    def _feed_ssldata(self, data):
+        sslpipe = self._sslpipe
+        if sslpipe is None:
             # transport closing, sslpipe is destroyed
             return
 
+        if sslpipe.wrapped and self._app_protocol_is_buffer:
+            try:
+                sslpipe.write_ssldata(data)
+            except (SystemExit, KeyboardInterrupt):
+                raise
+            except BaseException as e:
+                self._fatal_error(e, 'SSL error in data received')
+                return
+            if self._read_appdata_buffered(sslpipe):
+                return
+            # The pipe is not wrapped anymore, or the application protocol
+            # was replaced: the data left is processed below.
+            data = b''
+
         try:
-            ssldata, appdata = self._sslpipe.feed_ssldata(data)
+            ssldata, appdata = sslpipe.feed_ssldata(data)
         except (SystemExit, KeyboardInterrupt):
             raise
         except BaseException as e:
@@ -554,6 +682,54 @@ class SSLProtocol(protocols.Protocol):
                 self._start_shutdown()
                 break
 
+    def _read_appdata_buffered(self, sslpipe):
+        # Decrypt the received records straight into the buffers of the
+        # application protocol.  Return False if the remaining data must
+        # be read with feed_ssldata().
+        while True:
+            if (self._sslpipe is not sslpipe or not sslpipe.wrapped or
+                    not self._app_protocol_is_buffer):
+                return self._sslpipe is None
+            if not sslpipe.ssldata_pending:
+                break
+            try:
+                buf = self._app_protocol.get_buffer(-1)
+                if not len(buf):
+                    raise RuntimeError('get_buffer() returned an empty buffer')
+            except (SystemExit, KeyboardInterrupt):
+                raise
+            except BaseException as ex:
+                self._fatal_error(
+                    ex, 'application protocol failed to receive SSL data')
+                return True
+
+            try:
+                nbytes = sslpipe.read_appdata_into(buf)
+            except (SystemExit, KeyboardInterrupt):
+                raise
+            except BaseException as e:
+                self._fatal_error(e, 'SSL error in data received')
+                return True
+            if nbytes is None:
+                break
+            if not nbytes:
+                self._start_shutdown()
+                return True
+            try:
+                self._app_protocol.buffer_updated(nbytes)
+            except (SystemExit, KeyboardInterrupt):
+                raise
+            except BaseException as ex:
+                self._fatal_error(
+                    ex, 'application protocol failed to receive SSL data')
+                return True
+
+        # Record level data to send back, for a renegotiation.
+        ssldata = sslpipe.read_ssldata()
+        if ssldata:
+            self._transport.write(ssldata)
+        return True
+
     def eof_received(self):
         """Called when the other end of the low-level stream
         is half-closed.
@@ -594,8 +770,26 @@ class SSLProtocol(protocols.Protocol):
             self._write_appdata(b'')
 
     def _write_appdata(self, data):
-        self._write_backlog.append((data, 0))
-        self._write_buffer_size += len(data)
+        size = len(data)
+        self._write_buffer_size += size
+        # An empty write is the shutdown request, which is never delayed.
+        if 0 < size < _WRITE_COALESCE_SIZE and (
+                self._write_coalesce is not None or
+                self._transport is not None and
+                self._transport.get_write_buffer_size()):
+            buf = self._write_coalesce
+            if buf is None:
+                buf = self._write_coalesce = bytearray()
+                self._write_backlog.append((buf, 0))
+            buf += data
+            if self._write_buffer_size < _WRITE_COALESCE_SIZE:
+                if self._write_flush_handle is None:
+                    self._write_flush_handle = self._loop.call_soon(
+                        self._process_write_backlog)
+                return
+        else:
+            self._write_coalesce = None
+            self._write_backlog.append((data, 0))
         self._process_write_backlog()
 
     def _start_handshake(self):
@@ -665,6 +859,11 @@ class SSLProtocol(protocols.Protocol):
 
     def _process_write_backlog(self):
         # Try to make progress on the write backlog.
+        if self._write_flush_handle is not None:
+            self._write_flush_handle.cancel()
+            self._write_flush_handle = None
+        # A buffer being written to the pipe must not change anymore.
+        self._write_coalesce = None
         if self._transport is None or self._sslpipe is None:
             return
 
@@ -672,17 +871,19 @@ class SSLProtocol(protocols.Protocol):
             for i in range(len(self._write_backlog)):
                 data, offset = self._write_backlog[0]
                 if data:
-                    ssldata, offset = self._sslpipe.feed_appdata(data, offset)
-                elif offset:
-                    ssldata = self._sslpipe.do_handshake(
-                        self._on_handshake_complete)
-                    offset = 1
+                    # The records are sent together after the loop.
+                    offset = self._sslpipe.write_appdata(data, offset)
                 else:
-                    ssldata = self._sslpipe.shutdown(self._finalize)
+                    # The handshake and shutdown records are sent right
+                    # away, with the records of the writes before them.
+                    if offset:
+                        ssldata = self._sslpipe.do_handshake(
+                            self._on_handshake_complete)
+                    else:
+                        ssldata = self._sslpipe.shutdown(self._finalize)
                     offset = 1
-
-                for chunk in ssldata:
-                    self._transport.write(chunk)
+                    for chunk in ssldata:
+                        self._transport.write(chunk)
 
                 if offset < len(data):
                     self._write_backlog[0] = (data, offset)
@@ -697,6 +898,11 @@ class SSLProtocol(protocols.Protocol):
                 # delete it and reduce the outstanding buffer size.
                 del self._write_backlog[0]
                 self._write_buffer_size -= len(data)
+
+            if self._sslpipe is not None:
+                ssldata = self._sslpipe.read_ssldata()
+                if ssldata:
+                    self._transport.write(ssldata)
         except (SystemExit, KeyboardInterrupt):
             raise
         except BaseException as exc:
@@ -20,6 +20,7 @@ from .tasks import sleep
 
 
 _DEFAULT_LIMIT = 2 ** 16  # 64 KiB
+_RECV_BUFFER_SIZE = 2 ** 16  # 64 KiB
 
 
 async def open_connection(host=None, port=None, *,
@@ -200,13 +201,20 @@ class FlowControlMixin(protocols.Protocol):
         raise NotImplementedError
 
 
-class StreamReaderProtocol(FlowControlMixin, protocols.Protocol):
+class StreamReaderProtocol(FlowControlMixin, protocols.BufferedProtocol):
     """Helper class to adapt between Protocol and StreamReader.
 
     (This is a helper class instead of making StreamReader itself a
     Protocol subclass, because the StreamReader has other potential
     uses, and to prevent the user of the StreamReader to accidentally
     call inappropriate methods of the protocol.)
+
+    Transports that support buffered protocols receive into a buffer
+    which the connections of the event loop share between reads, which
+    is then appended to the reader's buffer without creating an
+    intermediate bytes object.  Other transports (such as pipes) still go
+    through data_received(), and readers overriding feed_data() still
+    receive bytes.
     """
 
     _source_traceback = None
@@ -229,6 +237,12 @@ class StreamReaderProtocol(FlowControlMixin, protocols.Protocol):
         self._client_connected_cb = client_connected_cb
         self._over_ssl = False
         self._closed = self._loop.create_future()
+        # Receive buffer, taken from the spare buffer of the event loop for
+        # each read
+        self._recv_view = None
+        # Subclasses that override data_received() keep receiving bytes.
+        self._feed_bytes = (type(self).data_received is not
+                            StreamReaderProtocol.data_received)
 
     @property
     def _stream_reader(self):
@@ -263,6 +277,11 @@ class StreamReaderProtocol(FlowControlMixin, protocols.Protocol):
                 self._loop.create_task(res)
             self._strong_reader = None
 
+    def _replace_transport(self, transport):
+        # The connection was upgraded to TLS by loop.start_tls().
+        self._transport = transport
+        self._over_ssl = transport.get_extra_info('sslcontext') is not None
+
     def connection_lost(self, exc):
         reader = self._stream_reader
         if reader is not None:
@@ -279,12 +298,39 @@ class StreamReaderProtocol(FlowControlMixin, protocols.Protocol):
         self._stream_reader_wr = None
         self._stream_writer = None
         self._transport = None
+        # A transport may still hold the buffer: it is not given back.
+        self._recv_view = None
 
     def data_received(self, data):
         reader = self._stream_reader
         if reader is not None:
             reader.feed_data(data)
 
+    def get_buffer(self, sizehint):
+        view = self._recv_view
+        if view is None:
+            view = self._recv_view = protocols._take_buffer(
+                self._loop, _RECV_BUFFER_SIZE)
+        return view
+
+    def buffer_updated(self, nbytes):
+        view = self._recv_view
+        self._recv_view = None
+        try:
+            if self._feed_bytes:
+                self.data_received(bytes(view[:nbytes]))
+                return
+            reader = self._stream_reader
+            if reader is None:
+                return
+            if type(reader).feed_data is StreamReader.feed_data:
+                # The data is copied to the reader's buffer.
+                reader.feed_data(view[:nbytes])
+            else:
+                reader.feed_data(bytes(view[:nbytes]))
+        finally:
+            protocols._release_buffer(self._loop, view)
+
     def eof_received(self):
         reader = self._stream_reader
         if reader is not None:
@@ -635,10 +681,9 @@ class StreamReader:
             raise exceptions.LimitOverrunError(
                 'Separator is found, but chunk is longer than limit', isep)
 
-        chunk = self._buffer[:isep + seplen]
-        del self._buffer[:isep + seplen]
+        chunk = self._take(isep + seplen)
         self._maybe_resume_transport()
-        return bytes(chunk)
+        return chunk
 
     async def read(self, n=-1):
         """Read up to `n` bytes from the stream.
@@ -684,11 +729,41 @@ class StreamReader:
             await self._wait_for_data('read')
 
         # This will work right even if buffer is less than n bytes
-        data = bytes(self._buffer[:n])
+        data = self._take(n)
+        self._maybe_resume_transport()
+        return data
+
+    async def readinto(self, buf):
+        """Read up to len(buf) bytes from the stream into buf.
+
+        buf must be a writable bytes-like object.  Return the number of
+        bytes read, which is at least one unless buf is empty or EOF was
+        received before any byte is read, in which case 0 is returned.
+
+        The data is copied straight from the internal buffer, so large
+        payloads can be read into a preallocated buffer without creating
+        intermediate bytes objects.
+
+        If stream was paused, this function will automatically resume it if
+        needed.
+        """
+        if self._exception is not None:
+            raise self._exception
+
+        with memoryview(buf) as mv, mv.cast('B') as view:
+            if not view:
+                return 0
+
+            if not self._buffer and not self._eof:
+                await self._wait_for_data('readinto')
+
+            n = min(len(view), len(self._buffer))
+            with memoryview(self._buffer) as data:
+                view[:n] = data[:n]
         del self._buffer[:n]
 
         self._maybe_resume_transport()
-        return data
+        return n
 
     async def readexactly(self, n):
         """Read exactly `n` bytes.
@@ -722,13 +797,20 @@ class StreamReader:
 
             await self._wait_for_data('readexactly')
 
-        if len(self._buffer) == n:
+        data = self._take(n)
+        self._maybe_resume_transport()
+        return data
+
+    def _take(self, n):
+        """Remove and return the first n bytes of the buffer."""
+        if len(self._buffer) <= n:
             data = bytes(self._buffer)
             self._buffer.clear()
-        else:
-            data = bytes(self._buffer[:n])
-            del self._buffer[:n]
-        self._maybe_resume_transport()
+            return data
+        # Slicing a bytearray makes a copy, slicing a memoryview does not.
+        with memoryview(self._buffer) as view:
+            data = bytes(view[:n])
+        del self._buffer[:n]
         return data
 
     def __aiter__(self):
@@ -1,7 +1,7 @@
 """Support for tasks, coroutines and the scheduler."""
 
 __all__ = (
-    'Task', 'create_task',
+    'Task', 'create_task', 'create_eager_task_factory', 'eager_task_factory',
     'FIRST_COMPLETED', 'FIRST_EXCEPTION', 'ALL_COMPLETED',
     'wait', 'wait_for', 'as_completed', 'sleep',
     'gather', 'shield', 'ensure_future', 'run_coroutine_threadsafe',
@@ -9,6 +9,7 @@ __all__ = (
     '_register_task', '_unregister_task', '_enter_task', '_leave_task',
 )
 
+import collections
 import concurrent.futures
 import contextvars
 import functools
@@ -141,7 +142,7 @@ class Task(futures._PyFuture):  # Inherit Python Task implementation
                       stacklevel=2)
         return _all_tasks_compat(loop)
 
-    def __init__(self, coro, *, loop=None, name=None):
+    def __init__(self, coro, *, loop=None, name=None, eager_start=False):
         super().__init__(loop=loop)
         if self._source_traceback:
             del self._source_traceback[-1]
@@ -161,8 +162,11 @@ class Task(futures._PyFuture):  # Inherit Python Task implementation
         self._coro = coro
         self._context = contextvars.copy_context()
 
-        self._loop.call_soon(self.__step, context=self._context)
         _register_task(self)
+        if eager_start and self._loop.is_running():
+            self.__eager_start()
+        else:
+            self._loop.call_soon(self.__step, context=self._context)
 
     def __del__(self):
         if self._state == futures._PENDING and self._log_destroy_pending:
@@ -263,6 +267,15 @@ class Task(futures._PyFuture):  # Inherit Python Task implementation
         self._must_cancel = True
         return True
 
+    def __eager_start(self):
+        # Run the first step now, in the task's context, the creator of the
+        # task being suspended as current task meanwhile.
+        prev_task = _swap_current_task(self._loop, self)
+        try:
+            self._context.run(self.__step_run_and_handle_result, None)
+        finally:
+            _swap_current_task(self._loop, prev_task)
+
     def __step(self, exc=None):
         if self.done():
             raise exceptions.InvalidStateError(
@@ -271,10 +284,17 @@ class Task(futures._PyFuture):  # Inherit Python Task implementation
             if not isinstance(exc, exceptions.CancelledError):
                 exc = exceptions.CancelledError()
             self._must_cancel = False
-        coro = self._coro
         self._fut_waiter = None
 
         _enter_task(self._loop, self)
+        try:
+            self.__step_run_and_handle_result(exc)
+        finally:
+            _leave_task(self._loop, self)
+            self = None  # Needed to break cycles when an exception occurs.
+
+    def __step_run_and_handle_result(self, exc):
+        coro = self._coro
         # Call either coro.throw(exc) or coro.send(None).
         try:
             if exc is None:
@@ -344,7 +364,6 @@ class Task(futures._PyFuture):  # Inherit Python Task implementation
                 self._loop.call_soon(
                     self.__step, new_exc, context=self._context)
         finally:
-            _leave_task(self._loop, self)
             self = None  # Needed to break cycles when an exception occurs.
 
     def __wakeup(self, future):
@@ -387,6 +406,27 @@ def create_task(coro, *, name=None):
     return task
 
 
+def create_eager_task_factory(custom_task_constructor):
+    """Create a task factory running the first step of tasks eagerly.
+
+    Tasks are created with custom_task_constructor, which must accept the
+    arguments of Task.  When the event loop is running, the coroutine runs
+    immediately, during loop.create_task(), up to its first suspension; it
+    is only scheduled on the event loop if it suspends.  A coroutine
+    completing without suspending returns a task which is already done.
+
+    Set the returned factory with loop.set_task_factory().
+    """
+
+    def factory(loop, coro):
+        return custom_task_constructor(coro, loop=loop, eager_start=True)
+
+    return factory
+
+
+eager_task_factory = create_eager_task_factory(Task)
+
+
 # wait() and as_completed() similar to those in PEP 3148.
 
 FIRST_COMPLETED = concurrent.futures.FIRST_COMPLETED
@@ -562,7 +602,7 @@ async def _cancel_and_wait(fut, loop):
 
 
 # This is *not* a @coroutine!  It is just an iterator (yielding Futures).
-def as_completed(fs, *, loop=None, timeout=None):
+def as_completed(fs, *, loop=None, timeout=None, limit=None):
     """Return an iterator whose values are coroutines.
 
     When waiting for the yielded coroutines you'll get the results (or
@@ -578,10 +618,22 @@ def as_completed(fs, *, loop=None, timeout=None):
     If a timeout is specified, the 'await' will raise
     TimeoutError when the timeout occurs before all Futures are done.
 
+    If limit is not None, fs can be any iterable and is consumed lazily:
+    at most limit of its awaitables are pending at a time, counting the
+    completed ones whose result was not waited for, the next ones being
+    scheduled as the results are.  One coroutine is yielded per item of
+    fs, so they can be collected before being waited for.  Once the
+    timeout occurs, the items not scheduled yet are not started anymore,
+    and the coroutines yielded for them raise TimeoutError.
+
     Note: The futures 'f' are not necessarily members of fs.
     """
-    if futures.isfuture(fs) or coroutines.iscoroutine(fs):
+    # With a limit, fs may be a generator, which iscoroutine() accepts.
+    if futures.isfuture(fs) or (coroutines.iscoroutine(fs) and
+                                (limit is None or not inspect.isgenerator(fs))):
         raise TypeError(f"expect a list of futures, not {type(fs).__name__}")
+    if limit is not None and limit < 1:
+        raise ValueError('limit must be at least 1')
 
     from .queues import Queue  # Import here to avoid circular import problem.
     done = Queue(loop=loop)
@@ -592,38 +644,175 @@ def as_completed(fs, *, loop=None, timeout=None):
         warnings.warn("The loop argument is deprecated since Python 3.8, "
                       "and scheduled for removal in Python 3.10.",
                       DeprecationWarning, stacklevel=2)
-    todo = {ensure_future(f, loop=loop) for f in set(fs)}
+    # The pending futures, with the number of items of fs they stand for.
+    if limit is None:
+        todo = dict.fromkeys({ensure_future(f, loop=loop) for f in set(fs)},
+                             1)
+        pending = None
+    else:
+        todo = {}
+        pending = iter(fs)
+    ahead = collections.deque()  # The items taken from pending, unscheduled.
+    taken = len(todo)  # One coroutine is yielded per item.
+    scheduled = taken
+    consumed = 0
     timeout_handle = None
+    timed_out = False
+
+    def _take():
+        nonlocal pending, taken
+        if pending is None:
+            return False
+        try:
+            aw = next(pending)
+        except StopIteration:
+            pending = None
+            return False
+        taken += 1
+        if timed_out:
+            _drop(aw)
+        else:
+            ahead.append(aw)
+        return True
+
+    def _drop(aw):
+        # An item which is not started anymore gets a dummy value.
+        done.put_nowait(None)
+        if coroutines.iscoroutine(aw):
+            aw.close()
+
+    def _schedule():
+        nonlocal scheduled
+        if timed_out:
+            return
+        while scheduled - consumed < limit and (ahead or _take()):
+            f = ensure_future(ahead.popleft(), loop=loop)
+            scheduled += 1
+            if f in todo:
+                todo[f] += 1
+            else:
+                todo[f] = 1
+                f.add_done_callback(_on_completion)
 
     def _on_timeout():
-        for f in todo:
+        nonlocal timed_out
+        for f, count in todo.items():
             f.remove_done_callback(_on_completion)
-            done.put_nowait(None)  # Queue a dummy value for _wait_for_one().
-        todo.clear()  # Can't do todo.remove(f) in the loop.
+            for _ in range(count):
+                done.put_nowait(None)  # Queue a dummy value for _wait_for_one().
+        todo.clear()  # Can't do todo.pop(f) in the loop.
+        # The items taken but not scheduled, and the rest of fs as it is
+        # consumed, get a dummy value each.
+        timed_out = True
+        for aw in ahead:
+            _drop(aw)
+        ahead.clear()
 
     def _on_completion(f):
         if not todo:
             return  # _on_timeout() was here first.
-        todo.remove(f)
-        done.put_nowait(f)
-        if not todo and timeout_handle is not None:
+        for _ in range(todo.pop(f)):
+            done.put_nowait(f)
+        if (not todo and timeout_handle is not None and not ahead and
+                pending is None):
             timeout_handle.cancel()
 
     async def _wait_for_one():
+        nonlocal consumed
         f = await done.get()
+        if limit is not None:
+            consumed += 1
+            _schedule()
         if f is None:
             # Dummy value from _on_timeout().
             raise exceptions.TimeoutError
         return f.result()  # May raise f.exception().
 
-    for f in todo:
-        f.add_done_callback(_on_completion)
+    if limit is None:
+        for f in todo:
+            f.add_done_callback(_on_completion)
+    else:
+        _schedule()
     if todo and timeout is not None:
         timeout_handle = loop.call_later(timeout, _on_timeout)
-    for _ in range(len(todo)):
+    yielded = 0
+    while yielded < taken or _take():
+        yielded += 1
         yield _wait_for_one()
 
 
+async def map(func, *iterables, limit, ordered=False):
+    """Run func on the items of the iterables concurrently, yielding results.
+
+    This is an asynchronous generator, used like this:
+
+        async for result in asyncio.map(fetch, urls, limit=10):
+            # Use result.
+
+    func is called with an item of each iterable, like for the builtin
+    map(), and the awaitable it returns is wrapped in a Task.  The
+    iterables are consumed lazily: at most limit calls are pending at a
+    time, counting the ones whose result is not yielded yet, so that the
+    memory use does not grow with the number of items.
+
+    The results are yielded as the calls complete, or in the order of the
+    items if ordered is true.  If a call raises an exception, it is
+    propagated and the pending calls are cancelled, which is also what
+    happens when the generator is closed before the end.
+    """
+    if limit < 1:
+        raise ValueError('limit must be at least 1')
+    loop = events.get_running_loop()
+    args = zip(*iterables)
+    running = set()
+    # The Tasks whose result is not yielded yet, in the order of the items
+    # if ordered, otherwise the completed ones in the order of completion.
+    results = collections.deque()
+    outstanding = 0
+    waiter = None
+
+    def _on_completion(task):
+        running.discard(task)
+        if not ordered:
+            results.append(task)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    try:
+        while True:
+            while args is not None and outstanding < limit:
+                try:
+                    item = next(args)
+                except StopIteration:
+                    args = None
+                    break
+                task = ensure_future(func(*item), loop=loop)
+                running.add(task)
+                if ordered:
+                    results.append(task)
+                task.add_done_callback(_on_completion)
+                outstanding += 1
+            if results and results[0].done():
+                task = results.popleft()
+                outstanding -= 1
+                yield task.result()  # May raise task.exception().
+            elif not outstanding:
+                return
+            else:
+                waiter = loop.create_future()
+                try:
+                    await waiter
+                finally:
+                    waiter = None
+    finally:
+        for task in running:
+            task.cancel()
+        for task in results:
+            if task.done() and not task.cancelled():
+                # Don't log the exceptions nobody waited for.
+                task.exception()
+
+
 @types.coroutine
 def __sleep0():
     """Skip one event loop run cycle.
@@ -808,6 +997,7 @@ def gather(*coros_or_futures, loop=None, return_exceptions=False):
 
     arg_to_fut = {}
     children = []
+    done_futs = []
     nfuts = 0
     nfinished = 0
     for arg in coros_or_futures:
@@ -824,7 +1014,10 @@ def gather(*coros_or_futures, loop=None, return_exceptions=False):
 
             nfuts += 1
             arg_to_fut[arg] = fut
-            fut.add_done_callback(_done_callback)
+            if fut.done():
+                done_futs.append(fut)
+            else:
+                fut.add_done_callback(_done_callback)
 
         else:
             # There's a duplicate Future object in coros_or_futures.
@@ -833,6 +1026,10 @@ def gather(*coros_or_futures, loop=None, return_exceptions=False):
         children.append(fut)
 
     outer = _GatheringFuture(children, loop=loop)
+    # Futures already done, such as tasks completed by their eager first
+    # step, are accounted for now rather than in a later loop iteration.
+    for fut in done_futs:
+        _done_callback(fut)
     return outer
 
 
@@ -951,6 +1148,15 @@ def _leave_task(loop, task):
     del _current_tasks[loop]
 
 
+def _swap_current_task(loop, task):
+    prev_task = _current_tasks.get(loop)
+    if task is None:
+        del _current_tasks[loop]
+    else:
+        _current_tasks[loop] = task
+    return prev_task
+
+
 def _unregister_task(task):
     """Unregister a task."""
     _all_tasks.discard(task)
@@ -960,11 +1166,12 @@ _py_register_task = _register_task
 _py_unregister_task = _unregister_task
 _py_enter_task = _enter_task
 _py_leave_task = _leave_task
+_py_swap_current_task = _swap_current_task
 
 
 try:
     from _asyncio import (_register_task, _unregister_task,
-                          _enter_task, _leave_task,
+                          _enter_task, _leave_task, _swap_current_task,
                           _all_tasks, _current_tasks)
 except ImportError:
     pass
@@ -973,3 +1180,4 @@ else:
     _c_unregister_task = _unregister_task
     _c_enter_task = _enter_task
     _c_leave_task = _leave_task
+    _c_swap_current_task = _swap_current_task
@@ -0,0 +1,205 @@
+"""Hierarchical timer wheel for scheduling timer handles."""
+
+__all__ = ('TimerWheel',)
+
+import math
+
+
+class TimerWheel:
+    """Hierarchical hashed timer wheel.
+
+    An alternative to the heap of timer handles of an event loop, set with
+    loop.set_timer_wheel().  Adding and cancelling a timer are O(1), which
+    suits applications arming and cancelling many timeouts, at the cost of
+    rounding each deadline up to a multiple of resolution seconds: timers
+    never run early, but up to resolution seconds late.
+
+    Time is divided in ticks of resolution seconds.  Each of the levels
+    holds slots timers; a level covers slots times the span of the level
+    below, so timers due in the next slots ticks are in level 0 and
+    further ones are moved down a level each time the level below has
+    done a full turn.
+    """
+
+    def __init__(self, resolution=0.001, *, slots=256, levels=4):
+        if resolution <= 0:
+            raise ValueError('resolution must be positive')
+        if slots < 2 or slots & (slots - 1):
+            raise ValueError('slots must be a power of 2 greater than 1')
+        if levels < 1:
+            raise ValueError('levels must be at least 1')
+        self._resolution = resolution
+        self._slots = slots
+        self._bits = slots.bit_length() - 1
+        self._mask = slots - 1
+        self._levels = [[{} for _ in range(slots)] for _ in range(levels)]
+        # Timers beyond the last level, and timers due.
+        self._overflow = {}
+        self._due = {}
+        self._overflow_level = levels
+        self._due_level = levels + 1
+        self._counts = [0] * (levels + 2)
+        # Maps the id of each timer to its bucket and level.
+        self._where = {}
+        self._tick = None
+
+    def __len__(self):
+        return len(self._where)
+
+    def __repr__(self):
+        return (f'<{self.__class__.__name__} resolution={self._resolution} '
+                f'slots={self._slots} levels={len(self._levels)} '
+                f'timers={len(self)}>')
+
+    @property
+    def resolution(self):
+        return self._resolution
+
+    def start(self, now):
+        """Set the current time of an empty wheel."""
+        if self._where:
+            raise RuntimeError('the wheel has timers')
+        self._tick = math.floor(now / self._resolution)
+
+    def add(self, timer):
+        """Add a TimerHandle."""
+        tick = math.ceil(timer._when / self._resolution)
+        self._insert(timer, tick)
+        timer._scheduled = True
+
+    def remove(self, timer):
+        """Remove a TimerHandle added by add()."""
+        try:
+            bucket, level = self._where.pop(id(timer))
+        except KeyError:
+            return
+        del bucket[id(timer)]
+        self._counts[level] -= 1
+        timer._scheduled = False
+
+    def clear(self):
+        """Remove all the timers."""
+        for timer in self.timers():
+            timer._scheduled = False
+        for level in self._levels:
+            for bucket in level:
+                bucket.clear()
+        self._due.clear()
+        self._overflow.clear()
+        self._where.clear()
+        self._counts = [0] * len(self._counts)
+
+    def timers(self):
+        """Return a list of the timers of the wheel, in no particular order."""
+        return [bucket[key] for key, (bucket, level) in self._where.items()]
+
+    def next_deadline(self):
+        """Return the time by which the wheel must be advanced next.
+
+        This is the deadline of the earliest timer if it is due within
+        slots ticks, or the time of the next move of timers from upper
+        levels, or None if the wheel is empty.
+        """
+        if not self._where:
+            return None
+        if self._due:
+            return self._tick * self._resolution
+        tick = self._tick
+        if self._counts[0]:
+            level0 = self._levels[0]
+            mask = self._mask
+            for i in range(1, self._slots):
+                if level0[(tick + i) & mask]:
+                    return (tick + i) * self._resolution
+        return ((tick | self._mask) + 1) * self._resolution
+
+    def advance(self, now, ready):
+        """Advance the wheel to now and append the due timers to ready.
+
+        The timers are appended ordered by their deadline.
+        """
+        target = math.floor(now / self._resolution)
+        mask = self._mask
+        level0 = self._levels[0]
+        expired = []
+        if self._due:
+            expired.extend(self._pop_bucket(self._due, self._due_level))
+        while self._tick < target:
+            if self._counts[0]:
+                tick = self._tick + 1
+            else:
+                # Level 0 is empty: skip to the next turn.
+                tick = min(target, (self._tick | mask) + 1)
+            self._tick = tick
+            if not tick & mask:
+                self._cascade(tick)
+                if self._due:
+                    expired.extend(
+                        self._pop_bucket(self._due, self._due_level))
+            bucket = level0[tick & mask]
+            if bucket:
+                expired.extend(self._pop_bucket(bucket, 0))
+        if expired:
+            expired.sort(key=_when)
+            for timer in expired:
+                timer._scheduled = False
+            ready.extend(expired)
+
+    def _insert(self, timer, tick):
+        key = id(timer)
+        current = self._tick
+        if tick <= current:
+            bucket = self._due
+            level = self._due_level
+        else:
+            bits = self._bits
+            shift = 0
+            for level, slots in enumerate(self._levels):
+                if (tick >> shift) - (current >> shift) < self._slots:
+                    bucket = slots[(tick >> shift) & self._mask]
+                    break
+                shift += bits
+            else:
+                bucket = self._overflow
+                level = self._overflow_level
+        bucket[key] = timer
+        self._where[key] = bucket, level
+        self._counts[level] += 1
+
+    def _pop_bucket(self, bucket, level):
+        timers = list(bucket.values())
+        bucket.clear()
+        where = self._where
+        for timer in timers:
+            del where[id(timer)]
+        self._counts[level] -= len(timers)
+        return timers
+
+    def _cascade(self, tick):
+        # Move the timers of the slot of each upper level whose turn
+        # starts at tick, the highest level first, to the lower levels.
+        bits = self._bits
+        mask = self._mask
+        shift = bits
+        levels = []
+        for level in range(1, len(self._levels)):
+            levels.append(level)
+            if (tick >> shift) & mask:
+                break
+            shift += bits
+        else:
+            levels.append(self._overflow_level)
+        for level in reversed(levels):
+            if level == self._overflow_level:
+                bucket = self._overflow
+            else:
+                bucket = self._levels[level][
+                    (tick >> (bits * level)) & mask]
+            if bucket:
+                for timer in self._pop_bucket(bucket, level):
+                    self._insert(timer,
+                                 math.ceil(timer._when / self._resolution))
+
+
+def _when(timer):
+    return timer._when
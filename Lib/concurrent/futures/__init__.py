@@ -30,6 +30,7 @@ __all__ = (
     'as_completed',
     'ProcessPoolExecutor',
     'ThreadPoolExecutor',
+    'WorkStealingThreadPoolExecutor',
 )
 
 
@@ -39,6 +40,7 @@ def __dir__():
 
 def __getattr__(name):
     global ProcessPoolExecutor, ThreadPoolExecutor
+    global WorkStealingThreadPoolExecutor
 
     if name == 'ProcessPoolExecutor':
         from .process import ProcessPoolExecutor as pe
@@ -50,4 +52,9 @@ def __getattr__(name):
         ThreadPoolExecutor = te
         return te
 
+    if name == 'WorkStealingThreadPoolExecutor':
+        from .thread import WorkStealingThreadPoolExecutor as wte
+        WorkStealingThreadPoolExecutor = wte
+        return wte
+
     raise AttributeError(f"module {__name__} has no attribute {name}")
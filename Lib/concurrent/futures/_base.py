@@ -4,9 +4,11 @@
 __author__ = 'Brian Quinlan (brian@sweetapp.com)'
 
 import collections
+import itertools
 import logging
 import threading
 import time
+import weakref
 
 FIRST_COMPLETED = 'FIRST_COMPLETED'
 FIRST_EXCEPTION = 'FIRST_EXCEPTION'
@@ -558,7 +560,7 @@ class Executor(object):
         """
         raise NotImplementedError()
 
-    def map(self, fn, *iterables, timeout=None, chunksize=1):
+    def map(self, fn, *iterables, timeout=None, chunksize=1, buffersize=None):
         """Returns an iterator equivalent to map(fn, iter).
 
         Args:
@@ -570,6 +572,10 @@ class Executor(object):
                 before being passed to a child process. This argument is only
                 used by ProcessPoolExecutor; it is ignored by
                 ThreadPoolExecutor.
+            buffersize: The number of submitted calls whose results have not
+                been yielded yet. If None, all the calls are submitted at
+                once; otherwise the iterables are consumed lazily, the next
+                call being submitted as a result is yielded.
 
         Returns:
             An iterator equivalent to: map(func, *iterables) but the calls may
@@ -580,10 +586,23 @@ class Executor(object):
                 before the given timeout.
             Exception: If fn(*args) raises for any values.
         """
+        if buffersize is not None and buffersize < 1:
+            raise ValueError("buffersize must be None or >= 1.")
+
         if timeout is not None:
             end_time = timeout + time.monotonic()
 
-        fs = [self.submit(fn, *args) for args in zip(*iterables)]
+        zipped = zip(*iterables)
+        if buffersize is None:
+            fs = [self.submit(fn, *args) for args in zipped]
+        else:
+            fs = collections.deque(
+                self.submit(fn, *args)
+                for args in itertools.islice(zipped, buffersize))
+
+        # The iterator submits the next calls through a weak reference, not
+        # to keep the executor alive.
+        executor_ref = weakref.ref(self)
 
         # Yield must be hidden in closure so that the futures are submitted
         # before the first iterator value is required.
@@ -592,6 +611,12 @@ class Executor(object):
                 # reverse to keep finishing order
                 fs.reverse()
                 while fs:
+                    if buffersize is not None:
+                        args = next(zipped, None)
+                        executor = executor_ref()
+                        if args is not None and executor is not None:
+                            fs.appendleft(executor.submit(fn, *args))
+                        executor = None
                     # Careful not to keep a reference to the popped future
                     if timeout is None:
                         yield fs.pop().result()
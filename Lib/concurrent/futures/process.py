@@ -46,6 +46,8 @@ Process #1..n:
 __author__ = 'Brian Quinlan (brian@sweetapp.com)'
 
 import atexit
+import collections
+import io
 import os
 from concurrent.futures import _base
 import queue
@@ -53,13 +55,20 @@ from queue import Full
 import multiprocessing as mp
 import multiprocessing.connection
 from multiprocessing.queues import Queue
+import pickle
 import threading
 import weakref
 from functools import partial
 import itertools
 import sys
+import time
 import traceback
 
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
 # Workers are created as daemon threads and processes. This is done to allow the
 # interpreter to exit when there are still idle processes in a
 # ProcessPoolExecutor's process pool (i.e. shutdown() was not called). However,
@@ -77,6 +86,12 @@ import traceback
 _threads_wakeups = weakref.WeakKeyDictionary()
 _global_shutdown = False
 
+# With chunksize=None, map() sizes the chunks to take about this many
+# seconds, within _MAX_AUTO_CHUNKSIZE items: long enough to amortize the
+# cost of sending a chunk, short enough to balance the load of the workers.
+_AUTO_CHUNK_DURATION = 0.05
+_MAX_AUTO_CHUNKSIZE = 4096
+
 
 class _ThreadWakeup:
     def __init__(self):
@@ -148,6 +163,8 @@ class _WorkItem(object):
         self.fn = fn
         self.args = args
         self.kwargs = kwargs
+        # Shared memory segments holding the arguments, once sent.
+        self.segments = ()
 
 class _ResultItem(object):
     def __init__(self, work_id, exception=None, result=None):
@@ -179,6 +196,7 @@ class _SafeQueue(Queue):
             # work_item can be None if another process terminated. In this case,
             # the queue_manager_thread fails all work_items with BrokenProcessPool
             if work_item is not None:
+                _unlink_segments(work_item.segments)
                 work_item.future.set_exception(e)
         else:
             super()._on_queue_feeder_error(e, obj)
@@ -204,6 +222,261 @@ def _process_chunk(fn, chunk):
     """
     return [fn(*args) for args in chunk]
 
+def _process_timed_chunk(fn, chunk):
+    """ Processes a chunk of an iterable passed to map, timing it.
+
+    Returns the results of _process_chunk() and the number of seconds it
+    took, which map() uses to size the next chunks.
+
+    This function is run in a separate process.
+
+    """
+    start = time.monotonic()
+    results = [fn(*args) for args in chunk]
+    return results, time.monotonic() - start
+
+def _map_auto_chunks(executor, fn, iterables, timeout, buffersize):
+    """ Returns an iterator over the results of map() with chunksize=None.
+
+    The chunks start with a single item and are then sized to take about
+    _AUTO_CHUNK_DURATION seconds, going by the duration of the previous
+    ones, their size at most doubling from one chunk to the next.  At most
+    buffersize chunks are submitted and not yielded yet.
+
+    """
+    if timeout is not None:
+        end_time = timeout + time.monotonic()
+    zipped = zip(*iterables)
+    chunk_fn = partial(_process_timed_chunk, fn)
+    chunksize = 1
+    fs = collections.deque()
+
+    def submit_chunk(executor):
+        chunk = tuple(itertools.islice(zipped, chunksize))
+        if chunk:
+            fs.append(executor.submit(chunk_fn, chunk))
+        return bool(chunk)
+
+    while len(fs) < buffersize and submit_chunk(executor):
+        pass
+    # The iterator submits the next chunks through a weak reference, not
+    # to keep the executor alive.
+    executor_ref = weakref.ref(executor)
+
+    def result_iterator():
+        nonlocal chunksize
+        try:
+            while fs:
+                # Careful not to keep a reference to the popped future
+                if timeout is None:
+                    results, duration = fs.popleft().result()
+                else:
+                    results, duration = fs.popleft().result(
+                        end_time - time.monotonic())
+                if duration > 0:
+                    target = int(_AUTO_CHUNK_DURATION * len(results)
+                                 / duration)
+                else:
+                    target = _MAX_AUTO_CHUNKSIZE
+                chunksize = max(1, min(target, 2 * chunksize,
+                                       _MAX_AUTO_CHUNKSIZE))
+                executor = executor_ref()
+                if executor is not None:
+                    submit_chunk(executor)
+                executor = None
+                results.reverse()
+                while results:
+                    yield results.pop()
+        finally:
+            for future in fs:
+                future.cancel()
+    return result_iterator()
+
+
+class _SharedPayload(object):
+    def __init__(self, data, segments, out_of_band):
+        # A protocol 5 pickle, the (name, size) pairs of the shared memory
+        # segments it refers to, and the indices of the segments holding
+        # its out-of-band buffers, in order.
+        self.data = data
+        self.segments = segments
+        self.out_of_band = out_of_band
+
+# Segments which could not be closed because objects unpickled from them
+# still use their memory.  Closing them is retried with the next ones.
+_mapped_segments = []
+_mapped_segments_lock = threading.Lock()
+
+class _SharedPickler(pickle.Pickler):
+    """Pickler placing the buffers of at least threshold bytes in shared
+    memory segments, whatever the depth of the objects exporting them.
+
+    The out-of-band buffers of protocol 5 are passed by its buffer
+    callback.  The C pickler does not call reducer_override() for bytes and
+    bytearray objects, but calls persistent_id() for every object: bytes,
+    bytearray and C-contiguous memoryview objects are passed by it.
+    """
+
+    def __init__(self, file, threshold):
+        super().__init__(file, protocol=5,
+                         buffer_callback=self._buffer_callback)
+        self.threshold = max(threshold, 1)
+        self.segments = []
+        self.sizes = []
+        self.out_of_band = []
+
+    def _share(self, view):
+        # Copies the bytes of view to a new segment and returns its index.
+        shm = shared_memory.SharedMemory(create=True, size=view.nbytes)
+        self.segments.append(shm)
+        self.sizes.append(view.nbytes)
+        shm.buf[:view.nbytes] = view
+        return len(self.segments) - 1
+
+    def _buffer_callback(self, buf):
+        try:
+            view = buf.raw()
+        except BufferError:
+            # Non-contiguous buffers are copied in the pickle.
+            return True
+        if view.nbytes < self.threshold:
+            return True
+        self.out_of_band.append(self._share(view))
+        return False
+
+    def persistent_id(self, obj):
+        cls = type(obj)
+        if cls is bytes or cls is bytearray:
+            if len(obj) >= self.threshold:
+                return cls.__name__, self._share(memoryview(obj))
+        elif cls is memoryview:
+            if obj.c_contiguous and obj.nbytes >= self.threshold:
+                try:
+                    # Check that the view can be rebuilt from the bytes.
+                    obj.cast('B').cast(obj.format, obj.shape)
+                except (TypeError, ValueError):
+                    return None
+                return ('memoryview', self._share(obj.cast('B')),
+                        obj.format, obj.shape, obj.readonly)
+        return None
+
+class _SharedUnpickler(pickle.Unpickler):
+    """Unpickler of the pickles of _SharedPickler, given the views of the
+    segments they refer to."""
+
+    def __init__(self, file, views, out_of_band):
+        super().__init__(file, buffers=[views[i] for i in out_of_band])
+        self.views = views
+
+    def persistent_load(self, pid):
+        kind, index, *info = pid
+        view = self.views[index]
+        if kind == 'bytes':
+            return bytes(view)
+        if kind == 'bytearray':
+            return bytearray(view)
+        if kind == 'memoryview':
+            format, shape, readonly = info
+            view = view.cast(format, shape)
+            return view.toreadonly() if readonly else view
+        raise pickle.UnpicklingError("unsupported persistent id: %r" % (pid,))
+
+def _dumps_shared(obj, threshold):
+    """Pickles obj, placing the buffers of at least threshold bytes in
+    shared memory.
+
+    Returns a _SharedPayload and the list of the SharedMemory segments
+    created, which the caller must unlink once the payload is unpickled.
+    """
+    file = io.BytesIO()
+    pickler = _SharedPickler(file, threshold)
+    try:
+        pickler.dump(obj)
+    except BaseException:
+        _unlink_segments(pickler.segments)
+        raise
+    segments = pickler.segments
+    names = [shm.name for shm in segments]
+    payload = _SharedPayload(file.getvalue(), list(zip(names, pickler.sizes)),
+                             pickler.out_of_band)
+    return payload, segments
+
+def _loads_shared(payload):
+    """Unpickles a _SharedPayload.
+
+    Out-of-band buffers and memoryview objects are read from the segments
+    without a copy; bytes and bytearray objects are copied out of them.
+    Returns the object and the list of the SharedMemory segments attached,
+    which the caller must close with _close_segments() once it is done
+    with the object.
+    """
+    segments = []
+    try:
+        for name, size in payload.segments:
+            segments.append(shared_memory.SharedMemory(name))
+        views = [shm.buf[:size]
+                 for shm, (name, size) in zip(segments, payload.segments)]
+        unpickler = _SharedUnpickler(io.BytesIO(payload.data), views,
+                                     payload.out_of_band)
+        obj = unpickler.load()
+    except BaseException:
+        # Release the views before closing the segments.
+        views = unpickler = None
+        _close_segments(segments)
+        raise
+    views = unpickler = None
+    return obj, segments
+
+def _close_segments(segments):
+    """Closes the mapping of segments, and of the ones left mapped before,
+    unless they are still in use."""
+    with _mapped_segments_lock:
+        in_use = []
+        for shm in itertools.chain(_mapped_segments, segments):
+            try:
+                shm.close()
+            except BufferError:
+                in_use.append(shm)
+        _mapped_segments[:] = in_use
+
+def _unlink_segments(segments):
+    for shm in segments:
+        try:
+            shm.unlink()
+        except OSError:
+            pass
+    _close_segments(segments)
+
+def _call_shared(payload, threshold):
+    """Calls the function pickled with its arguments in payload by
+    _dumps_shared(), and returns its result pickled the same way.
+
+    This function is run in a separate process.
+    """
+    (fn, args, kwargs), segments = _loads_shared(payload)
+    try:
+        result = fn(*args, **kwargs)
+    finally:
+        # The parent unlinks the segments of the arguments.
+        del fn, args, kwargs
+        _close_segments(segments)
+    if sys.platform == 'win32':
+        # A segment is destroyed with its last handle, which can't be
+        # kept until the parent opens it.
+        return result
+    payload, segments = _dumps_shared(result, threshold)
+    # The parent unlinks the segments once it read them.
+    _close_segments(segments)
+    return payload
+
+def _load_result(result):
+    """Returns the result of a call made by _call_shared()."""
+    if not isinstance(result, _SharedPayload):
+        return result
+    result, segments = _loads_shared(result)
+    _unlink_segments(segments)
+    return result
+
 
 def _sendback_result(result_queue, work_id, result=None, exception=None):
     """Safely send back the given result or exception"""
@@ -258,7 +531,8 @@ def _process_worker(call_queue, result_queue, initializer, initargs):
 
 def _add_call_item_to_queue(pending_work_items,
                             work_ids,
-                            call_queue):
+                            call_queue,
+                            shared_memory_threshold=None):
     """Fills call_queue with _WorkItems from pending_work_items.
 
     This function never blocks.
@@ -272,6 +546,8 @@ def _add_call_item_to_queue(pending_work_items,
             call_queue.
         call_queue: A multiprocessing.Queue that will be filled with _CallItems
             derived from _WorkItems.
+        shared_memory_threshold: The size from which the buffers of the
+            arguments and results are passed in shared memory, or None.
     """
     while True:
         if call_queue.full():
@@ -284,10 +560,23 @@ def _add_call_item_to_queue(pending_work_items,
             work_item = pending_work_items[work_id]
 
             if work_item.future.set_running_or_notify_cancel():
-                call_queue.put(_CallItem(work_id,
-                                         work_item.fn,
-                                         work_item.args,
-                                         work_item.kwargs),
+                fn = work_item.fn
+                args = work_item.args
+                kwargs = work_item.kwargs
+                if shared_memory_threshold is not None:
+                    # The call is pickled here rather than by the queue, so
+                    # that the segments only exist while the call does.
+                    try:
+                        payload, work_item.segments = _dumps_shared(
+                            (fn, args, kwargs), shared_memory_threshold)
+                    except BaseException as e:
+                        del pending_work_items[work_id]
+                        work_item.future.set_exception(e)
+                        continue
+                    fn = _call_shared
+                    args = (payload, shared_memory_threshold)
+                    kwargs = {}
+                call_queue.put(_CallItem(work_id, fn, args, kwargs),
                                block=True)
             else:
                 del pending_work_items[work_id]
@@ -300,7 +589,8 @@ def _queue_management_worker(executor_reference,
                              work_ids_queue,
                              call_queue,
                              result_queue,
-                             thread_wakeup):
+                             thread_wakeup,
+                             shared_memory_threshold=None):
     """Manages the communication between this process and the worker processes.
 
     This function is run in a local thread.
@@ -321,6 +611,8 @@ def _queue_management_worker(executor_reference,
         thread_wakeup: A _ThreadWakeup to allow waking up the
             queue_manager_thread from the main Thread and avoid deadlocks
             caused by permanently locked queues.
+        shared_memory_threshold: The size from which the buffers of the
+            arguments and results are passed in shared memory, or None.
     """
     executor = None
 
@@ -360,7 +652,8 @@ def _queue_management_worker(executor_reference,
     while True:
         _add_call_item_to_queue(pending_work_items,
                                 work_ids_queue,
-                                call_queue)
+                                call_queue,
+                                shared_memory_threshold)
 
         # Wait for a result to be ready in the result_queue while checking
         # that all worker processes are still running, or for a wake up
@@ -400,6 +693,7 @@ def _queue_management_worker(executor_reference,
                     f"\n'''\n{''.join(cause)}'''")
             # All futures in flight must be marked failed
             for work_id, work_item in pending_work_items.items():
+                _unlink_segments(work_item.segments)
                 work_item.future.set_exception(bpe)
                 # Delete references to object. See issue16284
                 del work_item
@@ -423,12 +717,25 @@ def _queue_management_worker(executor_reference,
             work_item = pending_work_items.pop(result_item.work_id, None)
             # work_item can be None if another process terminated (see above)
             if work_item is not None:
+                _unlink_segments(work_item.segments)
                 if result_item.exception:
                     work_item.future.set_exception(result_item.exception)
                 else:
-                    work_item.future.set_result(result_item.result)
+                    try:
+                        result = _load_result(result_item.result)
+                    except BaseException as e:
+                        work_item.future.set_exception(e)
+                    else:
+                        work_item.future.set_result(result)
+                        del result
                 # Delete references to object. See issue16284
                 del work_item
+            elif isinstance(result_item.result, _SharedPayload):
+                # Don't leak the segments of a result nobody waits for.
+                try:
+                    _load_result(result_item.result)
+                except BaseException:
+                    pass
             # Delete reference to result_item
             del result_item
 
@@ -523,7 +830,8 @@ class BrokenProcessPool(_base.BrokenExecutor):
 
 class ProcessPoolExecutor(_base.Executor):
     def __init__(self, max_workers=None, mp_context=None,
-                 initializer=None, initargs=()):
+                 initializer=None, initargs=(), *,
+                 shared_memory_threshold=None):
         """Initializes a new ProcessPoolExecutor instance.
 
         Args:
@@ -534,6 +842,11 @@ class ProcessPoolExecutor(_base.Executor):
                 object should provide SimpleQueue, Queue and Process.
             initializer: A callable used to initialize worker processes.
             initargs: A tuple of arguments to pass to the initializer.
+            shared_memory_threshold: If not None, the calls and their results
+                are pickled with protocol 5, and the bytes, bytearray and
+                memoryview objects and out-of-band buffers of at least this
+                many bytes are passed in shared memory segments instead of
+                through the pipes.
         """
         _check_system_limits()
 
@@ -561,6 +874,14 @@ class ProcessPoolExecutor(_base.Executor):
         self._initializer = initializer
         self._initargs = initargs
 
+        if shared_memory_threshold is not None:
+            if shared_memory is None:
+                raise NotImplementedError(
+                    "shared memory is not available on this platform")
+            if shared_memory_threshold < 0:
+                raise ValueError("shared_memory_threshold must be >= 0")
+        self._shared_memory_threshold = shared_memory_threshold
+
         # Management thread
         self._queue_management_thread = None
 
@@ -609,6 +930,12 @@ class ProcessPoolExecutor(_base.Executor):
                 mp.util.debug('Executor collected: triggering callback for'
                               ' QueueManager wakeup')
                 thread_wakeup.wakeup()
+            if (self._shared_memory_threshold is not None and
+                    sys.platform != 'win32'):
+                # The workers must share the resource tracker of this
+                # process, which tracks the segments until they are unlinked.
+                from multiprocessing import resource_tracker
+                resource_tracker.ensure_running()
             # Start the processes so that their sentinels are known.
             self._adjust_process_count()
             self._queue_management_thread = threading.Thread(
@@ -619,7 +946,8 @@ class ProcessPoolExecutor(_base.Executor):
                       self._work_ids,
                       self._call_queue,
                       self._result_queue,
-                      self._queue_management_thread_wakeup),
+                      self._queue_management_thread_wakeup,
+                      self._shared_memory_threshold),
                 name="QueueManagerThread")
             self._queue_management_thread.daemon = True
             self._queue_management_thread.start()
@@ -660,7 +988,7 @@ class ProcessPoolExecutor(_base.Executor):
             return f
     submit.__doc__ = _base.Executor.submit.__doc__
 
-    def map(self, fn, *iterables, timeout=None, chunksize=1):
+    def map(self, fn, *iterables, timeout=None, chunksize=1, buffersize=None):
         """Returns an iterator equivalent to map(fn, iter).
 
         Args:
@@ -671,6 +999,14 @@ class ProcessPoolExecutor(_base.Executor):
             chunksize: If greater than one, the iterables will be chopped into
                 chunks of size chunksize and submitted to the process pool.
                 If set to one, the items in the list will be sent one at a time.
+                If None, the size of the chunks is adapted to the time the
+                previous ones took.
+            buffersize: The number of submitted chunks whose results have not
+                been yielded yet. If None, all the chunks are submitted at
+                once, unless chunksize is None, in which case it defaults to
+                twice the number of workers; otherwise the iterables are
+                consumed lazily, the next chunk being submitted as the results
+                of one are yielded.
 
         Returns:
             An iterator equivalent to: map(func, *iterables) but the calls may
@@ -681,12 +1017,19 @@ class ProcessPoolExecutor(_base.Executor):
                 before the given timeout.
             Exception: If fn(*args) raises for any values.
         """
-        if chunksize < 1:
+        if chunksize is not None and chunksize < 1:
             raise ValueError("chunksize must be >= 1.")
+        if buffersize is not None and buffersize < 1:
+            raise ValueError("buffersize must be None or >= 1.")
+
+        if chunksize is None:
+            if buffersize is None:
+                buffersize = 2 * self._max_workers
+            return _map_auto_chunks(self, fn, iterables, timeout, buffersize)
 
         results = super().map(partial(_process_chunk, fn),
                               _get_chunks(*iterables, chunksize=chunksize),
-                              timeout=timeout)
+                              timeout=timeout, buffersize=buffersize)
         return _chain_from_iterable_of_lists(results)
 
     def shutdown(self, wait=True, *, cancel_futures=False):
@@ -7,9 +7,11 @@ __author__ = 'Brian Quinlan (brian@sweetapp.com)'
 
 import atexit
 from concurrent.futures import _base
+import collections
 import itertools
 import queue
 import threading
+import time
 import weakref
 import os
 
@@ -110,6 +112,194 @@ def _worker(executor_reference, work_queue, initializer, initargs):
         _base.LOGGER.critical('Exception in worker', exc_info=True)
 
 
+class _WorkDeques(object):
+    """The work queue of a WorkStealingThreadPoolExecutor.
+
+    Each worker thread has a deque of its own, to which the calls it submits
+    are pushed.  A worker pops its own deque from the end (newest call
+    first), and when it is empty takes the calls submitted by other threads,
+    which are pushed to a shared deque, and then steals from the start of
+    the deques of the other workers (oldest call first, the biggest one in
+    divide-and-conquer algorithms).  put() and get_nowait() behave as
+    the ones of the SimpleQueue of a ThreadPoolExecutor.
+    """
+
+    def __init__(self):
+        self._injection = collections.deque()
+        self._deques = []
+        self._local = threading.local()
+        self._cond = threading.Condition(threading.Lock())
+        # The number of threads waiting for work in get() or help().
+        self.idle = 0
+
+    def put(self, item):
+        own = getattr(self._local, 'deque', None)
+        if own is None or item is None:
+            self._injection.append(item)
+        else:
+            own.append(item)
+        # An idle thread registers itself and checks the deques again
+        # with the lock held, so it can't miss the item without being
+        # notified.
+        if self.idle:
+            with self._cond:
+                self._cond.notify()
+
+    def get_nowait(self):
+        return self._take(None)
+
+    def starved(self):
+        """Return True if more calls are queued than threads are idle.
+
+        Only the shared deque and the one of the current thread are counted,
+        those which the calls submitted by the current thread go to.
+        """
+        queued = len(self._injection)
+        own = getattr(self._local, 'deque', None)
+        if own is not None:
+            queued += len(own)
+        return queued > self.idle
+
+    def get(self, block=True):
+        own = getattr(self._local, 'deque', None)
+        if own is None:
+            own = self._local.deque = collections.deque()
+            self._deques.append(own)
+        while True:
+            try:
+                return self._take(own)
+            except queue.Empty:
+                pass
+            with self._cond:
+                self.idle += 1
+                try:
+                    while not self._has_work():
+                        self._cond.wait()
+                finally:
+                    self.idle -= 1
+
+    def help(self, future, timeout):
+        """Run queued calls while a worker thread waits for future.
+
+        Return the time left to wait for future, or None to wait without
+        a timeout.  Blocking a worker thread would deadlock the pool once
+        all the workers wait for calls which are queued.
+        """
+        own = getattr(self._local, 'deque', None)
+        if own is None or future.done():
+            return timeout
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
+        callback_added = False
+        while not future.done():
+            try:
+                work_item = self._take(own)
+            except queue.Empty:
+                if not callback_added:
+                    # Wake up this thread when future is done.
+                    future.add_done_callback(self._wakeup_all)
+                    callback_added = True
+                    continue
+                with self._cond:
+                    self.idle += 1
+                    try:
+                        if not future.done() and not self._has_work():
+                            self._cond.wait(None if timeout is None
+                                            else deadline - time.monotonic())
+                    finally:
+                        self.idle -= 1
+            else:
+                if work_item is None:
+                    # The pool is shutting down: leave the wake-up to the
+                    # workers, and wait for future.
+                    self.put(None)
+                    break
+                work_item.run()
+                del work_item
+            if timeout is not None and time.monotonic() >= deadline:
+                break
+        if timeout is None:
+            return None
+        return max(0, deadline - time.monotonic())
+
+    def _take(self, own):
+        if own:
+            try:
+                return own.pop()
+            except IndexError:
+                pass
+        if self._injection:
+            try:
+                return self._injection.popleft()
+            except IndexError:
+                pass
+        for victim in self._deques:
+            if victim and victim is not own:
+                try:
+                    return victim.popleft()
+                except IndexError:
+                    pass
+        raise queue.Empty
+
+    def _has_work(self):
+        return bool(self._injection) or any(self._deques)
+
+    def _wakeup_all(self, future):
+        with self._cond:
+            self._cond.notify_all()
+
+
+class _StealingFuture(_base.Future):
+    """Future whose result() runs other calls in the worker threads."""
+
+    def __init__(self, work_queue):
+        super().__init__()
+        self._work_queue = work_queue
+
+    def result(self, timeout=None):
+        return super().result(self._work_queue.help(self, timeout))
+
+    def exception(self, timeout=None):
+        return super().exception(self._work_queue.help(self, timeout))
+
+
+def _stealing_worker(executor_reference, work_queue, initializer, initargs):
+    if initializer is not None:
+        try:
+            initializer(*initargs)
+        except BaseException:
+            _base.LOGGER.critical('Exception in initializer:', exc_info=True)
+            executor = executor_reference()
+            if executor is not None:
+                executor._initializer_failed()
+            return
+    try:
+        while True:
+            work_item = work_queue.get(block=True)
+            if work_item is not None:
+                work_item.run()
+                # Delete references to object. See issue16284
+                del work_item
+                continue
+
+            executor = executor_reference()
+            # Exit if:
+            #   - The interpreter is shutting down OR
+            #   - The executor that owns the worker has been collected OR
+            #   - The executor that owns the worker has been shutdown.
+            if _shutdown or executor is None or executor._shutdown:
+                # Flag the executor as shutting down as early as possible if it
+                # is not gc-ed yet.
+                if executor is not None:
+                    executor._shutdown = True
+                # Notice other workers
+                work_queue.put(None)
+                return
+            del executor
+    except BaseException:
+        _base.LOGGER.critical('Exception in worker', exc_info=True)
+
+
 class BrokenThreadPool(_base.BrokenExecutor):
     """
     Raised when a worker thread in a ThreadPoolExecutor failed initializing.
@@ -236,3 +426,74 @@ class ThreadPoolExecutor(_base.Executor):
             for t in self._threads:
                 t.join()
     shutdown.__doc__ = _base.Executor.shutdown.__doc__
+
+
+class WorkStealingThreadPoolExecutor(ThreadPoolExecutor):
+    """A ThreadPoolExecutor for calls which submit calls and wait for them.
+
+    Each worker thread queues the calls it submits on a deque of its own,
+    which idle workers steal from, so that recursive divide-and-conquer
+    calls don't contend on a single queue.  Calling result() or exception()
+    of a pending future of the executor from a worker thread runs queued
+    calls in that thread until the future is done, instead of blocking
+    it, so nested waits can't exhaust the pool.
+    """
+
+    def __init__(self, max_workers=None, thread_name_prefix='',
+                 initializer=None, initargs=()):
+        """Initializes a new WorkStealingThreadPoolExecutor instance.
+
+        Args:
+            max_workers: The maximum number of threads that can be used to
+                execute the given calls.
+            thread_name_prefix: An optional name prefix to give our threads.
+            initializer: A callable used to initialize worker threads.
+            initargs: A tuple of arguments to pass to the initializer.
+        """
+        super().__init__(max_workers, thread_name_prefix,
+                         initializer, initargs)
+        self._work_queue = _WorkDeques()
+
+    def submit(self, fn, /, *args, **kwargs):
+        with self._shutdown_lock, _global_shutdown_lock:
+            if self._broken:
+                raise BrokenThreadPool(self._broken)
+
+            if self._shutdown:
+                raise RuntimeError('cannot schedule new futures after shutdown')
+            if _shutdown:
+                raise RuntimeError('cannot schedule new futures after '
+                                   'interpreter shutdown')
+
+            f = _StealingFuture(self._work_queue)
+            w = _WorkItem(f, fn, args, kwargs)
+
+            self._work_queue.put(w)
+            self._adjust_thread_count()
+            return f
+    submit.__doc__ = _base.Executor.submit.__doc__
+
+    def _adjust_thread_count(self):
+        # if enough threads are idle to take the queued calls, don't spin
+        # new threads
+        if not self._work_queue.starved():
+            return
+
+        # When the executor gets lost, the weakref callback will wake up
+        # the worker threads.
+        def weakref_cb(_, q=self._work_queue):
+            q.put(None)
+
+        num_threads = len(self._threads)
+        if num_threads < self._max_workers:
+            thread_name = '%s_%d' % (self._thread_name_prefix or self,
+                                     num_threads)
+            t = threading.Thread(name=thread_name, target=_stealing_worker,
+                                 args=(weakref.ref(self, weakref_cb),
+                                       self._work_queue,
+                                       self._initializer,
+                                       self._initargs))
+            t.daemon = True
+            t.start()
+            self._threads.add(t)
+            _threads_queues[t] = self._work_queue
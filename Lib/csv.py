@@ -3,7 +3,9 @@
 csv.py - read/write/investigate CSV files
 """
 
+import os
 import re
+from collections import Counter
 from _csv import Error, __version__, writer, reader, register_dialect, \
                  unregister_dialect, get_dialect, list_dialects, \
                  field_size_limit, \
@@ -18,7 +20,7 @@ __all__ = ["QUOTE_MINIMAL", "QUOTE_ALL", "QUOTE_NONNUMERIC", "QUOTE_NONE",
            "field_size_limit", "reader", "writer",
            "register_dialect", "get_dialect", "list_dialects", "Sniffer",
            "unregister_dialect", "__version__", "DictReader", "DictWriter",
-           "unix_dialect"]
+           "unix_dialect", "read_columns", "parallel_reader"]
 
 class Dialect:
     """Describe a CSV dialect.
@@ -77,6 +79,154 @@ class unix_dialect(Dialect):
 register_dialect("unix", unix_dialect)
 
 
+def read_columns(f, dialect="excel", dtypes=None, rows=-1, **fmtparams):
+    """Read CSV data from *f* column-wise.
+
+    Returns a list of columns, each holding one field per record.  Each
+    item of *dtypes* gives the type of the matching column: str, int,
+    float or None to keep the field as parsed, or an array typecode such
+    as 'q' or 'd' to get the column as an array.array.
+    """
+    return reader(f, dialect, **fmtparams).read_columns(rows, dtypes)
+
+
+_DIALECT_PARAMS = ("delimiter", "quotechar", "escapechar", "doublequote",
+                   "skipinitialspace", "lineterminator", "quoting", "strict")
+
+def _parse_chunk(path, encoding, params, columns, chunk):
+    # Runs in a worker process: parse the records in [start, end).
+    start, end = chunk
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    rdr = reader(StringIO(data.decode(encoding), newline=''), **params)
+    if columns:
+        return rdr.read_columns()
+    return list(rdr)
+
+def _chunk_boundaries(f, size, chunksize, quotechar):
+    """Yield (start, end) offsets of chunks of f that begin at a record.
+
+    A newline only ends a record if it is preceded by an even number of
+    quote characters, so the number of quotes seen so far is tracked while
+    looking for a newline after each tentative split point.
+    """
+    blocksize = 1 << 20
+    pos = start = 0
+    quotes = 0
+    while start < size:
+        target = start + chunksize
+        if target >= size:
+            break
+        # count the quotes up to the tentative split point
+        f.seek(pos)
+        while pos < target:
+            block = f.read(min(blocksize, target - pos))
+            if quotechar:
+                quotes += block.count(quotechar)
+            pos += len(block)
+        # advance to the first newline outside a quoted field
+        end = None
+        while end is None:
+            block = f.read(blocksize)
+            if not block:
+                break
+            i = 0
+            while True:
+                j = block.find(b'\n', i)
+                if j < 0:
+                    if quotechar:
+                        quotes += block.count(quotechar, i)
+                    pos += len(block)
+                    break
+                if quotechar:
+                    quotes += block.count(quotechar, i, j)
+                if not quotes & 1:
+                    end = pos + j + 1
+                    pos = end
+                    break
+                i = j + 1
+        if end is None or end >= size:
+            break
+        yield start, end
+        start = end
+    yield start, size
+
+def parallel_reader(path, dialect="excel", workers=None, chunksize=None,
+                    encoding=None, columns=False, **fmtparams):
+    """Parse the CSV file at *path* using a pool of worker processes.
+
+    The file is split into chunks at record boundaries and the chunks
+    are parsed in parallel.  Rows are yielded in file order, like the
+    ones of reader().  If *columns* is true, one list of columns (see
+    read_columns()) is yielded per chunk instead.
+
+    Record boundaries are found by counting quote characters, which a
+    quote character in an unquoted field throws off: the file is only
+    split if the dialect is strict, so that a chunk ending inside a
+    quoted field raises Error.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from functools import partial
+
+    d = _Dialect(dialect, **fmtparams)
+    params = {name: getattr(d, name) for name in _DIALECT_PARAMS}
+    if encoding is None:
+        import locale
+        encoding = locale.getpreferredencoding(False)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    size = os.stat(path).st_size
+    if chunksize is None:
+        chunksize = max(size // (workers * 4), 1 << 20)
+    if chunksize <= 0:
+        raise ValueError("chunksize must be greater than 0")
+
+    quotechar = None
+    if d.quoting != QUOTE_NONE:
+        quotechar = d.quotechar.encode(encoding)
+    if (d.escapechar is not None or
+            '\n'.encode(encoding) != b'\n' or
+            (quotechar is not None and len(quotechar) != 1) or
+            (quotechar is not None and not d.strict)):
+        # Escaped newlines and encodings where the newline or quote is not
+        # a single byte cannot be split safely, nor can quotes be trusted
+        # to mark quoted fields unless a wrong split raises an error:
+        # parse the file as a whole.
+        chunks = [(0, size)]
+    else:
+        with open(path, 'rb') as f:
+            chunks = list(_chunk_boundaries(f, size, chunksize, quotechar))
+
+    parse = partial(_parse_chunk, path, encoding, params, columns)
+    if len(chunks) == 1:
+        # not worth starting worker processes
+        result = parse(chunks[0])
+        if columns:
+            yield result
+        else:
+            yield from result
+        return
+
+    workers = min(workers, len(chunks))
+    executor = ProcessPoolExecutor(workers)
+    results = executor.map(parse, chunks, buffersize=2 * workers)
+    try:
+        for result in results:
+            if columns:
+                yield result
+            else:
+                yield from result
+    except BaseException:
+        # Also reached when the generator is closed early: don't wait for
+        # the chunks whose results will not be used.
+        results.close()
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    else:
+        executor.shutdown()
+
+
 class DictReader:
     def __init__(self, f, fieldnames=None, restkey=None, restval=None,
                  dialect="excel", *args, **kwds):
@@ -154,7 +304,147 @@ class DictWriter:
         return self.writer.writerow(self._dict_to_list(rowdict))
 
     def writerows(self, rowdicts):
-        return self.writer.writerows(map(self._dict_to_list, rowdicts))
+        if type(self)._dict_to_list is not DictWriter._dict_to_list:
+            # respect overridden row conversion
+            return self.writer.writerows(map(self._dict_to_list, rowdicts))
+        # The C writer projects the dicts onto the fieldnames itself and
+        # writes the output in batches.
+        fieldset = None
+        if self.extrasaction == "raise":
+            fieldset = frozenset(self.fieldnames)
+        return self.writer._writedicts(rowdicts, tuple(self.fieldnames),
+                                       self.restval, fieldset)
+
+def _is_delim(c):
+    # matches the regular expression class [^\w\n"']
+    return not (c.isalnum() or c in '_\n"\'')
+
+class _NextMatch:
+    """Find the first match of a pattern at or after a position.
+
+    Searches are expected to start at increasing positions, so the last
+    result is reused as long as it lies after the new start position.
+    This keeps the cost of all the searches linear in the data size.
+    """
+    def __init__(self, data, pattern):
+        self.search = re.compile(pattern).search
+        self.data = data
+        self.start = len(data) + 1
+        self.result = -1
+
+    def __call__(self, start):
+        if not (self.start <= start and
+                (self.result < 0 or start <= self.result)):
+            m = self.search(self.data, start)
+            self.result = m.start() if m else -1
+            self.start = start
+        return self.result
+
+def _find_quoted(data):
+    r"""Return the quoted fields which Sniffer uses to guess the quotechar.
+
+    This returns a (quote, delim, space) tuple for each non-overlapping
+    match of the first of the following regular expressions with matches,
+    compiled with the DOTALL and MULTILINE flags:
+
+        (?P<delim>[^\w\n"'])(?P<space> ?)(?P<quote>["']).*?(?P=quote)(?P=delim)
+        (?:^|\n)(?P<quote>["']).*?(?P=quote)(?P<delim>[^\w\n"'])(?P<space> ?)
+        (?P<delim>[^\w\n"'])(?P<space> ?)(?P<quote>["']).*?(?P=quote)(?:$|\n)
+        (?:^|\n)(?P<quote>["']).*?(?P=quote)(?:$|\n)
+
+    delim and space are None for the last expression.  Searching with these
+    expressions directly takes quadratic time when quotes are unbalanced, as
+    every candidate opening quote scans to the end of the data; here the
+    closing quote is found with searches that are shared between candidates.
+    """
+    quote_positions = [m.start() for m in re.finditer('["\']', data)]
+    # candidate opening quotes preceded by a delimiter, as (start of the
+    # match, delim, space, quote position), in the order they are tried
+    after_delim = []
+    for k in quote_positions:
+        if k >= 2 and data[k-1] == ' ' and _is_delim(data[k-2]):
+            after_delim.append((k - 2, data[k-2], ' ', k))
+        if k >= 1 and _is_delim(data[k-1]):
+            after_delim.append((k - 1, data[k-1], '', k))
+    # candidate opening quotes at the start of a line
+    at_line_start = [k for k in quote_positions
+                     if k == 0 or data[k-1] == '\n']
+
+    finders = {}
+    def find(pattern, start):
+        if pattern not in finders:
+            finders[pattern] = _NextMatch(data, pattern)
+        return finders[pattern](start)
+
+    # ,".*?",
+    matches = []
+    pos = 0
+    for m, delim, space, k in after_delim:
+        if m >= pos:
+            q = data[k]
+            j = find(re.escape(q + delim), k + 1)
+            if j >= 0:
+                matches.append((q, delim, space))
+                pos = j + 2
+    if matches:
+        return matches
+
+    #  ".*?",
+    for k in at_line_start:
+        if k >= pos:
+            q = data[k]
+            j = find(q + r'[^\w\n"\']', k + 1)
+            if j >= 0:
+                space = ' ' if data[j+2:j+3] == ' ' else ''
+                matches.append((q, data[j+1], space))
+                pos = j + 2 + len(space)
+    if matches:
+        return matches
+
+    # ,".*?"
+    for m, delim, space, k in after_delim:
+        if m >= pos:
+            q = data[k]
+            j = find(q + r'(?:\n|\Z)', k + 1)
+            if j >= 0:
+                matches.append((q, delim, space))
+                pos = j + 1
+    if matches:
+        return matches
+
+    #  ".*?" (no delim, no space)
+    for k in at_line_start:
+        if k >= pos:
+            q = data[k]
+            j = find(q + r'(?:\n|\Z)', k + 1)
+            if j >= 0:
+                matches.append((q, None, None))
+                pos = j + 1
+    return matches
+
+
+def _has_doublequote(data, quote, delim):
+    r"""Return true if a field of data contains three quotes or more.
+
+    This is equivalent to searching data with the regular expression
+
+        ((delim)|^)\W*quote[^delim\n]*quote[^delim\n]*quote\W*((delim)|$)
+
+    in MULTILINE mode, but takes linear time.
+    """
+    if not delim:
+        return any(line.count(quote) >= 3 for line in data.split('\n'))
+    for field in re.split('[%s\n]' % re.escape(delim), data):
+        if field.count(quote) >= 3:
+            # only non-word characters may surround the quotes
+            first = field.index(quote)
+            last = field.rindex(quote)
+            if not (_word_search(field, 0, first) or
+                    _word_search(field, last + 1)):
+                return True
+    return False
+
+_word_search = re.compile(r'\w').search
 
 # Guard Sniffer's type checking against builds that exclude complex()
 try:
@@ -167,9 +457,20 @@ class Sniffer:
     "Sniffs" the format of a CSV file (i.e. delimiter, quotechar)
     Returns a Dialect object.
     '''
-    def __init__(self):
+    def __init__(self, sample_limit=None):
         # in case there is more than one possible delimiter
         self.preferred = [',', '\t', ';', ' ', ':']
+        # maximum number of characters of a sample to analyze
+        self.sample_limit = sample_limit
+
+
+    def _limit_sample(self, sample):
+        limit = self.sample_limit
+        if limit is None or len(sample) <= limit:
+            return sample
+        # cut at a line boundary if possible
+        end = sample.rfind('\n', 0, limit) + 1
+        return sample[:end or limit]
 
 
     def sniff(self, sample, delimiters=None):
@@ -177,6 +478,7 @@ class Sniffer:
         Returns a dialect (or None) corresponding to the sample
         """
 
+        sample = self._limit_sample(sample)
         quotechar, doublequote, delimiter, skipinitialspace = \
                    self._guess_quote_and_delimiter(sample, delimiters)
         if not delimiter:
@@ -213,40 +515,20 @@ class Sniffer:
         this way.
         """
 
-        matches = []
-        for restr in (r'(?P<delim>[^\w\n"\'])(?P<space> ?)(?P<quote>["\']).*?(?P=quote)(?P=delim)', # ,".*?",
-                      r'(?:^|\n)(?P<quote>["\']).*?(?P=quote)(?P<delim>[^\w\n"\'])(?P<space> ?)',   #  ".*?",
-                      r'(?P<delim>[^\w\n"\'])(?P<space> ?)(?P<quote>["\']).*?(?P=quote)(?:$|\n)',   # ,".*?"
-                      r'(?:^|\n)(?P<quote>["\']).*?(?P=quote)(?:$|\n)'):                            #  ".*?" (no delim, no space)
-            regexp = re.compile(restr, re.DOTALL | re.MULTILINE)
-            matches = regexp.findall(data)
-            if matches:
-                break
-
+        matches = _find_quoted(data)
         if not matches:
             # (quotechar, doublequote, delimiter, skipinitialspace)
             return ('', False, None, 0)
         quotes = {}
         delims = {}
         spaces = 0
-        groupindex = regexp.groupindex
-        for m in matches:
-            n = groupindex['quote'] - 1
-            key = m[n]
-            if key:
-                quotes[key] = quotes.get(key, 0) + 1
-            try:
-                n = groupindex['delim'] - 1
-                key = m[n]
-            except KeyError:
-                continue
-            if key and (delimiters is None or key in delimiters):
-                delims[key] = delims.get(key, 0) + 1
-            try:
-                n = groupindex['space'] - 1
-            except KeyError:
+        for quote, delim, space in matches:
+            quotes[quote] = quotes.get(quote, 0) + 1
+            if delim is None:
                 continue
-            if m[n]:
+            if delimiters is None or delim in delimiters:
+                delims[delim] = delims.get(delim, 0) + 1
+            if space:
                 spaces += 1
 
         quotechar = max(quotes, key=quotes.get)
@@ -263,16 +545,7 @@ class Sniffer:
 
         # if we see an extra quote between delimiters, we've got a
         # double quoted format
-        dq_regexp = re.compile(
-                               r"((%(delim)s)|^)\W*%(quote)s[^%(delim)s\n]*%(quote)s[^%(delim)s\n]*%(quote)s\W*((%(delim)s)|$)" % \
-                               {'delim':re.escape(delim), 'quote':quotechar}, re.MULTILINE)
-
-
-
-        if dq_regexp.search(data):
-            doublequote = True
-        else:
-            doublequote = False
+        doublequote = _has_doublequote(data, quotechar, delim)
 
         return (quotechar, doublequote, delim, skipinitialspace)
 
@@ -298,30 +571,45 @@ class Sniffer:
 
         data = list(filter(None, data.split('\n')))
 
-        ascii = [chr(c) for c in range(127)] # 7-bit ASCII
-
         # build frequency tables
         chunkLength = min(10, len(data))
         iteration = 0
         charFrequency = {}
+        # characters whose frequency table has no entry for 0 yet
+        noZero = set()
         modes = {}
         delims = {}
+        lines = 0
         start, end = 0, chunkLength
         while start < len(data):
             iteration += 1
             for line in data[start:end]:
-                for char in ascii:
-                    metaFrequency = charFrequency.get(char, {})
-                    # must count even if frequency is 0
-                    freq = line.count(char)
+                # Only count the characters present in the line; the number
+                # of lines without a character is derived from the total.
+                counts = Counter(line)
+                for char in noZero.difference(counts):
+                    charFrequency[char][0] = 0
+                noZero.intersection_update(counts)
+                for char, freq in counts.items():
+                    if char >= '\x7f': # 7-bit ASCII only
+                        continue
+                    metaFrequency = charFrequency.get(char)
+                    if metaFrequency is None:
+                        if lines:
+                            metaFrequency = {0: 0}
+                        else:
+                            metaFrequency = {}
+                            noZero.add(char)
+                        charFrequency[char] = metaFrequency
                     # value is the mode
                     metaFrequency[freq] = metaFrequency.get(freq, 0) + 1
-                    charFrequency[char] = metaFrequency
+                lines += 1
 
-            for char in charFrequency.keys():
-                items = list(charFrequency[char].items())
-                if len(items) == 1 and items[0][0] == 0:
-                    continue
+            for char, metaFrequency in charFrequency.items():
+                if 0 in metaFrequency:
+                    metaFrequency[0] = 0
+                    metaFrequency[0] = lines - sum(metaFrequency.values())
+                items = list(metaFrequency.items())
                 # get the mode of the frequencies
                 if len(items) > 1:
                     modes[char] = max(items, key=lambda x: x[1])
@@ -390,6 +678,7 @@ class Sniffer:
         # Finally, a 'vote' is taken at the end for each column, adding or
         # subtracting from the likelihood of the first row being a header.
 
+        sample = self._limit_sample(sample)
         rdr = reader(StringIO(sample), self.sniff(sample))
 
         header = next(rdr) # assume first row is header
@@ -37,7 +37,7 @@ __all__ = ['BASIC_FORMAT', 'BufferingFormatter', 'CRITICAL', 'DEBUG', 'ERROR',
            'exception', 'fatal', 'getLevelName', 'getLogger', 'getLoggerClass',
            'info', 'log', 'makeLogRecord', 'setLoggerClass', 'shutdown',
            'warn', 'warning', 'getLogRecordFactory', 'setLogRecordFactory',
-           'lastResort', 'raiseExceptions']
+           'lastResort', 'raiseExceptions', 'LazyLogRecord']
 
 import threading
 
@@ -185,6 +185,18 @@ _srcfile = os.path.normcase(addLevelName.__code__.co_filename)
 #if not hasattr(sys, '_getframe'):
 #    _srcfile = None
 
+#
+# _codeFilenames caches the normalized filename of the code objects seen by
+# findCaller(), so that walking the stack doesn't normalize the filename of
+# every frame on every call. It is cleared when it grows too large, so that
+# code objects which are created dynamically aren't kept alive forever.
+# It maps id(code) to (code, filename): code objects compare equal when
+# only their filenames differ, and holding the code object keeps its id
+# from being reused.
+#
+_codeFilenames = {}
+_CODE_FILENAMES_MAX = 1000
+
 
 def _checkLevel(level):
     if isinstance(level, int):
@@ -369,6 +381,144 @@ class LogRecord(object):
             msg = msg % self.args
         return msg
 
+#
+#   Lazily computed attributes of LazyLogRecord. Each function takes the
+#   record's __dict__ and returns the value of the attribute.
+#
+
+def _lazy_filename(d):
+    try:
+        return os.path.basename(d['pathname'])
+    except (TypeError, ValueError, AttributeError):
+        return d['pathname']
+
+def _lazy_module(d):
+    try:
+        return os.path.splitext(os.path.basename(d['pathname']))[0]
+    except (TypeError, ValueError, AttributeError):
+        return "Unknown module"
+
+def _lazy_processName(d):
+    if not logMultiprocessing: # pragma: no cover
+        return None
+    mp = sys.modules.get('multiprocessing')
+    if mp is not None:
+        # See the comment in LogRecord.__init__.
+        try:
+            return mp.current_process().name
+        except Exception: #pragma: no cover
+            pass
+    return 'MainProcess'
+
+_lazyRecordAttrs = {
+    'filename': _lazy_filename,
+    'module': _lazy_module,
+    'processName': _lazy_processName,
+}
+
+class _LazyRecordDict(dict):
+    """
+    The __dict__ of a LazyLogRecord, which computes the lazy attributes
+    when they are first looked up, and before it is iterated over so that
+    copies of it are complete.
+    """
+    __slots__ = ()
+
+    def __missing__(self, key):
+        compute = _lazyRecordAttrs.get(key)
+        if compute is None:
+            raise KeyError(key)
+        value = self[key] = compute(self)
+        return value
+
+    def __contains__(self, key):
+        return dict.__contains__(self, key) or key in _lazyRecordAttrs
+
+    def _materialize(self):
+        for key in _lazyRecordAttrs:
+            if not dict.__contains__(self, key):
+                self[key]
+        return self
+
+    def __iter__(self):
+        return dict.__iter__(self._materialize())
+
+    def keys(self):
+        return dict.keys(self._materialize())
+
+    def values(self):
+        return dict.values(self._materialize())
+
+    def items(self):
+        return dict.items(self._materialize())
+
+    def copy(self):
+        return dict(self._materialize())
+
+class LazyLogRecord(LogRecord):
+    """
+    A LogRecord which defers computing the attributes that are costly to
+    compute and rarely formatted (filename, module and processName) until
+    they are first used.
+
+    The values are the same as those of a LogRecord, except that
+    processName is looked up in the process which uses it; records which
+    are passed to another process are pickled with all of their attributes
+    computed. Use setLogRecordFactory(LazyLogRecord) to make loggers create
+    these records.
+    """
+    def __init__(self, name, level, pathname, lineno,
+                 msg, args, exc_info, func=None, sinfo=None, **kwargs):
+        """
+        Initialize a logging record with interesting information.
+        """
+        self.__dict__ = _LazyRecordDict()
+        ct = time.time()
+        self.name = name
+        self.msg = msg
+        # See LogRecord.__init__ for the handling of a sole mapping argument.
+        if (args and len(args) == 1 and isinstance(args[0], collections.abc.Mapping)
+            and args[0]):
+            args = args[0]
+        self.args = args
+        self.levelname = getLevelName(level)
+        self.levelno = level
+        self.pathname = pathname
+        self.exc_info = exc_info
+        self.exc_text = None      # used to cache the traceback text
+        self.stack_info = sinfo
+        self.lineno = lineno
+        self.funcName = func
+        self.created = ct
+        self.msecs = (ct - int(ct)) * 1000
+        self.relativeCreated = (ct - _startTime) * 1000
+        if logThreads:
+            self.thread = threading.get_ident()
+            self.threadName = threading.current_thread().name
+        else: # pragma: no cover
+            self.thread = None
+            self.threadName = None
+        if logProcesses and hasattr(os, 'getpid'):
+            self.process = os.getpid()
+        else:
+            self.process = None
+
+    def __getattr__(self, name):
+        # Only called for attributes which have not been computed yet.
+        compute = _lazyRecordAttrs.get(name)
+        if compute is None:
+            raise AttributeError("%r object has no attribute %r" %
+                                 (type(self).__name__, name))
+        d = self.__dict__
+        value = d[name] = compute(d)
+        return value
+
+    def __getstate__(self):
+        state = self.__dict__
+        if isinstance(state, _LazyRecordDict):
+            state = state.copy()
+        return state
+
 #
 #   Determine which class to use when instantiating log records.
 #
@@ -420,8 +570,22 @@ class PercentStyle(object):
     def __init__(self, fmt):
         self._fmt = fmt or self.default_format
 
+    @property
+    def _fmt(self):
+        return self._format_string
+
+    @_fmt.setter
+    def _fmt(self, fmt):
+        # usesTime() is called for every record: search the format for the
+        # time once, when it is set.
+        self._format_string = fmt
+        self._uses_time = self._searchTime(fmt)
+
+    def _searchTime(self, fmt):
+        return fmt.find(self.asctime_search) >= 0
+
     def usesTime(self):
-        return self._fmt.find(self.asctime_search) >= 0
+        return self._uses_time
 
     def validate(self):
         """Validate the input format, ensure it matches the correct style"""
@@ -447,7 +611,7 @@ class StrFormatStyle(PercentStyle):
     field_spec = re.compile(r'^(\d+|\w+)(\.\w+|\[[^]]+\])*$')
 
     def _format(self, record):
-        return self._fmt.format(**record.__dict__)
+        return self._fmt.format_map(record.__dict__)
 
     def validate(self):
         """Validate the input format, ensure it is the correct string formatting style"""
@@ -476,9 +640,31 @@ class StringTemplateStyle(PercentStyle):
     def __init__(self, fmt):
         self._fmt = fmt or self.default_format
         self._tpl = Template(self._fmt)
+        self._pct = self._compile(self._tpl)
+
+    @staticmethod
+    def _compile(tpl):
+        """
+        Translate a template into an equivalent %-format string, which is
+        much faster to substitute, or return None if it has an invalid
+        placeholder (substituting it then raises the usual error).
+        """
+        parts = []
+        pos = 0
+        for m in tpl.pattern.finditer(tpl.template):
+            parts.append(tpl.template[pos:m.start()].replace('%', '%%'))
+            pos = m.end()
+            named = m.group('named') or m.group('braced')
+            if named is not None:
+                parts.append('%%(%s)s' % named)
+            elif m.group('escaped') is not None:
+                parts.append('$')
+            else:
+                return None
+        parts.append(tpl.template[pos:].replace('%', '%%'))
+        return ''.join(parts)
 
-    def usesTime(self):
-        fmt = self._fmt
+    def _searchTime(self, fmt):
         return fmt.find('$asctime') >= 0 or fmt.find(self.asctime_format) >= 0
 
     def validate(self):
@@ -496,6 +682,8 @@ class StringTemplateStyle(PercentStyle):
             raise ValueError('invalid format: no fields')
 
     def _format(self, record):
+        if self._pct is not None:
+            return self._pct % record.__dict__
         return self._tpl.substitute(**record.__dict__)
 
 
@@ -581,6 +769,10 @@ class Formatter(object):
     default_time_format = '%Y-%m-%d %H:%M:%S'
     default_msec_format = '%s,%03d'
 
+    # The time formatted by the last call to formatTime(), which is reused
+    # by records created within the same second: (key, formatted time)
+    _last_time = None
+
     def formatTime(self, record, datefmt=None):
         """
         Return the creation time of the specified LogRecord as formatted text.
@@ -599,11 +791,18 @@ class Formatter(object):
         formatters, for example if you want all logging times to be shown in GMT,
         set the 'converter' attribute in the Formatter class.
         """
-        ct = self.converter(record.created)
+        created = record.created
+        fmt = datefmt or self.default_time_format
+        key = (created // 1, fmt, self.converter)
+        last = self._last_time
+        if last is not None and last[0] == key:
+            t = last[1]
+        else:
+            t = time.strftime(fmt, self.converter(created))
+            self._last_time = (key, t)
         if datefmt:
-            s = time.strftime(datefmt, ct)
+            s = t
         else:
-            t = time.strftime(self.default_time_format, ct)
             s = self.default_msec_format % (t, record.msecs)
         return s
 
@@ -1122,9 +1321,17 @@ class FileHandler(StreamHandler):
     """
     A handler class which writes formatted logging records to disk files.
     """
-    def __init__(self, filename, mode='a', encoding=None, delay=False, errors=None):
+    def __init__(self, filename, mode='a', encoding=None, delay=False, errors=None,
+                 bufferSize=0, flushInterval=None):
         """
         Open the specified file and use it as the stream for logging.
+
+        By default, the file is flushed after every record. If bufferSize
+        and/or flushInterval are specified, it is only flushed once that
+        many characters have been written since the last flush, or that
+        many seconds after the first record written since the last flush
+        (by a timer thread), whichever comes first; and when the handler
+        is closed.
         """
         # Issue #27493: add support for Path objects to be passed in
         filename = os.fspath(filename)
@@ -1135,6 +1342,11 @@ class FileHandler(StreamHandler):
         self.encoding = encoding
         self.errors = errors
         self.delay = delay
+        self.bufferSize = bufferSize
+        self.flushInterval = flushInterval
+        self._unflushed = 0
+        self._lastFlush = time.monotonic()
+        self._flushTimer = None
         if delay:
             #We don't open the stream, but we still need to call the
             #Handler constructor to set level, formatter, lock etc.
@@ -1143,6 +1355,15 @@ class FileHandler(StreamHandler):
         else:
             StreamHandler.__init__(self, self._open())
 
+    def createLock(self):
+        """
+        Acquire a thread lock for serializing access to the underlying I/O.
+        """
+        Handler.createLock(self)
+        # Also called in the child after a fork, where the thread of the
+        # flush timer does not exist.
+        self._flushTimer = None
+
     def close(self):
         """
         Closes the stream.
@@ -1170,19 +1391,75 @@ class FileHandler(StreamHandler):
         Open the current base file with the (original) mode and encoding.
         Return the resulting stream.
         """
-        return open(self.baseFilename, self.mode, encoding=self.encoding,
-                    errors=self.errors)
+        buffering = -1
+        if self.bufferSize > io.DEFAULT_BUFFER_SIZE:
+            buffering = self.bufferSize
+        return open(self.baseFilename, self.mode, buffering=buffering,
+                    encoding=self.encoding, errors=self.errors)
+
+    def flush(self):
+        """
+        Flushes the stream.
+        """
+        self.acquire()
+        try:
+            StreamHandler.flush(self)
+            self._unflushed = 0
+            if self.flushInterval is not None:
+                self._lastFlush = time.monotonic()
+                if self._flushTimer is not None:
+                    self._flushTimer.cancel()
+                    self._flushTimer = None
+        finally:
+            self.release()
+
+    def _timedFlush(self):
+        # Run by the flush timer thread.
+        self.acquire()
+        try:
+            self._flushTimer = None
+            if self.stream and self._unflushed:
+                try:
+                    self.flush()
+                except Exception:
+                    # The error is reported by the next emit() or close(),
+                    # which flush again.
+                    pass
+        finally:
+            self.release()
 
     def emit(self, record):
         """
         Emit a record.
 
         If the stream was not opened because 'delay' was specified in the
-        constructor, open it before calling the superclass's emit.
+        constructor, open it before calling the superclass's emit. If a
+        buffer size or flush interval was specified, the stream is only
+        flushed once either is exceeded; a timer flushes it once the flush
+        interval has passed if no other record is emitted.
         """
         if self.stream is None:
             self.stream = self._open()
-        StreamHandler.emit(self, record)
+        if not self.bufferSize and self.flushInterval is None:
+            StreamHandler.emit(self, record)
+            return
+        try:
+            msg = self.format(record) + self.terminator
+            self.stream.write(msg)
+            self._unflushed += len(msg)
+            if ((self.bufferSize and self._unflushed >= self.bufferSize) or
+                (self.flushInterval is not None and
+                 time.monotonic() - self._lastFlush >= self.flushInterval)):
+                self.flush()
+            elif self.flushInterval is not None and self._flushTimer is None:
+                timer = threading.Timer(self.flushInterval, self._timedFlush)
+                timer.daemon = True
+                timer.start()
+                self._flushTimer = timer
+        except RecursionError:  # See issue 36272
+            raise
+        except Exception:
+            self.handleError(record)
 
     def __repr__(self):
         level = getLevelName(self.level)
@@ -1520,7 +1797,14 @@ class Logger(Filterer):
         rv = "(unknown file)", 0, "(unknown function)", None
         while hasattr(f, "f_code"):
             co = f.f_code
-            filename = os.path.normcase(co.co_filename)
+            entry = _codeFilenames.get(id(co))
+            if entry is not None:
+                filename = entry[1]
+            else:
+                filename = os.path.normcase(co.co_filename)
+                if len(_codeFilenames) >= _CODE_FILENAMES_MAX:
+                    _codeFilenames.clear()
+                _codeFilenames[id(co)] = (co, filename)
             if filename == _srcfile:
                 f = f.f_back
                 continue
@@ -1940,6 +2224,10 @@ def basicConfig(**kwargs):
               created FileHandler, causing it to be used when the file is
               opened in text mode. If not specified, the default value is
               `backslashreplace`.
+    async_    If this keyword is specified as true, the handlers are not added
+              to the root logger directly but wrapped in a
+              logging.handlers.AsyncHandler, so that records are written
+              from a background thread.
 
     Note that you could specify a stream created using open(filename, mode)
     rather than passing the filename and mode in. However, it should be
@@ -1961,7 +2249,7 @@ def basicConfig(**kwargs):
        Added the ``force`` parameter.
 
     .. versionchanged:: 3.9
-       Added the ``encoding`` and ``errors`` parameters.
+       Added the ``encoding``, ``errors`` and ``async_`` parameters.
     """
     # Add thread safety in case someone mistakenly calls
     # basicConfig() from multiple threads
@@ -2006,6 +2294,10 @@ def basicConfig(**kwargs):
             for h in handlers:
                 if h.formatter is None:
                     h.setFormatter(fmt)
+            if kwargs.pop("async_", False):
+                from logging.handlers import AsyncHandler
+                handlers = [AsyncHandler(handlers)]
+            for h in handlers:
                 root.addHandler(h)
             level = kwargs.pop("level", None)
             if level is not None:
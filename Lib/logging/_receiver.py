@@ -0,0 +1,64 @@
+"""
+A server receiving the records sent by logging.handlers.JSONSocketHandler,
+available as logging.handlers.JSONRecordReceiver.  It lives in its own
+module so that importing logging.handlers doesn't import socketserver.
+"""
+
+import json
+import logging
+import socketserver
+import struct
+
+from logging.handlers import DEFAULT_TCP_LOGGING_PORT
+
+
+class JSONRecordReceiver(socketserver.ThreadingTCPServer):
+    """
+    A simple TCP server which receives records sent by JSONSocketHandler and
+    passes each of them to handleRecord(), which by default has them handled
+    by the logger of the same name in this process.
+
+    It is intended for local use and testing; call serve_forever() to run it
+    and shutdown() from another thread to stop it.
+    """
+    allow_reuse_address = True
+    daemon_threads = True
+
+    # Connections sending a larger record are dropped.
+    max_record_size = 1 << 24
+
+    class RequestHandler(socketserver.StreamRequestHandler):
+        """
+        Reads length-prefixed JSON records from a connection until it is
+        closed by the client.
+        """
+        def handle(self):
+            server = self.server
+            while True:
+                header = self.rfile.read(4)
+                if len(header) < 4:
+                    break
+                slen = struct.unpack(">L", header)[0]
+                if slen > server.max_record_size:
+                    break
+                data = self.rfile.read(slen)
+                if len(data) < slen:
+                    break
+                record = logging.makeLogRecord(json.loads(data))
+                server.handleRecord(record)
+
+    def __init__(self, host='localhost', port=DEFAULT_TCP_LOGGING_PORT,
+                 handler=None):
+        """
+        Bind the server to the given address. handler is the request handler
+        class, JSONRecordReceiver.RequestHandler by default.
+        """
+        socketserver.ThreadingTCPServer.__init__(self, (host, port),
+                                                 handler or self.RequestHandler)
+
+    def handleRecord(self, record):
+        """
+        Handle a received record by passing it to the logger of the same
+        name. Override this to process records differently.
+        """
+        logging.getLogger(record.name).handle(record)
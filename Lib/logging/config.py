@@ -732,6 +732,18 @@ class DictConfigurator(BaseConfigurator):
                 except Exception as e:
                     raise ValueError('Unable to set target handler '
                                      '%r' % config['target']) from e
+            elif issubclass(klass, logging.handlers.AsyncHandler) and\
+                'handlers' in config:
+                try:
+                    names = config['handlers']
+                    hs = [self.config['handlers'][name] for name in names]
+                    if not all(isinstance(h, logging.Handler) for h in hs):
+                        config.update(config_copy)  # restore for deferred cfg
+                        raise TypeError('target not configured yet')
+                    config['handlers'] = hs
+                except Exception as e:
+                    raise ValueError('Unable to set target handlers '
+                                     '%r' % config['handlers']) from e
             elif issubclass(klass, logging.handlers.SMTPHandler) and\
                 'mailhost' in config:
                 config['mailhost'] = self.as_tuple(config['mailhost'])
@@ -24,10 +24,13 @@ To use, simply 'import logging.handlers' and log away!
 """
 
 import logging, socket, os, pickle, struct, time, re
+import codecs
 from stat import ST_DEV, ST_INO, ST_MTIME
+import json
 import queue
 import threading
 import copy
+import collections
 
 #
 # Some constants...
@@ -51,13 +54,15 @@ class BaseRotatingHandler(logging.FileHandler):
     namer = None
     rotator = None
 
-    def __init__(self, filename, mode, encoding=None, delay=False, errors=None):
+    def __init__(self, filename, mode, encoding=None, delay=False, errors=None,
+                 bufferSize=0, flushInterval=None):
         """
         Use the specified filename for streamed logging
         """
         logging.FileHandler.__init__(self, filename, mode=mode,
                                      encoding=encoding, delay=delay,
-                                     errors=errors)
+                                     errors=errors, bufferSize=bufferSize,
+                                     flushInterval=flushInterval)
         self.mode = mode
         self.encoding = encoding
         self.errors = errors
@@ -116,13 +121,17 @@ class BaseRotatingHandler(logging.FileHandler):
         else:
             self.rotator(source, dest)
 
+# Encodings writing ASCII characters as one byte each, by codec name.
+_ASCII_ENCODINGS = frozenset(['ascii', 'utf-8', 'iso8859-1', 'cp1252'])
+
 class RotatingFileHandler(BaseRotatingHandler):
     """
     Handler for logging to a set of files, which switches from one file
     to the next when the current file reaches a certain size.
     """
     def __init__(self, filename, mode='a', maxBytes=0, backupCount=0,
-                 encoding=None, delay=False, errors=None):
+                 encoding=None, delay=False, errors=None, bufferSize=0,
+                 flushInterval=None):
         """
         Open the specified file and use it as the stream for logging.
 
@@ -142,6 +151,10 @@ class RotatingFileHandler(BaseRotatingHandler):
         respectively.
 
         If maxBytes is zero, rollover never occurs.
+
+        The size of the current log file is only queried when it is opened;
+        after that, the size in bytes of each record written is added to it.
+        See FileHandler for bufferSize and flushInterval.
         """
         # If rotation/rollover is wanted, it doesn't make sense to use another
         # mode. If for example 'w' were specified, then if there were multiple
@@ -150,10 +163,21 @@ class RotatingFileHandler(BaseRotatingHandler):
         # on each run.
         if maxBytes > 0:
             mode = 'a'
-        BaseRotatingHandler.__init__(self, filename, mode, encoding=encoding,
-                                     delay=delay, errors=errors)
         self.maxBytes = maxBytes
         self.backupCount = backupCount
+        # The stream whose size is being tracked, its size in bytes, whether
+        # ASCII text is written to it as one byte per character, an encoder
+        # measuring other text, and the last record formatted by
+        # shouldRollover() with its formatted text.
+        self._sizeStream = None
+        self._size = 0
+        self._asciiBytes = False
+        self._encoder = None
+        self._formatted = None
+        BaseRotatingHandler.__init__(self, filename, mode, encoding=encoding,
+                                     delay=delay, errors=errors,
+                                     bufferSize=bufferSize,
+                                     flushInterval=flushInterval)
 
     def doRollover(self):
         """
@@ -188,12 +212,56 @@ class RotatingFileHandler(BaseRotatingHandler):
         if self.stream is None:                 # delay was set...
             self.stream = self._open()
         if self.maxBytes > 0:                   # are we rolling over?
-            msg = "%s\n" % self.format(record)
-            self.stream.seek(0, 2)  #due to non-posix-compliant Windows feature
-            if self.stream.tell() + len(msg) >= self.maxBytes:
+            msg = self.format(record)
+            # Save the formatted record for emit(), via format().
+            self._formatted = (record, msg)
+            if self._sizeStream is not self.stream:
+                self.stream.seek(0, 2)  #due to non-posix-compliant Windows feature
+                self._size = self.stream.tell()
+                self._sizeStream = self.stream
+                self._setEncoder(self.stream)
+            length = self._byteLength(msg + self.terminator)
+            if self._size + length >= self.maxBytes:
                 return 1
+            self._size += length
         return 0
 
+    def _setEncoder(self, stream):
+        encoding = getattr(stream, 'encoding', None)
+        if encoding is None:
+            self._asciiBytes = False
+            self._encoder = None
+            return
+        self._asciiBytes = codecs.lookup(encoding).name in _ASCII_ENCODINGS
+        errors = getattr(stream, 'errors', None) or 'strict'
+        self._encoder = codecs.getincrementalencoder(encoding)(errors)
+        if self._size:
+            # Like the stream, don't count a BOM when appending to a file.
+            self._encoder.setstate(0)
+
+    def _byteLength(self, text):
+        # The number of bytes text takes in the file, once encoded and with
+        # its newlines translated.
+        if (self._asciiBytes and text.isascii()) or self._encoder is None:
+            length = len(text)
+        else:
+            length = len(self._encoder.encode(text))
+        if os.linesep != '\n':
+            length += text.count('\n') * (len(os.linesep) - 1)
+        return length
+
+    def format(self, record):
+        """
+        Format the specified record, reusing the text formatted by
+        shouldRollover() for the same record.
+        """
+        formatted = self._formatted
+        if formatted is not None:
+            self._formatted = None
+            if formatted[0] is record:
+                return formatted[1]
+        return BaseRotatingHandler.format(self, record)
+
 class TimedRotatingFileHandler(BaseRotatingHandler):
     """
     Handler for logging to a file, rotating the log file at certain timed
@@ -204,9 +272,11 @@ class TimedRotatingFileHandler(BaseRotatingHandler):
     """
     def __init__(self, filename, when='h', interval=1, backupCount=0,
                  encoding=None, delay=False, utc=False, atTime=None,
-                 errors=None):
+                 errors=None, bufferSize=0, flushInterval=None):
         BaseRotatingHandler.__init__(self, filename, 'a', encoding=encoding,
-                                     delay=delay, errors=errors)
+                                     delay=delay, errors=errors,
+                                     bufferSize=bufferSize,
+                                     flushInterval=flushInterval)
         self.when = when.upper()
         self.backupCount = backupCount
         self.utc = utc
@@ -594,10 +664,10 @@ class SocketHandler(logging.Handler):
                 self.sock.close()
                 self.sock = None  # so we can call createSocket next time
 
-    def makePickle(self, record):
+    def makeDict(self, record):
         """
-        Pickles the record in binary format with a length prefix, and
-        returns it ready for transmission across the socket.
+        Return the attribute dictionary of the record, in the form which is
+        sent across the socket.
         """
         ei = record.exc_info
         if ei:
@@ -612,7 +682,14 @@ class SocketHandler(logging.Handler):
         d['exc_info'] = None
         # Issue #25685: delete 'message' if present: redundant with 'msg'
         d.pop('message', None)
-        s = pickle.dumps(d, 1)
+        return d
+
+    def makePickle(self, record):
+        """
+        Pickles the record in binary format with a length prefix, and
+        returns it ready for transmission across the socket.
+        """
+        s = pickle.dumps(self.makeDict(record), 1)
         slen = struct.pack(">L", len(s))
         return slen + s
 
@@ -659,6 +736,84 @@ class SocketHandler(logging.Handler):
         finally:
             self.release()
 
+class JSONSocketHandler(SocketHandler):
+    """
+    A SocketHandler which sends each record's attribute dictionary as a
+    JSON object, encoded in UTF-8 and prefixed with its length as a 4-byte
+    big-endian integer, rather than as a pickle, so that the receiving end
+    never has to unpickle data received from the network. Attributes whose
+    values cannot be represented in JSON are sent as their str().
+
+    Records can be sent in batches: they are buffered until capacity records
+    are waiting, a record of severity flushLevel or higher is emitted, or
+    the handler is flushed or closed, and then written to the socket with a
+    single call.
+
+    Use JSONRecordReceiver, or the makeLogRecord function on each decoded
+    object, at the receiving end.
+    """
+    def __init__(self, host, port, capacity=1, flushLevel=logging.ERROR):
+        """
+        Initializes the handler with a specific host address and port, the
+        number of records to send at a time and the level which causes the
+        buffered records to be sent immediately.
+        """
+        SocketHandler.__init__(self, host, port)
+        self.capacity = capacity
+        self.flushLevel = flushLevel
+        self.buffer = []
+
+    def makePickle(self, record):
+        """
+        Encodes the record as JSON with a length prefix, and returns it
+        ready for transmission across the socket.
+
+        The name of this method is kept from SocketHandler, which pickles.
+        """
+        s = json.dumps(self.makeDict(record), default=str,
+                       separators=(',', ':')).encode('utf-8')
+        slen = struct.pack(">L", len(s))
+        return slen + s
+
+    def emit(self, record):
+        """
+        Emit a record.
+
+        Encodes the record and buffers it, sending the buffered records to
+        the socket if the batch is full or the record is severe enough.
+        """
+        try:
+            self.buffer.append(self.makePickle(record))
+            if (len(self.buffer) >= self.capacity or
+                    record.levelno >= self.flushLevel):
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        """
+        Sends the buffered records to the socket. As with single records,
+        they are silently dropped if the socket cannot be written to.
+        """
+        self.acquire()
+        try:
+            if self.buffer:
+                data = b''.join(self.buffer)
+                self.buffer = []
+                self.send(data)
+        finally:
+            self.release()
+
+    def close(self):
+        """
+        Sends any buffered records, then closes the socket.
+        """
+        try:
+            self.flush()
+        finally:
+            SocketHandler.close(self)
+
+
 class DatagramHandler(SocketHandler):
     """
     A handler class which writes logging records, in pickle format, to
@@ -1423,18 +1578,28 @@ class QueueListener(object):
     This class implements an internal threaded listener which watches for
     LogRecords being added to a queue, removes them and passes them to a
     list of handlers for processing.
+
+    Up to batch_size records which are already waiting in the queue are
+    removed at a time. If handler_threads is true, each handler is given a
+    thread of its own, so that a slow handler does not hold up the others.
     """
     _sentinel = None
 
-    def __init__(self, queue, *handlers, respect_handler_level=False):
+    def __init__(self, queue, *handlers, respect_handler_level=False,
+                 batch_size=1, handler_threads=False):
         """
         Initialise an instance with the specified queue and
         handlers.
         """
+        if batch_size < 1:
+            raise ValueError('batch_size must be at least 1')
         self.queue = queue
         self.handlers = handlers
         self._thread = None
         self.respect_handler_level = respect_handler_level
+        self.batch_size = batch_size
+        self.handler_threads = handler_threads
+        self._workers = []
 
     def dequeue(self, block):
         """
@@ -1450,8 +1615,17 @@ class QueueListener(object):
         Start the listener.
 
         This starts up a background thread to monitor the queue for
-        LogRecords to process.
-        """
+        LogRecords to process, and one thread per handler if handler_threads
+        is true.
+        """
+        if self.handler_threads:
+            for handler in self.handlers:
+                q = queue.SimpleQueue()
+                t = threading.Thread(target=self._handler_worker,
+                                     args=(handler, q))
+                t.daemon = True
+                t.start()
+                self._workers.append((q, t))
         self._thread = t = threading.Thread(target=self._monitor)
         t.daemon = True
         t.start()
@@ -1482,6 +1656,39 @@ class QueueListener(object):
             if process:
                 handler.handle(record)
 
+    def handle_batch(self, records):
+        """
+        Handle a list of records removed from the queue together.
+
+        Without handler threads, this just calls handle() for each record.
+        Otherwise, the records are prepared and passed to the thread of
+        each handler, which handles those it should process.
+        """
+        if not self._workers:
+            for record in records:
+                self.handle(record)
+            return
+        records = [self.prepare(record) for record in records]
+        for q, t in self._workers:
+            q.put(records)
+
+    def _handler_worker(self, handler, q):
+        """
+        Pass the records sent by handle_batch() to a single handler.
+
+        This method runs on a separate, internal thread per handler, which
+        terminates when it receives None.
+        """
+        respect_handler_level = self.respect_handler_level
+        while True:
+            records = q.get()
+            if records is None:
+                break
+            for record in records:
+                if (not respect_handler_level or
+                        record.levelno >= handler.level):
+                    handler.handle(record)
+
     def _monitor(self):
         """
         Monitor the queue for records, and ask the handler
@@ -1492,17 +1699,29 @@ class QueueListener(object):
         """
         q = self.queue
         has_task_done = hasattr(q, 'task_done')
+        batch_size = self.batch_size
         while True:
             try:
                 record = self.dequeue(True)
-                if record is self._sentinel:
-                    if has_task_done:
-                        q.task_done()
+            except queue.Empty:
+                break
+            records = []
+            while record is not self._sentinel:
+                records.append(record)
+                if len(records) >= batch_size:
                     break
-                self.handle(record)
+                try:
+                    record = self.dequeue(False)
+                except queue.Empty:
+                    break
+            if records:
+                self.handle_batch(records)
+            if has_task_done:
+                for _ in range(len(records)):
+                    q.task_done()
+            if record is self._sentinel:
                 if has_task_done:
                     q.task_done()
-            except queue.Empty:
                 break
 
     def enqueue_sentinel(self):
@@ -1526,3 +1745,202 @@ class QueueListener(object):
         self.enqueue_sentinel()
         self._thread.join()
         self._thread = None
+        for q, t in self._workers:
+            q.put(None)
+        for q, t in self._workers:
+            t.join()
+        self._workers = []
+
+
+class AsyncHandler(logging.Handler):
+    """
+    A handler which passes records on to a list of other handlers from a
+    background thread, so that threads doing the logging do not have to wait
+    for slow I/O.
+
+    Records are held in a buffer of at most *capacity* entries until the
+    writer thread gets to them. The *overflow* policy decides what happens
+    when a record arrives while the buffer is full: 'block' waits for space,
+    'drop' discards the record, and 'count' discards it too but later emits
+    a WARNING record saying how many records were lost. Dropped records are
+    counted in the *dropped* attribute under both of the latter policies.
+    """
+    overflow_policies = ('block', 'drop', 'count')
+
+    def __init__(self, handlers, capacity=10000, overflow='block'):
+        """
+        Initialise the handler with the handlers records are passed to, the
+        buffer capacity and the overflow policy.
+        """
+        if overflow not in self.overflow_policies:
+            raise ValueError('overflow must be one of %s, not %r' %
+                             (', '.join(map(repr, self.overflow_policies)),
+                              overflow))
+        if capacity <= 0:
+            raise ValueError('capacity must be greater than zero')
+        logging.Handler.__init__(self)
+        self.handlers = list(handlers)
+        self.capacity = capacity
+        self.overflow = overflow
+        self.dropped = 0
+
+    def createLock(self):
+        """
+        Create the locks and reset the buffer.
+
+        This is also called in the child after a fork, where the writer
+        thread no longer exists and the buffered records are still owned by
+        the parent process, so they are discarded.
+        """
+        logging.Handler.createLock(self)
+        mutex = threading.Lock()
+        self._not_empty = threading.Condition(mutex)
+        self._not_full = threading.Condition(mutex)
+        self._all_done = threading.Condition(mutex)
+        self._buffer = collections.deque()
+        # Sequence numbers of the last record buffered and of the last one
+        # handled by the writer thread, a pending report of dropped records
+        # counting as one record.
+        self._queued = 0
+        self._handled = 0
+        self._unreported = 0
+        self._closed = False
+        self._thread = None
+
+    def _start(self):
+        # Called with the mutex held.
+        self._thread = t = threading.Thread(target=self._monitor,
+                                            name='logging.AsyncHandler')
+        t.daemon = True
+        t.start()
+
+    def handle(self, record):
+        """
+        Conditionally buffer the specified logging record.
+
+        Unlike the base class, the I/O lock is not taken: the wrapped
+        handlers take their own locks on the writer thread.
+        """
+        rv = self.filter(record)
+        if rv:
+            self.emit(record)
+        return rv
+
+    def emit(self, record):
+        """
+        Buffer a record for the writer thread.
+
+        Records logged from the writer thread itself (for example by one
+        of the wrapped handlers) are never subject to the overflow policy,
+        and records emitted after the handler has been closed are passed
+        to the wrapped handlers directly.
+        """
+        try:
+            with self._not_full:
+                if not self._closed:
+                    if self._thread is None:
+                        self._start()
+                    elif (len(self._buffer) >= self.capacity and
+                          threading.current_thread() is not self._thread):
+                        if self.overflow != 'block':
+                            self.dropped += 1
+                            if self.overflow == 'count':
+                                if not self._unreported:
+                                    self._queued += 1
+                                self._unreported += 1
+                            return
+                        while (len(self._buffer) >= self.capacity and
+                               not self._closed):
+                            self._not_full.wait()
+                if not self._closed:
+                    self._buffer.append(record)
+                    self._queued += 1
+                    self._not_empty.notify()
+                    return
+            self._dispatch(record)
+        except Exception:
+            self.handleError(record)
+
+    def _overflow_record(self, count):
+        return logging.LogRecord(__name__, logging.WARNING, __file__, 0,
+                                 '%d log records were dropped because the '
+                                 'AsyncHandler buffer was full', (count,),
+                                 None)
+
+    def _dispatch(self, record):
+        for handler in self.handlers:
+            if record.levelno >= handler.level:
+                try:
+                    handler.handle(record)
+                except Exception:
+                    handler.handleError(record)
+
+    def _monitor(self):
+        """
+        Take all buffered records at once and pass them to the handlers.
+
+        This method runs on a separate, internal thread, which exits once
+        the handler has been closed and the buffer is empty.
+        """
+        while True:
+            with self._not_empty:
+                while (not self._buffer and not self._unreported and
+                       not self._closed):
+                    self._not_empty.wait()
+                records = self._buffer
+                unreported = self._unreported
+                if not records and not unreported:
+                    return
+                self._buffer = collections.deque()
+                self._unreported = 0
+                queued = self._queued
+                self._not_full.notify_all()
+            if unreported:
+                records.append(self._overflow_record(unreported))
+            for record in records:
+                self._dispatch(record)
+            with self._all_done:
+                self._handled = queued
+                self._all_done.notify_all()
+
+    def flush(self):
+        """
+        Wait until the writer thread has handled the records buffered before
+        the call, then flush the wrapped handlers. Records buffered by other
+        threads in the meantime are not waited for.
+        """
+        if threading.current_thread() is not self._thread:
+            with self._all_done:
+                queued = self._queued
+                while (self._thread is not None and self._thread.is_alive()
+                       and self._handled < queued):
+                    self._all_done.wait()
+        for handler in self.handlers:
+            handler.flush()
+
+    def close(self):
+        """
+        Handle any buffered records, stop the writer thread and close the
+        handler. The wrapped handlers are not closed.
+        """
+        with self._not_empty:
+            self._closed = True
+            thread = self._thread
+            self._not_empty.notify()
+            self._not_full.notify_all()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+            self._thread = None
+        logging.Handler.close(self)
+
+
+def __getattr__(name):
+    # JSONRecordReceiver is imported on first use, so that importing the
+    # handlers doesn't import socketserver.
+    global JSONRecordReceiver
+
+    if name == 'JSONRecordReceiver':
+        from logging._receiver import JSONRecordReceiver
+        return JSONRecordReceiver
+
+    raise AttributeError(f"module {__name__} has no attribute {name}")
@@ -0,0 +1,314 @@
+"""Tests for files.py"""
+
+import concurrent.futures
+import io
+import os
+import unittest
+from unittest import mock
+
+import asyncio
+from asyncio import files
+from test import support
+from test.test_asyncio import utils as test_utils
+
+
+def tearDownModule():
+    asyncio.set_event_loop_policy(None)
+
+
+class FileTestsMixin:
+
+    def setUp(self):
+        super().setUp()
+        self.loop = asyncio.new_event_loop()
+        self.set_event_loop(self.loop)
+        self.addCleanup(support.unlink, support.TESTFN)
+        # Do not leave the threads of the shared pool behind.
+        patcher = mock.patch.object(files, '_executor', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.shutdown_executor)
+
+    def shutdown_executor(self):
+        if files._executor is not None:
+            files._executor.shutdown()
+
+    def run_file(self, coro_func, mode='rb', data=None):
+        if data is not None:
+            with open(support.TESTFN, 'wb') as f:
+                f.write(data)
+
+        async def main():
+            async with await asyncio.open_file(support.TESTFN, mode) as f:
+                return await coro_func(f)
+        return self.loop.run_until_complete(main())
+
+    def test_read(self):
+        async def read(f):
+            return [await f.read(4), f.tell(), await f.read(100),
+                    await f.read(100), f.tell()]
+
+        self.assertEqual(self.run_file(read, data=b'spam and eggs'),
+                         [b'spam', 4, b' and eggs', b'', 13])
+
+    def test_read_all(self):
+        data = os.urandom(files._READ_CHUNK_SIZE * 3 + 5)
+
+        async def read(f):
+            await f.seek(5)
+            return await f.read(), f.tell()
+
+        self.assertEqual(self.run_file(read, data=data),
+                         (data[5:], len(data)))
+
+    def test_concurrent_reads(self):
+        data = bytes(range(256)) * 64
+
+        async def read(f):
+            chunks = await asyncio.gather(*[f.read(256) for _ in range(70)])
+            return chunks, f.tell()
+
+        chunks, pos = self.run_file(read, data=data)
+        self.assertEqual(chunks[:64], [bytes(range(256))] * 64)
+        self.assertEqual(chunks[64:], [b''] * 6)
+        self.assertEqual(pos, len(data))
+
+    def test_readinto(self):
+        async def readinto(f):
+            buf = bytearray(8)
+            n = await f.readinto(buf)
+            m = await f.readinto(memoryview(buf)[4:])
+            return n, m, bytes(buf), f.tell()
+
+        self.assertEqual(self.run_file(readinto, data=b'0123456789'),
+                         (8, 2, b'01238967', 10))
+
+    def test_write(self):
+        async def write(f):
+            n = await f.write(b'spam')
+            await f.write(bytearray(b' and '))
+            await f.write(memoryview(b'eggs'))
+            self.assertEqual(await f.write(b''), 0)
+            return n, f.tell()
+
+        self.assertEqual(self.run_file(write, 'wb'), (4, 13))
+        with open(support.TESTFN, 'rb') as f:
+            self.assertEqual(f.read(), b'spam and eggs')
+
+    def test_concurrent_writes(self):
+        chunks = [bytes([i]) * 1000 for i in range(100)]
+
+        async def write(f):
+            await asyncio.gather(*[f.write(chunk) for chunk in chunks])
+            return f.tell()
+
+        self.assertEqual(self.run_file(write, 'wb'), 100000)
+        with open(support.TESTFN, 'rb') as f:
+            self.assertEqual(f.read(), b''.join(chunks))
+
+    def test_write_batches(self):
+        calls = []
+        write_runs = files.AsyncFile._write_runs
+
+        def spy(self, runs):
+            calls.append([(offset, size) for offset, size, _ in runs])
+            return write_runs(self, runs)
+
+        async def write(f):
+            # The first write is made alone, the ones queued while it is
+            # in progress are merged.
+            await asyncio.gather(f.write(b'a'), f.write(b'bc'),
+                                 f.write(b'def'))
+            await f.seek(10)
+            await asyncio.gather(f.write(b'x'), f.write(b'y'))
+
+        with mock.patch.object(files.AsyncFile, '_write_runs', spy):
+            self.run_file(write, 'wb')
+        self.assertEqual(calls, [[(0, 1)], [(1, 5)], [(10, 1)], [(11, 1)]])
+        with open(support.TESTFN, 'rb') as f:
+            self.assertEqual(f.read(), b'abcdef\0\0\0\0xy')
+
+    def test_read_after_write(self):
+        async def readwrite(f):
+            f_write = self.loop.create_task(f.write(b'spam'))
+            await asyncio.sleep(0)
+            await f.seek(0)
+            data = await f.read()
+            await f_write
+            return data
+
+        self.assertEqual(self.run_file(readwrite, 'w+b'), b'spam')
+
+    def test_append(self):
+        async def append(f):
+            start = f.tell()
+            await asyncio.gather(f.write(b' and'), f.write(b' eggs'))
+            return start, f.tell()
+
+        self.assertEqual(self.run_file(append, 'ab', data=b'spam'), (4, 13))
+        with open(support.TESTFN, 'rb') as f:
+            self.assertEqual(f.read(), b'spam and eggs')
+
+    def test_seek(self):
+        async def seek(f):
+            return [await f.seek(3), await f.seek(2, os.SEEK_CUR),
+                    await f.read(1), await f.seek(-1, os.SEEK_END),
+                    await f.read()]
+
+        self.assertEqual(self.run_file(seek, data=b'0123456789'),
+                         [3, 5, b'5', 9, b'9'])
+
+    def test_seek_invalid(self):
+        async def seek(f):
+            with self.assertRaises(ValueError):
+                await f.seek(0, 42)
+            with self.assertRaises(OSError):
+                await f.seek(-1)
+            return f.tell()
+
+        self.assertEqual(self.run_file(seek, data=b'spam'), 0)
+
+    def test_closed(self):
+        async def main():
+            f = await asyncio.open_file(support.TESTFN, 'wb')
+            self.assertFalse(f.closed)
+            await f.write(b'spam')
+            await f.close()
+            self.assertTrue(f.closed)
+            await f.close()
+            with self.assertRaises(ValueError):
+                await f.read()
+            with self.assertRaises(ValueError):
+                await f.write(b'eggs')
+            with self.assertRaises(ValueError):
+                f.tell()
+            return f._raw.closed
+
+        self.assertTrue(self.loop.run_until_complete(main()))
+
+    def test_close_waits_for_writes(self):
+        async def main():
+            f = await asyncio.open_file(support.TESTFN, 'wb')
+            writes = [self.loop.create_task(f.write(b'x' * 1000))
+                      for _ in range(10)]
+            await asyncio.sleep(0)
+            await f.close()
+            self.assertTrue(all(w.done() for w in writes))
+
+        self.loop.run_until_complete(main())
+        self.assertEqual(os.path.getsize(support.TESTFN), 10000)
+
+    def test_cancelled_read(self):
+        async def read(f):
+            task = self.loop.create_task(f.read(4))
+            await asyncio.sleep(0)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            return await f.read()
+
+        self.assertEqual(self.run_file(read, data=b'spam and eggs'),
+                         b' and eggs')
+
+    def test_cancelled_write(self):
+        # A cancelled write is still made.
+        async def write(f):
+            task = self.loop.create_task(f.write(b'spam'))
+            await asyncio.sleep(0)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            await f.write(b' and eggs')
+            await f.flush()
+            return f.tell()
+
+        self.assertEqual(self.run_file(write, 'wb'), 13)
+        with open(support.TESTFN, 'rb') as f:
+            self.assertEqual(f.read(), b'spam and eggs')
+
+    def test_write_no_progress(self):
+        async def write(f):
+            with mock.patch.object(os, 'pwritev', return_value=0), \
+                 mock.patch.object(f, '_raw') as raw:
+                raw.write.return_value = 0
+                with self.assertRaises(OSError):
+                    await f.write(b'spam')
+
+        self.run_file(write, 'wb')
+
+    def test_text_mode(self):
+        async def main():
+            with self.assertRaises(ValueError):
+                await asyncio.open_file(support.TESTFN, 'w')
+
+        self.loop.run_until_complete(main())
+
+    def test_open_error(self):
+        async def main():
+            with self.assertRaises(FileNotFoundError):
+                await asyncio.open_file(support.TESTFN)
+
+        self.loop.run_until_complete(main())
+
+    @unittest.skipUnless(hasattr(os, 'pipe'), 'requires os.pipe()')
+    def test_pipe(self):
+        rfd, wfd = os.pipe()
+
+        async def main():
+            async with await asyncio.open_file(wfd, 'wb') as w:
+                self.assertFalse(w.seekable())
+                with self.assertRaises(io.UnsupportedOperation):
+                    w.tell()
+                await w.write(b'spam')
+            async with await asyncio.open_file(rfd, 'rb') as r:
+                return await r.read()
+
+        self.assertEqual(self.loop.run_until_complete(main()), b'spam')
+
+    def test_repr(self):
+        async def main():
+            f = await asyncio.open_file(support.TESTFN, 'wb')
+            self.assertEqual(repr(f), f"<AsyncFile name={support.TESTFN!r} "
+                                      f"mode='wb'>")
+            await f.close()
+            self.assertEqual(repr(f), f"<AsyncFile name={support.TESTFN!r} "
+                                      f"mode='wb' closed>")
+
+        self.loop.run_until_complete(main())
+
+
+class PositionalFileTests(FileTestsMixin, test_utils.TestCase):
+
+    def test_default_executor(self):
+        async def main():
+            async with await asyncio.open_file(support.TESTFN, 'wb') as f:
+                return f._executor
+
+        executor = self.loop.run_until_complete(main())
+        self.assertIs(executor, files._executor)
+        self.assertEqual(executor._max_workers, files._MAX_WORKERS)
+
+    def test_executor(self):
+        executor = concurrent.futures.ThreadPoolExecutor(1)
+        self.addCleanup(executor.shutdown)
+
+        async def main():
+            async with await asyncio.open_file(support.TESTFN, 'wb',
+                                               executor=executor) as f:
+                await f.write(b'spam')
+                return f._executor
+
+        self.assertIs(self.loop.run_until_complete(main()), executor)
+        self.assertIsNone(files._executor)
+
+
+@unittest.skipUnless(files._HAVE_PREAD and files._HAVE_PWRITE,
+                     'the seek-based fallback is always used')
+@mock.patch.object(files, '_HAVE_PREAD', False)
+@mock.patch.object(files, '_HAVE_PWRITE', False)
+class SeekFileTests(FileTestsMixin, test_utils.TestCase):
+    pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+"""Tests for instruments.py"""
+
+import time
+import unittest
+
+import asyncio
+from test.test_asyncio import utils as test_utils
+
+
+def tearDownModule():
+    asyncio.set_event_loop_policy(None)
+
+
+class RecordingInstrument(asyncio.LoopInstrument):
+
+    def __init__(self):
+        self.iterations = []
+        self.callbacks = []
+
+    def iteration_done(self, *args):
+        self.iterations.append(args)
+
+    def callback_done(self, handle, duration):
+        self.callbacks.append((handle, duration))
+
+
+class LoopInstrumentTests(test_utils.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.loop = asyncio.new_event_loop()
+        self.set_event_loop(self.loop)
+
+    def run_briefly(self):
+        self.loop.run_until_complete(asyncio.sleep(0))
+
+    def test_set_instrument(self):
+        self.assertIsNone(self.loop.get_instrument())
+        with self.assertRaises(TypeError):
+            self.loop.set_instrument(object())
+        instrument = asyncio.LoopStats()
+        self.loop.set_instrument(instrument)
+        self.assertIs(self.loop.get_instrument(), instrument)
+        self.loop.set_instrument(None)
+        self.assertIsNone(self.loop.get_instrument())
+
+    def test_iteration_done(self):
+        instrument = RecordingInstrument()
+        self.loop.set_instrument(instrument)
+        for _ in range(3):
+            self.loop.call_soon(lambda: None)
+        self.loop.call_later(100, lambda: None).cancel()
+        self.loop.call_later(100, lambda: None)
+        self.run_briefly()
+        self.assertTrue(instrument.iterations)
+        callbacks, timers, select_time, run_time, lag = (
+            instrument.iterations[0])
+        self.assertEqual(callbacks, 4)
+        self.assertEqual(timers, 1)
+        self.assertGreaterEqual(select_time, 0)
+        self.assertGreaterEqual(run_time, 0)
+        self.assertEqual(lag, 0)
+        # Callbacks are only timed on demand.
+        self.assertEqual(instrument.callbacks, [])
+
+        self.loop.set_instrument(None)
+        count = len(instrument.iterations)
+        self.run_briefly()
+        self.assertEqual(len(instrument.iterations), count)
+
+    def test_callback_done(self):
+        instrument = RecordingInstrument()
+        instrument.time_callbacks = True
+        self.loop.set_instrument(instrument)
+        handle = self.loop.call_soon(time.sleep, 0.01)
+        cancelled = self.loop.call_soon(lambda: None)
+        cancelled.cancel()
+        self.run_briefly()
+        self.assertIs(instrument.callbacks[0][0], handle)
+        self.assertGreaterEqual(instrument.callbacks[0][1], 0.005)
+        self.assertNotIn(cancelled, [h for h, _ in instrument.callbacks])
+
+    def test_callback_done_debug(self):
+        self.loop.set_debug(True)
+        self.loop.slow_callback_duration = 100
+        self.test_callback_done()
+
+    def check_lag(self):
+        stats = asyncio.LoopStats()
+        self.loop.set_instrument(stats)
+
+        async def main():
+            fired = self.loop.create_future()
+            self.loop.call_later(0.01, fired.set_result, None)
+            # Block the loop past the deadline of the timer.
+            time.sleep(0.05)
+            await fired
+
+        self.loop.run_until_complete(main())
+        self.assertGreaterEqual(stats.max_lag, 0.03)
+
+    def test_lag(self):
+        self.check_lag()
+
+    def test_lag_timer_wheel(self):
+        self.loop.set_timer_wheel(asyncio.TimerWheel())
+        self.check_lag()
+
+
+class LoopStatsTests(test_utils.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.loop = asyncio.new_event_loop()
+        self.set_event_loop(self.loop)
+
+    def test_stats(self):
+        stats = asyncio.LoopStats()
+        self.loop.set_instrument(stats)
+        for _ in range(10):
+            self.loop.call_soon(lambda: None)
+        self.loop.run_until_complete(asyncio.sleep(0.01))
+        self.assertGreater(stats.iterations, 1)
+        self.assertGreaterEqual(stats.callbacks, 10)
+        self.assertGreaterEqual(stats.max_ready, 10)
+        self.assertGreater(stats.select_time, 0.005)
+        self.assertEqual(stats.histogram, [0] * 6)
+        self.assertIn('iterations=', repr(stats))
+
+        stats.reset()
+        self.assertEqual((stats.iterations, stats.callbacks), (0, 0))
+
+    def test_histogram(self):
+        stats = asyncio.LoopStats(time_callbacks=True, buckets=(1.0, 0.005))
+        self.assertEqual(stats.buckets, (0.005, 1.0))
+        self.loop.set_instrument(stats)
+        self.loop.call_soon(time.sleep, 0.01)
+        self.loop.run_until_complete(asyncio.sleep(0))
+        self.assertEqual(stats.histogram[1], 1)
+        self.assertEqual(sum(stats.histogram), stats.callbacks)
+        self.assertGreaterEqual(stats.max_callback_time, 0.01)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,271 @@
+"""Tests for pools.py"""
+
+import socket
+import unittest
+
+import asyncio
+from test.test_asyncio import utils as test_utils
+
+try:
+    import ssl
+except ImportError:
+    ssl = None
+
+
+def tearDownModule():
+    asyncio.set_event_loop_policy(None)
+
+
+class ConnectionPoolTests(test_utils.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.loop = asyncio.new_event_loop()
+        self.set_event_loop(self.loop)
+        self.connections = 0
+        self.handlers = set()
+
+    async def handle_client(self, reader, writer):
+        # Echo lines until b'quit\n' or EOF.
+        self.connections += 1
+        self.handlers.add(asyncio.current_task())
+        try:
+            while True:
+                line = await reader.readline()
+                if not line or line == b'quit\n':
+                    break
+                writer.write(line)
+                await writer.drain()
+        finally:
+            writer.close()
+
+    def run_with_server(self, main, *, ssl=None):
+        async def runner():
+            server = await asyncio.start_server(
+                self.handle_client, '127.0.0.1', 0, ssl=ssl)
+            try:
+                return await main(server.sockets[0].getsockname()[1])
+            finally:
+                server.close()
+                await server.wait_closed()
+                for handler in self.handlers:
+                    handler.cancel()
+                await asyncio.gather(*self.handlers, return_exceptions=True)
+
+        return self.loop.run_until_complete(runner())
+
+    async def echo(self, reader, writer, data=b'ping\n'):
+        writer.write(data)
+        await writer.drain()
+        self.assertEqual(await reader.readline(), data)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            asyncio.ConnectionPool('127.0.0.1', 80, max_size=0)
+        with self.assertRaises(ValueError):
+            asyncio.ConnectionPool('127.0.0.1', 80, idle_timeout=-1)
+        with self.assertRaises(ValueError):
+            asyncio.ConnectionPool('127.0.0.1', 80, server_hostname='a')
+
+    def test_reuse(self):
+        async def main(port):
+            async with asyncio.ConnectionPool('127.0.0.1', port) as pool:
+                reader, writer = await pool.acquire()
+                await self.echo(reader, writer)
+                pool.release(writer)
+                self.assertEqual((pool.size, pool.idle), (1, 1))
+                for _ in range(3):
+                    async with pool.connection() as (reader2, writer2):
+                        self.assertIs(writer2, writer)
+                        await self.echo(reader2, writer2)
+                self.assertEqual((pool.size, pool.idle), (1, 1))
+            self.assertEqual((pool.size, pool.idle), (0, 0))
+            self.assertTrue(writer.is_closing())
+
+        self.run_with_server(main)
+        self.assertEqual(self.connections, 1)
+
+    def test_max_size(self):
+        async def main(port):
+            async with asyncio.ConnectionPool('127.0.0.1', port,
+                                              max_size=2) as pool:
+                first = await pool.acquire()
+                second = await pool.acquire()
+                self.assertIsNot(first[1], second[1])
+                third = self.loop.create_task(pool.acquire())
+                await asyncio.sleep(0.01)
+                self.assertFalse(third.done())
+                pool.release(second[1])
+                self.assertIs((await third)[1], second[1])
+                self.assertEqual(pool.size, 2)
+                # Closing a connection makes room for a new one.
+                fourth = self.loop.create_task(pool.acquire())
+                await asyncio.sleep(0.01)
+                self.assertFalse(fourth.done())
+                pool.release(first[1], discard=True)
+                reader, writer = await fourth
+                self.assertIsNot(writer, first[1])
+                await self.echo(reader, writer)
+                pool.release(writer)
+                pool.release(second[1])
+
+        self.run_with_server(main)
+        self.assertEqual(self.connections, 3)
+
+    def test_cancelled_waiter(self):
+        async def main(port):
+            async with asyncio.ConnectionPool('127.0.0.1', port,
+                                              max_size=1) as pool:
+                reader, writer = await pool.acquire()
+                waiters = [self.loop.create_task(pool.acquire())
+                           for _ in range(2)]
+                await asyncio.sleep(0)
+                pool.release(writer)
+                # The woken up waiter is cancelled: the other one gets
+                # the connection.
+                waiters[0].cancel()
+                self.assertIs((await waiters[1])[1], writer)
+                with self.assertRaises(asyncio.CancelledError):
+                    await waiters[0]
+                pool.release(writer)
+
+        self.run_with_server(main)
+
+    def test_server_closed_connection(self):
+        async def main(port):
+            async with asyncio.ConnectionPool('127.0.0.1', port) as pool:
+                reader, writer = await pool.acquire()
+                writer.write(b'quit\n')
+                pool.release(writer)
+                self.assertEqual(pool.idle, 1)
+                await reader.read()
+                reader2, writer2 = await pool.acquire()
+                self.assertIsNot(writer2, writer)
+                self.assertTrue(writer.is_closing())
+                await self.echo(reader2, writer2)
+                pool.release(writer2)
+                self.assertEqual(pool.size, 1)
+
+        self.run_with_server(main)
+        self.assertEqual(self.connections, 2)
+
+    def test_unread_data(self):
+        async def main(port):
+            async with asyncio.ConnectionPool('127.0.0.1', port) as pool:
+                reader, writer = await pool.acquire()
+                writer.write(b'ping\n')
+                await reader.readexactly(1)
+                pool.release(writer)
+                self.assertEqual((pool.size, pool.idle), (0, 0))
+
+        self.run_with_server(main)
+
+    def test_discard_on_error(self):
+        async def main(port):
+            async with asyncio.ConnectionPool('127.0.0.1', port) as pool:
+                with self.assertRaises(ZeroDivisionError):
+                    async with pool.connection() as (reader, writer):
+                        1/0
+                self.assertTrue(writer.is_closing())
+                self.assertEqual((pool.size, pool.idle), (0, 0))
+
+        self.run_with_server(main)
+
+    def test_idle_timeout(self):
+        async def main(port):
+            async with asyncio.ConnectionPool('127.0.0.1', port,
+                                              idle_timeout=0.01) as pool:
+                reader, writer = await pool.acquire()
+                pool.release(writer)
+                self.assertEqual(pool.idle, 1)
+                await asyncio.sleep(0.05)
+                self.assertEqual((pool.size, pool.idle), (0, 0))
+                self.assertTrue(writer.is_closing())
+
+        self.run_with_server(main)
+
+    def test_close(self):
+        async def main(port):
+            pool = asyncio.ConnectionPool('127.0.0.1', port, max_size=1)
+            reader, writer = await pool.acquire()
+            waiter = self.loop.create_task(pool.acquire())
+            await asyncio.sleep(0)
+            await pool.close()
+            self.assertTrue(pool.is_closed())
+            with self.assertRaises(RuntimeError):
+                await waiter
+            with self.assertRaises(RuntimeError):
+                await pool.acquire()
+            self.assertFalse(writer.is_closing())
+            pool.release(writer)
+            self.assertTrue(writer.is_closing())
+            self.assertEqual(pool.size, 0)
+
+        self.run_with_server(main)
+
+    def test_release_unknown_connection(self):
+        async def main(port):
+            async with asyncio.ConnectionPool('127.0.0.1', port) as pool:
+                reader, writer = await pool.acquire()
+                pool.release(writer)
+                with self.assertRaises(ValueError):
+                    pool.release(writer)
+
+        self.run_with_server(main)
+
+    def test_connection_error(self):
+        async def main(port):
+            pool = asyncio.ConnectionPool('127.0.0.1', port, max_size=1)
+            with self.assertRaises(OSError):
+                await pool.acquire()
+            self.assertEqual(pool.size, 0)
+
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+        sock.close()
+        self.loop.run_until_complete(main(port))
+
+    @unittest.skipIf(ssl is None, 'No ssl module')
+    def test_ssl_session_reuse(self):
+        async def main(port):
+            async with asyncio.ConnectionPool(
+                    '127.0.0.1', port,
+                    ssl=test_utils.simple_client_sslcontext(),
+                    server_hostname='') as pool:
+                reader, writer = await pool.acquire()
+                ssl_object = writer.get_extra_info('ssl_object')
+                self.assertFalse(ssl_object.session_reused)
+                await self.echo(reader, writer)
+                pool.release(writer)
+                reader2, writer2 = await pool.acquire()
+                self.assertIs(writer2, writer)
+                pool.release(writer2, discard=True)
+
+                reader, writer = await pool.acquire()
+                self.assertIsNot(writer, writer2)
+                ssl_object = writer.get_extra_info('ssl_object')
+                self.assertTrue(ssl_object.session_reused)
+                await self.echo(reader, writer)
+                pool.release(writer)
+
+        self.run_with_server(main, ssl=test_utils.simple_server_sslcontext())
+        self.assertEqual(self.connections, 2)
+
+    @unittest.skipIf(ssl is None, 'No ssl module')
+    def test_start_tls_server_side_session(self):
+        async def main(port):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            with self.assertRaises(ValueError):
+                await self.loop.start_tls(
+                    writer.transport, writer._protocol,
+                    test_utils.simple_server_sslcontext(),
+                    server_side=True, ssl_session=object())
+            writer.close()
+            await writer.wait_closed()
+
+        self.run_with_server(main)
+
+
+if __name__ == '__main__':
+    unittest.main()
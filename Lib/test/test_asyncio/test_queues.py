@@ -635,6 +635,126 @@ class PriorityQueueTests(_QueueTestBase):
         self.assertEqual([1, 2, 3], items)
 
 
+class QueueBatchTests(_QueueTestBase):
+
+    def test_get_many(self):
+        async def test():
+            q = asyncio.Queue()
+            q.put_nowait(1)
+            q.put_nowait(2)
+            q.put_nowait(3)
+            self.assertEqual(await q.get_many(2), [1, 2])
+            self.assertEqual(await q.get_many(), [3])
+            self.assertTrue(q.empty())
+            with self.assertRaises(ValueError):
+                await q.get_many(0)
+
+        self.loop.run_until_complete(test())
+
+    def test_get_many_wait(self):
+        async def test():
+            q = asyncio.Queue()
+            getter = self.loop.create_task(q.get_many())
+            await asyncio.sleep(0)
+            self.assertFalse(getter.done())
+            await q.put_many([1, 2, 3])
+            self.assertEqual(await getter, [1, 2, 3])
+
+        self.loop.run_until_complete(test())
+
+    def test_get_many_wakes_up_putters(self):
+        async def test():
+            q = asyncio.Queue(maxsize=2)
+            await q.put_many([1, 2])
+            putters = [self.loop.create_task(q.put(i)) for i in (3, 4, 5)]
+            await asyncio.sleep(0)
+            self.assertEqual(await q.get_many(), [1, 2])
+            await asyncio.sleep(0)
+            self.assertEqual([p.done() for p in putters],
+                             [True, True, False])
+            self.assertEqual(await q.get_many(), [3, 4])
+            await putters[2]
+            self.assertEqual(q.get_nowait(), 5)
+
+        self.loop.run_until_complete(test())
+
+    def test_put_many(self):
+        async def test():
+            q = asyncio.Queue()
+            await q.put_many(iter(range(5)))
+            self.assertEqual(q.qsize(), 5)
+            self.assertEqual(q._unfinished_tasks, 5)
+            await q.put_many([])
+            self.assertEqual(await q.get_many(), list(range(5)))
+
+        self.loop.run_until_complete(test())
+
+    def test_put_many_maxsize(self):
+        async def test():
+            q = asyncio.Queue(maxsize=2)
+            putter = self.loop.create_task(q.put_many(range(5)))
+            await asyncio.sleep(0)
+            self.assertFalse(putter.done())
+            self.assertEqual(q.qsize(), 2)
+            items = []
+            while len(items) < 5:
+                items.extend(await q.get_many())
+            await putter
+            self.assertEqual(items, list(range(5)))
+
+        self.loop.run_until_complete(test())
+
+    def test_put_many_wakes_up_getters(self):
+        async def test():
+            q = asyncio.Queue()
+            getters = [self.loop.create_task(q.get()) for _ in range(3)]
+            await asyncio.sleep(0)
+            await q.put_many([1, 2])
+            await asyncio.sleep(0)
+            self.assertEqual([g.done() for g in getters],
+                             [True, True, False])
+            self.assertEqual([g.result() for g in getters[:2]], [1, 2])
+            getters[2].cancel()
+
+        self.loop.run_until_complete(test())
+
+    def test_put_many_cancelled(self):
+        async def test():
+            q = asyncio.Queue(maxsize=2)
+            putter = self.loop.create_task(q.put_many([1, 2, 3]))
+            await asyncio.sleep(0)
+            putter.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await putter
+            # The items put before the cancellation stay in the queue.
+            self.assertEqual(await q.get_many(), [1, 2])
+            self.assertFalse(q._putters)
+
+        self.loop.run_until_complete(test())
+
+    def test_join(self):
+        async def test():
+            q = asyncio.Queue()
+            await q.put_many([1, 2])
+            joiner = self.loop.create_task(q.join())
+            for item in await q.get_many():
+                q.task_done()
+            await joiner
+
+        self.loop.run_until_complete(test())
+
+    def test_order(self):
+        async def test(q_class):
+            q = q_class()
+            await q.put_many([1, 3, 2])
+            return await q.get_many()
+
+        self.assertEqual(self.loop.run_until_complete(
+            test(asyncio.LifoQueue)), [2, 3, 1])
+        self.assertEqual(self.loop.run_until_complete(
+            test(asyncio.PriorityQueue)), [1, 2, 3])
+
+
 class _QueueJoinTestMixin:
 
     q_class = None
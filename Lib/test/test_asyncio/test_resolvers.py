@@ -0,0 +1,198 @@
+"""Tests for resolvers.py"""
+
+import socket
+import unittest
+from unittest import mock
+
+import asyncio
+from test.test_asyncio import utils as test_utils
+
+
+def tearDownModule():
+    asyncio.set_event_loop_policy(None)
+
+
+class StubResolver(asyncio.AbstractResolver):
+    """Resolve names from a dict, counting the lookups."""
+
+    def __init__(self, hosts, loop):
+        self.hosts = hosts
+        self.loop = loop
+        self.calls = []
+        self.waiter = None
+
+    async def getaddrinfo(self, host, port, *,
+                          family=0, type=0, proto=0, flags=0):
+        self.calls.append((host, port, family, type, proto, flags))
+        if self.waiter is not None:
+            await self.waiter
+        try:
+            addr = self.hosts[host]
+        except KeyError:
+            raise socket.gaierror(socket.EAI_NONAME, 'Name not known')
+        return [(socket.AF_INET, type or socket.SOCK_STREAM, proto, '',
+                 (addr, port))]
+
+
+class CachingResolverTests(test_utils.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.loop = asyncio.new_event_loop()
+        self.set_event_loop(self.loop)
+        self.stub = StubResolver({'example.com': '127.0.0.1',
+                                  'example.org': '127.0.0.2'}, self.loop)
+
+    def resolve(self, resolver, host, port=80, **kwargs):
+        return self.loop.run_until_complete(
+            resolver.getaddrinfo(host, port, **kwargs))
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            asyncio.CachingResolver(ttl=-1)
+        with self.assertRaises(ValueError):
+            asyncio.CachingResolver(maxsize=0)
+
+    def test_default_resolver(self):
+        resolver = asyncio.CachingResolver()
+        self.assertIsInstance(resolver.resolver, asyncio.ThreadedResolver)
+
+    def test_cache(self):
+        resolver = asyncio.CachingResolver(self.stub)
+        info = self.resolve(resolver, 'example.com')
+        self.assertEqual(info[0][4], ('127.0.0.1', 80))
+        self.assertEqual(self.resolve(resolver, 'example.com'), info)
+        self.assertEqual(len(self.stub.calls), 1)
+        self.assertEqual((resolver.hits, resolver.misses), (1, 1))
+        # Every argument is part of the key.
+        self.resolve(resolver, 'example.com', 443)
+        self.resolve(resolver, 'example.com', family=socket.AF_INET)
+        self.assertEqual(len(self.stub.calls), 3)
+
+    def test_result_is_a_copy(self):
+        resolver = asyncio.CachingResolver(self.stub)
+        self.resolve(resolver, 'example.com').clear()
+        self.assertTrue(self.resolve(resolver, 'example.com'))
+
+    def test_ttl(self):
+        resolver = asyncio.CachingResolver(self.stub, ttl=10)
+        with mock.patch('asyncio.resolvers.time.monotonic', return_value=100):
+            self.resolve(resolver, 'example.com')
+        with mock.patch('asyncio.resolvers.time.monotonic', return_value=109):
+            self.resolve(resolver, 'example.com')
+        self.assertEqual(len(self.stub.calls), 1)
+        with mock.patch('asyncio.resolvers.time.monotonic', return_value=110):
+            self.resolve(resolver, 'example.com')
+        self.assertEqual(len(self.stub.calls), 2)
+
+    def test_no_caching(self):
+        resolver = asyncio.CachingResolver(self.stub, ttl=0)
+        self.resolve(resolver, 'example.com')
+        self.resolve(resolver, 'example.com')
+        self.assertEqual(len(self.stub.calls), 2)
+
+    def test_maxsize(self):
+        resolver = asyncio.CachingResolver(self.stub, maxsize=1)
+        self.resolve(resolver, 'example.com')
+        self.resolve(resolver, 'example.org')
+        self.resolve(resolver, 'example.org')
+        self.assertEqual(len(self.stub.calls), 2)
+        self.resolve(resolver, 'example.com')
+        self.assertEqual(len(self.stub.calls), 3)
+
+    def test_errors_not_cached(self):
+        resolver = asyncio.CachingResolver(self.stub)
+        for _ in range(2):
+            with self.assertRaises(socket.gaierror):
+                self.resolve(resolver, 'unknown.invalid')
+        self.assertEqual(len(self.stub.calls), 2)
+
+    def test_clear(self):
+        resolver = asyncio.CachingResolver(self.stub)
+        self.resolve(resolver, 'example.com')
+        resolver.clear()
+        self.resolve(resolver, 'example.com')
+        self.assertEqual(len(self.stub.calls), 2)
+
+    def test_concurrent_lookups(self):
+        resolver = asyncio.CachingResolver(self.stub)
+        self.stub.waiter = self.loop.create_future()
+
+        async def main():
+            lookups = [self.loop.create_task(
+                           resolver.getaddrinfo('example.com', 80))
+                       for _ in range(3)]
+            await asyncio.sleep(0)
+            # A cancelled caller does not cancel the lookup of the others.
+            lookups[0].cancel()
+            await asyncio.sleep(0)
+            self.stub.waiter.set_result(None)
+            return await asyncio.gather(*lookups, return_exceptions=True)
+
+        results = self.loop.run_until_complete(main())
+        self.assertIsInstance(results[0], asyncio.CancelledError)
+        self.assertEqual(results[1], results[2])
+        self.assertEqual(len(self.stub.calls), 1)
+
+    def test_eager_task_factory(self):
+        self.loop.set_task_factory(asyncio.eager_task_factory)
+        resolver = asyncio.CachingResolver(self.stub)
+
+        async def main():
+            return [await resolver.getaddrinfo('example.com', 80)
+                    for _ in range(2)]
+
+        first, second = self.loop.run_until_complete(main())
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.stub.calls), 1)
+        self.assertEqual(resolver._lookups, {})
+
+
+class LoopResolverTests(test_utils.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.loop = asyncio.new_event_loop()
+        self.set_event_loop(self.loop)
+
+    def test_set_resolver(self):
+        self.assertIsNone(self.loop.get_resolver())
+        with self.assertRaises(TypeError):
+            self.loop.set_resolver(object())
+        resolver = asyncio.CachingResolver()
+        self.loop.set_resolver(resolver)
+        self.assertIs(self.loop.get_resolver(), resolver)
+        self.loop.set_resolver(None)
+        self.assertIsNone(self.loop.get_resolver())
+
+    def test_threaded_resolver(self):
+        self.loop.set_resolver(asyncio.ThreadedResolver())
+        infos = self.loop.run_until_complete(self.loop.getaddrinfo(
+            '127.0.0.1', 80, type=socket.SOCK_STREAM))
+        self.assertEqual(infos, socket.getaddrinfo(
+            '127.0.0.1', 80, type=socket.SOCK_STREAM))
+
+    def test_create_connection(self):
+        stub = StubResolver({'server.test': '127.0.0.1'}, self.loop)
+        resolver = asyncio.CachingResolver(stub)
+        self.loop.set_resolver(resolver)
+
+        async def main():
+            server = await asyncio.start_server(
+                lambda r, w: w.close(), '127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            for _ in range(3):
+                reader, writer = await asyncio.open_connection(
+                    'server.test', port)
+                writer.close()
+                await writer.wait_closed()
+            server.close()
+            await server.wait_closed()
+
+        self.loop.run_until_complete(main())
+        self.assertEqual(len(stub.calls), 1)
+        self.assertEqual(resolver.hits, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -14,6 +14,7 @@ from asyncio.selector_events import BaseSelectorEventLoop
 from asyncio.selector_events import _SelectorTransport
 from asyncio.selector_events import _SelectorSocketTransport
 from asyncio.selector_events import _SelectorDatagramTransport
+from asyncio.selector_events import _HAVE_SENDMSG
 from test.test_asyncio import utils as test_utils
 
 
@@ -39,6 +40,10 @@ def list_to_buffer(l=()):
     return bytearray().join(l)
 
 
+# The size of a write which is queued without being copied.
+LARGE_WRITE_SIZE = _SelectorSocketTransport._small_write_size
+
+
 def close_transport(transport):
     # Don't call transport.close() because the event loop and the selector
     # are mocked
@@ -680,18 +685,18 @@ class SelectorSocketTransportTests(test_utils.TestCase):
 
     def test_write_no_data(self):
         transport = self.socket_transport()
-        transport._buffer.extend(b'data')
+        transport._buffer.append(b'data')
         transport.write(b'')
         self.assertFalse(self.sock.send.called)
-        self.assertEqual(list_to_buffer([b'data']), transport._buffer)
+        self.assertEqual([b'data'], list(transport._buffer))
 
     def test_write_buffer(self):
         transport = self.socket_transport()
-        transport._buffer.extend(b'data1')
+        transport._buffer.append(b'data1')
         transport.write(b'data2')
         self.assertFalse(self.sock.send.called)
-        self.assertEqual(list_to_buffer([b'data1', b'data2']),
-                         transport._buffer)
+        self.assertEqual([b'data1', b'data2'],
+                         list(transport._buffer))
 
     def test_write_partial(self):
         data = b'data'
@@ -701,7 +706,7 @@ class SelectorSocketTransportTests(test_utils.TestCase):
         transport.write(data)
 
         self.loop.assert_writer(7, transport._write_ready)
-        self.assertEqual(list_to_buffer([b'ta']), transport._buffer)
+        self.assertEqual([b'ta'], list(transport._buffer))
 
     def test_write_partial_bytearray(self):
         data = bytearray(b'data')
@@ -711,7 +716,7 @@ class SelectorSocketTransportTests(test_utils.TestCase):
         transport.write(data)
 
         self.loop.assert_writer(7, transport._write_ready)
-        self.assertEqual(list_to_buffer([b'ta']), transport._buffer)
+        self.assertEqual([b'ta'], list(transport._buffer))
         self.assertEqual(data, bytearray(b'data'))  # Hasn't been mutated.
 
     def test_write_partial_memoryview(self):
@@ -722,7 +727,7 @@ class SelectorSocketTransportTests(test_utils.TestCase):
         transport.write(data)
 
         self.loop.assert_writer(7, transport._write_ready)
-        self.assertEqual(list_to_buffer([b'ta']), transport._buffer)
+        self.assertEqual([b'ta'], list(transport._buffer))
 
     def test_write_partial_none(self):
         data = b'data'
@@ -733,7 +738,7 @@ class SelectorSocketTransportTests(test_utils.TestCase):
         transport.write(data)
 
         self.loop.assert_writer(7, transport._write_ready)
-        self.assertEqual(list_to_buffer([b'data']), transport._buffer)
+        self.assertEqual([b'data'], list(transport._buffer))
 
     def test_write_tryagain(self):
         self.sock.send.side_effect = BlockingIOError
@@ -743,7 +748,7 @@ class SelectorSocketTransportTests(test_utils.TestCase):
         transport.write(data)
 
         self.loop.assert_writer(7, transport._write_ready)
-        self.assertEqual(list_to_buffer([b'data']), transport._buffer)
+        self.assertEqual([b'data'], list(transport._buffer))
 
     @mock.patch('asyncio.selector_events.logger')
     def test_write_exception(self, m_log):
@@ -784,7 +789,7 @@ class SelectorSocketTransportTests(test_utils.TestCase):
         self.sock.send.return_value = len(data)
 
         transport = self.socket_transport()
-        transport._buffer.extend(data)
+        transport._buffer.append(data)
         self.loop._add_writer(7, transport._write_ready)
         transport._write_ready()
         self.assertTrue(self.sock.send.called)
@@ -796,7 +801,7 @@ class SelectorSocketTransportTests(test_utils.TestCase):
 
         transport = self.socket_transport()
         transport._closing = True
-        transport._buffer.extend(data)
+        transport._buffer.append(data)
         self.loop._add_writer(7, transport._write_ready)
         transport._write_ready()
         self.assertTrue(self.sock.send.called)
@@ -814,45 +819,148 @@ class SelectorSocketTransportTests(test_utils.TestCase):
         self.sock.send.return_value = 2
 
         transport = self.socket_transport()
-        transport._buffer.extend(data)
+        transport._buffer.append(data)
         self.loop._add_writer(7, transport._write_ready)
         transport._write_ready()
         self.loop.assert_writer(7, transport._write_ready)
-        self.assertEqual(list_to_buffer([b'ta']), transport._buffer)
+        self.assertEqual([b'ta'], list(transport._buffer))
 
     def test_write_ready_partial_none(self):
         data = b'data'
         self.sock.send.return_value = 0
 
         transport = self.socket_transport()
-        transport._buffer.extend(data)
+        transport._buffer.append(data)
         self.loop._add_writer(7, transport._write_ready)
         transport._write_ready()
         self.loop.assert_writer(7, transport._write_ready)
-        self.assertEqual(list_to_buffer([b'data']), transport._buffer)
+        self.assertEqual([b'data'], list(transport._buffer))
 
     def test_write_ready_tryagain(self):
         self.sock.send.side_effect = BlockingIOError
+        self.sock.sendmsg.side_effect = BlockingIOError
 
         transport = self.socket_transport()
-        transport._buffer = list_to_buffer([b'data1', b'data2'])
+        transport._buffer.extend([b'data1', b'data2'])
         self.loop._add_writer(7, transport._write_ready)
         transport._write_ready()
 
         self.loop.assert_writer(7, transport._write_ready)
-        self.assertEqual(list_to_buffer([b'data1data2']), transport._buffer)
+        self.assertEqual([b'data1', b'data2'], list(transport._buffer))
 
     def test_write_ready_exception(self):
         err = self.sock.send.side_effect = OSError()
 
         transport = self.socket_transport()
         transport._fatal_error = mock.Mock()
-        transport._buffer.extend(b'data')
+        transport._buffer.append(b'data')
         transport._write_ready()
         transport._fatal_error.assert_called_with(
                                    err,
                                    'Fatal write error on socket transport')
 
+    def test_write_small_coalesced(self):
+        self.sock.send.side_effect = BlockingIOError
+
+        transport = self.socket_transport()
+        transport.write(b'data1')
+        transport.write(bytearray(b'data2'))
+        transport.write(memoryview(b'data3'))
+        self.assertEqual([b'data1data2data3'], list(transport._buffer))
+        self.assertEqual(transport.get_write_buffer_size(), 15)
+
+    def test_write_large_not_copied(self):
+        data = b'x' * LARGE_WRITE_SIZE
+        self.sock.send.return_value = 0
+
+        transport = self.socket_transport()
+        transport.write(data)
+        self.assertIs(transport._buffer[0], data)
+
+        transport.write(data)
+        self.assertEqual(len(transport._buffer), 2)
+        self.assertIs(transport._buffer[1], data)
+        self.assertEqual(transport.get_write_buffer_size(), 2 * len(data))
+
+    def test_write_large_bytearray_copied(self):
+        data = bytearray(LARGE_WRITE_SIZE)
+        self.sock.send.return_value = 2
+
+        transport = self.socket_transport()
+        transport.write(data)
+        data[:] = b'x' * len(data)
+        self.assertEqual(bytes(transport._buffer[0]), bytes(len(data) - 2))
+        self.assertEqual(transport.get_write_buffer_size(), len(data) - 2)
+
+    @unittest.skipUnless(_HAVE_SENDMSG, 'needs sendmsg()')
+    def test_write_ready_sendmsg(self):
+        large = b'x' * LARGE_WRITE_SIZE
+        buffers = []
+
+        def sendmsg(data):
+            buffers.extend(bytes(b) for b in data)
+            return len(large) + 2
+        self.sock.sendmsg.side_effect = sendmsg
+
+        transport = self.socket_transport()
+        self.sock.send.return_value = 0
+        transport.write(large)
+        transport.write(b'data')
+        self.loop.assert_writer(7, transport._write_ready)
+        transport._write_ready()
+
+        self.assertEqual(buffers, [large, b'data'])
+        self.assertEqual([b'ta'], list(transport._buffer))
+        self.assertEqual(transport.get_write_buffer_size(), 2)
+        self.loop.assert_writer(7, transport._write_ready)
+
+        self.sock.send.return_value = 2
+        transport._write_ready()
+        self.sock.send.assert_called_with(bytearray(b'ta'))
+        self.assertFalse(transport._buffer)
+        self.assertEqual(transport.get_write_buffer_size(), 0)
+        self.assertFalse(self.loop.writers)
+
+    def test_writelines(self):
+        large = b'x' * LARGE_WRITE_SIZE
+        self.sock.send.return_value = 2
+        self.sock.sendmsg.return_value = 2
+
+        transport = self.socket_transport()
+        transport.writelines([large, b'data', large])
+        self.loop.assert_writer(7, transport._write_ready)
+        self.assertEqual(transport.get_write_buffer_size(),
+                         2 * len(large) + 2)
+        self.assertEqual(len(transport._buffer), 3)
+        self.assertEqual(bytes(transport._buffer[0]), large[2:])
+        self.assertEqual(transport._buffer[1], b'data')
+        self.assertIs(transport._buffer[2], large)
+
+    def test_writelines_str(self):
+        transport = self.socket_transport()
+        self.assertRaises(TypeError, transport.writelines, [b'data', 'str'])
+        self.assertFalse(transport._buffer)
+        self.assertFalse(self.sock.send.called)
+
+    def test_writelines_empty(self):
+        transport = self.socket_transport()
+        transport.writelines([])
+        transport.writelines([b''])
+        self.assertFalse(self.sock.send.called)
+        self.assertFalse(self.sock.sendmsg.called)
+
+    def test_writelines_closing(self):
+        transport = self.socket_transport()
+        transport.close()
+        self.assertEqual(transport._conn_lost, 1)
+        transport.writelines([b'data'])
+        self.assertEqual(transport._conn_lost, 2)
+
+    def test_writelines_after_eof(self):
+        transport = self.socket_transport()
+        transport.write_eof()
+        self.assertRaises(RuntimeError, transport.writelines, [b'data'])
+
     def test_write_eof(self):
         tr = self.socket_transport()
         self.assertTrue(tr.can_write_eof())
@@ -867,7 +975,7 @@ class SelectorSocketTransportTests(test_utils.TestCase):
         self.sock.send.side_effect = BlockingIOError
         tr.write(b'data')
         tr.write_eof()
-        self.assertEqual(tr._buffer, list_to_buffer([b'data']))
+        self.assertEqual(list(tr._buffer), [b'data'])
         self.assertTrue(tr._eof)
         self.assertFalse(self.sock.shutdown.called)
         self.sock.send.side_effect = lambda _: 4
@@ -155,6 +155,171 @@ class SslProtoHandshakeTests(test_utils.TestCase):
         # should not raise
         self.assertIsNone(transp.write(b'data'))
 
+    def test_write_coalescing(self):
+        ssl_proto = self.ssl_protocol()
+        transport = self.connection_made(ssl_proto)
+        sslpipe = ssl_proto._sslpipe
+        sslpipe.write_appdata.side_effect = lambda data, offset: len(data)
+        sslpipe.read_ssldata.return_value = b'records'
+        ssl_proto._on_handshake_complete(None)
+        test_utils.run_briefly(self.loop)
+        transport.write.reset_mock()
+        transp = ssl_proto._app_transport
+
+        # Written right away while the transport is not buffering.
+        transport.get_write_buffer_size.return_value = 0
+        transp.write(b'a')
+        sslpipe.write_appdata.assert_called_once_with(b'a', 0)
+        transport.write.assert_called_once_with(b'records')
+
+        # Sent together at the end of the loop iteration otherwise.
+        sslpipe.write_appdata.reset_mock()
+        transport.write.reset_mock()
+        transport.get_write_buffer_size.return_value = 100
+        buf = bytearray(b'b')
+        transp.write(buf)
+        buf[:] = b'x'
+        transp.write(b'c')
+        self.assertEqual(transp.get_write_buffer_size(), 102)
+        self.assertFalse(sslpipe.write_appdata.called)
+        test_utils.run_briefly(self.loop)
+        sslpipe.write_appdata.assert_called_once_with(bytearray(b'bc'), 0)
+        transport.write.assert_called_once_with(b'records')
+        self.assertEqual(transp.get_write_buffer_size(), 100)
+
+        # Large writes are not delayed.
+        sslpipe.write_appdata.reset_mock()
+        transp.write(b'c')
+        data = b'd' * sslproto._WRITE_COALESCE_SIZE
+        transp.write(data)
+        self.assertEqual(sslpipe.write_appdata.call_args_list,
+                         [mock.call(bytearray(b'c'), 0), mock.call(data, 0)])
+
+    def test_read_into_buffered_protocol(self):
+        received = []
+
+        class Proto(asyncio.BufferedProtocol):
+            def get_buffer(self, sizehint):
+                return bytearray(2)
+
+            def buffer_updated(self, nbytes):
+                received.append(nbytes)
+
+        ssl_proto = self.ssl_protocol(proto=Proto())
+        self.connection_made(ssl_proto)
+        sslpipe = ssl_proto._sslpipe
+        ssl_proto._on_handshake_complete(None)
+        sslpipe.wrapped = True
+        pending = mock.PropertyMock(side_effect=[True, True, True, False])
+        type(sslpipe).ssldata_pending = pending
+        sslpipe.read_appdata_into.side_effect = [2, 1, None]
+        sslpipe.read_ssldata.return_value = b''
+
+        buf = ssl_proto.get_buffer(-1)
+        buf[:4] = b'recs'
+        ssl_proto.buffer_updated(4)
+        sslpipe.write_ssldata.assert_called_once_with(b'recs')
+        self.assertFalse(sslpipe.feed_ssldata.called)
+        self.assertEqual(received, [2, 1])
+
+        # close_notify
+        pending.side_effect = [True]
+        sslpipe.read_appdata_into.side_effect = [0]
+        sslpipe.shutdown.return_value = []
+        ssl_proto.get_buffer(-1)
+        ssl_proto.buffer_updated(4)
+        self.assertEqual(received, [2, 1])
+        self.assertTrue(ssl_proto._in_shutdown)
+
+    def test_receive_buffer_shared(self):
+        # The connections of a loop share one receive buffer, which they
+        # only hold during a read.
+        ssl_proto1 = self.ssl_protocol()
+        ssl_proto2 = self.ssl_protocol()
+        self.connection_made(ssl_proto1)
+        self.connection_made(ssl_proto2)
+        ssl_proto1._sslpipe.feed_ssldata.return_value = ([], [])
+        buf = ssl_proto1.get_buffer(-1)
+        self.assertEqual(len(buf), sslproto._SSLPipe.max_size)
+        # A read in progress keeps its buffer.
+        self.assertIsNot(ssl_proto2.get_buffer(-1), buf)
+        ssl_proto1.buffer_updated(0)
+        self.assertIsNone(ssl_proto1._ssl_buffer)
+        self.assertIs(ssl_proto1.get_buffer(-1), buf)
+        ssl_proto1.connection_lost(None)
+        self.assertIsNone(ssl_proto1._ssl_buffer)
+
+
+@unittest.skipIf(ssl is None, 'No ssl module')
+class SSLPipeTests(unittest.TestCase):
+
+    def handshake(self):
+        def feed(chunks, pipe):
+            ssldata = []
+            for chunk in chunks:
+                ssldata.extend(pipe.feed_ssldata(chunk)[0])
+            return ssldata
+
+        server = sslproto._SSLPipe(test_utils.simple_server_sslcontext(),
+                                   server_side=True)
+        client = sslproto._SSLPipe(test_utils.simple_client_sslcontext(),
+                                   server_side=False)
+        to_server = client.do_handshake()
+        to_client = server.do_handshake()
+        while to_server or to_client:
+            to_client += feed(to_server, server)
+            to_server = feed(to_client, client)
+            to_client = []
+        self.assertTrue(client.wrapped)
+        self.assertTrue(server.wrapped)
+        return client, server
+
+    def read_appdata(self, pipe, ssldata):
+        pipe.write_ssldata(ssldata)
+        buf = bytearray(4)
+        data = b''
+        while pipe.ssldata_pending:
+            nbytes = pipe.read_appdata_into(buf)
+            if nbytes is None:
+                break
+            data += buf[:nbytes]
+            if not nbytes:
+                break
+        return data
+
+    def test_write_appdata(self):
+        client, server = self.handshake()
+        for chunk in (b'foo', b'bar', b'bazbaz'):
+            self.assertEqual(client.write_appdata(chunk), len(chunk))
+        # The records of the three writes are read at once.
+        ssldata = client.read_ssldata()
+        self.assertEqual(client.read_ssldata(), b'')
+        self.assertEqual(self.read_appdata(server, ssldata), b'foobarbazbaz')
+        self.assertFalse(server.ssldata_pending)
+
+    def test_read_appdata_into_partial_record(self):
+        client, server = self.handshake()
+        client.write_appdata(b'data')
+        ssldata = client.read_ssldata()
+        self.assertEqual(self.read_appdata(server, ssldata[:5]), b'')
+        self.assertTrue(server.need_ssldata)
+        self.assertEqual(self.read_appdata(server, ssldata[5:]), b'data')
+
+    def test_unwrapped_data_copied(self):
+        pipe = sslproto._SSLPipe(test_utils.simple_client_sslcontext(),
+                                 server_side=False)
+        buf = bytearray(b'data')
+        ssldata, appdata = pipe.feed_ssldata(memoryview(buf))
+        buf[:] = b'next'
+        self.assertEqual(appdata, [b'data'])
+        self.assertIsInstance(appdata[0], bytes)
+
+    def test_read_appdata_into_close_notify(self):
+        client, server = self.handshake()
+        ssldata = b''.join(client.shutdown())
+        server.write_ssldata(ssldata)
+        self.assertEqual(server.read_appdata_into(bytearray(4)), 0)
+
 
 ##############################################################################
 # Start TLS Tests
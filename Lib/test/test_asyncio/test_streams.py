@@ -236,6 +236,54 @@ class StreamTests(test_utils.TestCase):
         self.assertEqual(b'chunk', data)
         self.assertEqual(b'', stream._buffer)
 
+    def test_readinto(self):
+        # Read bytes into a buffer.
+        stream = asyncio.StreamReader(loop=self.loop)
+        buf = bytearray(8)
+        read_task = self.loop.create_task(stream.readinto(buf))
+
+        def cb():
+            stream.feed_data(self.DATA)
+        self.loop.call_soon(cb)
+
+        n = self.loop.run_until_complete(read_task)
+        self.assertEqual(n, 8)
+        self.assertEqual(buf, self.DATA[:8])
+        self.assertEqual(self.DATA[8:], stream._buffer)
+
+        buf = memoryview(bytearray(64))
+        n = self.loop.run_until_complete(stream.readinto(buf))
+        self.assertEqual(n, len(self.DATA) - 8)
+        self.assertEqual(buf[:n], self.DATA[8:])
+        self.assertEqual(b'', stream._buffer)
+
+    def test_readinto_empty(self):
+        stream = asyncio.StreamReader(loop=self.loop)
+        stream.feed_data(self.DATA)
+
+        n = self.loop.run_until_complete(stream.readinto(bytearray()))
+        self.assertEqual(n, 0)
+        self.assertEqual(self.DATA, stream._buffer)
+
+    def test_readinto_eof(self):
+        stream = asyncio.StreamReader(loop=self.loop)
+        stream.feed_data(b'data')
+        stream.feed_eof()
+
+        buf = bytearray(8)
+        n = self.loop.run_until_complete(stream.readinto(buf))
+        self.assertEqual(n, 4)
+        self.assertEqual(buf[:n], b'data')
+        n = self.loop.run_until_complete(stream.readinto(buf))
+        self.assertEqual(n, 0)
+
+    def test_readinto_exception(self):
+        stream = asyncio.StreamReader(loop=self.loop)
+        stream.set_exception(ValueError())
+        self.assertRaises(
+            ValueError, self.loop.run_until_complete,
+            stream.readinto(bytearray(2)))
+
     def test_readline(self):
         # Read one line. 'readline' will need to wait for the data
         # to come from 'cb'
@@ -769,6 +817,136 @@ os.close(fd)
         data = self.loop.run_until_complete(reader.read(-1))
         self.assertEqual(data, b'data')
 
+    def test_streamreaderprotocol_buffered(self):
+        reader = asyncio.StreamReader(loop=self.loop)
+        protocol = asyncio.StreamReaderProtocol(reader, loop=self.loop)
+        self.assertIsInstance(protocol, asyncio.BufferedProtocol)
+
+        buf = protocol.get_buffer(-1)
+        self.assertGreater(len(buf), 0)
+        buf[:5] = b'line1'
+        protocol.buffer_updated(5)
+        # The receive buffer is only held during a read, and reused for
+        # the next chunk.
+        self.assertIsNone(protocol._recv_view)
+        self.assertIs(protocol.get_buffer(-1), buf)
+        buf[:6] = b'\nline2'
+        protocol.buffer_updated(6)
+        protocol.eof_received()
+        self.assertEqual(reader._buffer, b'line1\nline2')
+
+        data = self.loop.run_until_complete(reader.read())
+        self.assertEqual(data, b'line1\nline2')
+
+    def test_streamreaderprotocol_buffered_subclass(self):
+        # Subclasses overriding data_received() still get bytes.
+        received = []
+
+        class Protocol(asyncio.StreamReaderProtocol):
+            def data_received(self, data):
+                received.append(data)
+                super().data_received(data)
+
+        reader = asyncio.StreamReader(loop=self.loop)
+        protocol = Protocol(reader, loop=self.loop)
+        protocol.get_buffer(-1)[:4] = b'data'
+        protocol.buffer_updated(4)
+        self.assertEqual(received, [b'data'])
+        self.assertIs(type(received[0]), bytes)
+        self.assertEqual(reader._buffer, b'data')
+
+    def test_streamreaderprotocol_buffer_shared(self):
+        # The connections of a loop share one receive buffer, which they
+        # only hold during a read.
+        protocol1 = asyncio.StreamReaderProtocol(
+            asyncio.StreamReader(loop=self.loop), loop=self.loop)
+        protocol2 = asyncio.StreamReaderProtocol(
+            asyncio.StreamReader(loop=self.loop), loop=self.loop)
+        buf = protocol1.get_buffer(-1)
+        self.assertIsNot(protocol2.get_buffer(-1), buf)
+        buf[:4] = b'data'
+        protocol1.buffer_updated(4)
+        self.assertIs(protocol1.get_buffer(-1), buf)
+        protocol1.connection_lost(None)
+        self.assertIsNone(protocol1._recv_view)
+
+    def test_streamreaderprotocol_buffered_reader_subclass(self):
+        # Readers overriding feed_data() get bytes, which they may keep.
+        received = []
+
+        class Reader(asyncio.StreamReader):
+            def feed_data(self, data):
+                received.append(data)
+                super().feed_data(data)
+
+        reader = Reader(loop=self.loop)
+        protocol = asyncio.StreamReaderProtocol(reader, loop=self.loop)
+        protocol.get_buffer(-1)[:4] = b'data'
+        protocol.buffer_updated(4)
+        protocol.get_buffer(-1)[:4] = b'next'
+        protocol.buffer_updated(4)
+        self.assertEqual(received, [b'data', b'next'])
+        self.assertIs(type(received[0]), bytes)
+        self.assertEqual(reader._buffer, b'datanext')
+
+    def test_readinto_from_connection(self):
+        size = 1024 * 1024
+        payload = bytes(range(256)) * (size // 256)
+
+        async def handle_client(client_reader, client_writer):
+            client_writer.write(payload)
+            await client_writer.drain()
+            client_writer.close()
+            await client_writer.wait_closed()
+
+        async def client(addr):
+            reader, writer = await asyncio.open_connection(*addr)
+            buf = bytearray(size)
+            view = memoryview(buf)
+            pos = 0
+            while True:
+                n = await reader.readinto(view[pos:])
+                if not n:
+                    break
+                pos += n
+            writer.close()
+            await writer.wait_closed()
+            return buf[:pos]
+
+        async def main():
+            server = await asyncio.start_server(
+                handle_client, support.HOSTv4, 0)
+            async with server:
+                addr = server.sockets[0].getsockname()
+                return await client(addr)
+
+        data = self.loop.run_until_complete(main())
+        self.assertEqual(data, payload)
+
+    def test_writelines_large_chunks(self):
+        chunks = [bytes([i]) * (256 * 1024) for i in range(8)]
+        chunks.insert(0, b'header')
+
+        async def handle_client(client_reader, client_writer):
+            client_writer.writelines(chunks)
+            await client_writer.drain()
+            client_writer.close()
+            await client_writer.wait_closed()
+
+        async def main():
+            server = await asyncio.start_server(
+                handle_client, support.HOSTv4, 0)
+            async with server:
+                addr = server.sockets[0].getsockname()
+                reader, writer = await asyncio.open_connection(*addr)
+                data = await reader.read()
+                writer.close()
+                await writer.wait_closed()
+                return data
+
+        data = self.loop.run_until_complete(main())
+        self.assertEqual(data, b''.join(chunks))
+
     def test_streamreader_constructor(self):
         self.addCleanup(asyncio.set_event_loop, None)
         asyncio.set_event_loop(self.loop)
@@ -2680,6 +2680,7 @@ class BaseTaskIntrospectionTests:
     _unregister_task = None
     _enter_task = None
     _leave_task = None
+    _swap_current_task = None
 
     def test__register_task_1(self):
         class TaskLike:
@@ -2774,6 +2775,17 @@ class BaseTaskIntrospectionTests:
             self._leave_task(loop, task)
         self.assertIsNone(asyncio.current_task(loop))
 
+    def test__swap_current_task(self):
+        task1 = mock.Mock()
+        task2 = mock.Mock()
+        loop = mock.Mock()
+        self.assertIsNone(self._swap_current_task(loop, task1))
+        self.assertIs(asyncio.current_task(loop), task1)
+        self.assertIs(self._swap_current_task(loop, task2), task1)
+        self.assertIs(asyncio.current_task(loop), task2)
+        self.assertIs(self._swap_current_task(loop, None), task2)
+        self.assertIsNone(asyncio.current_task(loop))
+
     def test__unregister_task(self):
         task = mock.Mock()
         loop = mock.Mock()
@@ -2794,6 +2806,7 @@ class PyIntrospectionTests(test_utils.TestCase, BaseTaskIntrospectionTests):
     _unregister_task = staticmethod(tasks._py_unregister_task)
     _enter_task = staticmethod(tasks._py_enter_task)
     _leave_task = staticmethod(tasks._py_leave_task)
+    _swap_current_task = staticmethod(tasks._py_swap_current_task)
 
 
 @unittest.skipUnless(hasattr(tasks, '_c_register_task'),
@@ -2804,8 +2817,10 @@ class CIntrospectionTests(test_utils.TestCase, BaseTaskIntrospectionTests):
         _unregister_task = staticmethod(tasks._c_unregister_task)
         _enter_task = staticmethod(tasks._c_enter_task)
         _leave_task = staticmethod(tasks._c_leave_task)
+        _swap_current_task = staticmethod(tasks._c_swap_current_task)
     else:
         _register_task = _unregister_task = _enter_task = _leave_task = None
+        _swap_current_task = None
 
 
 class BaseCurrentLoopTests:
@@ -2851,6 +2866,166 @@ class CCurrentLoopTests(BaseCurrentLoopTests, test_utils.TestCase):
         return getattr(tasks, '_CTask')(coro, loop=self.loop)
 
 
+class BaseEagerTaskFactoryTests:
+
+    Task = None
+
+    def setUp(self):
+        super().setUp()
+        self.loop = asyncio.new_event_loop()
+        self.set_event_loop(self.loop)
+        self.loop.set_task_factory(
+            asyncio.create_eager_task_factory(self.Task))
+
+    def run_coro(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    def test_eager_completion(self):
+        calls = []
+
+        async def coro():
+            calls.append('coro')
+            return 42
+
+        async def main():
+            task = self.loop.create_task(coro())
+            calls.append('created')
+            self.assertIsInstance(task, self.Task)
+            self.assertTrue(task.done())
+            return await task
+
+        self.assertEqual(self.run_coro(main()), 42)
+        self.assertEqual(calls, ['coro', 'created'])
+
+    def test_eager_exception(self):
+        async def coro():
+            raise ValueError('spam')
+
+        async def main():
+            task = self.loop.create_task(coro())
+            self.assertTrue(task.done())
+            with self.assertRaisesRegex(ValueError, 'spam'):
+                await task
+
+        self.run_coro(main())
+
+    def test_suspending(self):
+        calls = []
+
+        async def coro():
+            calls.append('first step')
+            await asyncio.sleep(0)
+            calls.append('second step')
+            return 42
+
+        async def main():
+            task = self.loop.create_task(coro())
+            calls.append('created')
+            self.assertFalse(task.done())
+            result = await task
+            self.assertEqual(calls, ['first step', 'created', 'second step'])
+            return result
+
+        self.assertEqual(self.run_coro(main()), 42)
+
+    def test_cancel_after_first_step(self):
+        started = False
+
+        async def coro():
+            nonlocal started
+            started = True
+            await asyncio.sleep(10)
+
+        async def main():
+            task = self.loop.create_task(coro())
+            self.assertTrue(started)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        self.run_coro(main())
+
+    def test_current_task(self):
+        async def coro():
+            inner = asyncio.current_task()
+            await asyncio.sleep(0)
+            self.assertIs(asyncio.current_task(), inner)
+            return inner
+
+        async def main():
+            outer = asyncio.current_task()
+            task = self.loop.create_task(coro())
+            self.assertIs(asyncio.current_task(), outer)
+            self.assertIs(await task, task)
+
+        self.run_coro(main())
+
+    def test_context(self):
+        cvar = contextvars.ContextVar('cvar', default='default')
+
+        async def coro():
+            cvar.set('task')
+            return cvar.get()
+
+        async def main():
+            cvar.set('main')
+            task = self.loop.create_task(coro())
+            self.assertTrue(task.done())
+            self.assertEqual(cvar.get(), 'main')
+            return await task
+
+        self.assertEqual(self.run_coro(main()), 'task')
+
+    def test_gather(self):
+        steps = 0
+
+        async def coro(n):
+            nonlocal steps
+            steps += 1
+            if n % 2:
+                await asyncio.sleep(0)
+            return n
+
+        async def main():
+            fut = asyncio.gather(*[coro(i) for i in range(6)])
+            self.assertEqual(steps, 6)
+            return await fut
+
+        self.assertEqual(self.run_coro(main()), list(range(6)))
+
+    def test_not_running(self):
+        # The first step of a task created before the loop runs is
+        # scheduled as usual.
+        started = False
+
+        async def coro():
+            nonlocal started
+            started = True
+
+        task = self.loop.create_task(coro())
+        self.assertFalse(started)
+        self.run_coro(task)
+        self.assertTrue(started)
+
+    def test_name(self):
+        async def main():
+            task = asyncio.create_task(asyncio.sleep(0), name='spam')
+            self.assertEqual(task.get_name(), 'spam')
+            await task
+
+        self.run_coro(main())
+
+
+class PyEagerTaskFactoryTests(BaseEagerTaskFactoryTests, test_utils.TestCase):
+    Task = tasks._PyTask
+
+
+@unittest.skipUnless(hasattr(tasks, '_CTask'),
+                     'requires the C _asyncio module')
+class CEagerTaskFactoryTests(BaseEagerTaskFactoryTests, test_utils.TestCase):
+    Task = getattr(tasks, '_CTask', None)
+
+
 class GenericTaskTests(test_utils.TestCase):
 
     def test_future_subclass(self):
@@ -3006,6 +3181,20 @@ class FutureGatherTests(GatherTestsBase, test_utils.TestCase):
         with self.assertRaises(ValueError):
             asyncio.gather(fut1, loop=self.other_loop)
 
+    def test_already_done_futures(self):
+        a, b = [self.one_loop.create_future() for i in range(2)]
+        a.set_result(1)
+        b.set_result(2)
+        fut = asyncio.gather(a, b, a)
+        self.assertTrue(fut.done())
+        self.assertEqual(fut.result(), [1, 2, 1])
+
+        c = self.one_loop.create_future()
+        c.set_exception(ValueError())
+        fut = asyncio.gather(a, c)
+        self.assertTrue(fut.done())
+        self.assertIsInstance(fut.exception(), ValueError)
+
     def test_constructor_homogenous_futures(self):
         children = [self.other_loop.create_future() for i in range(3)]
         fut = asyncio.gather(*children)
@@ -3322,6 +3511,216 @@ class WaitTests(test_utils.TestCase):
                 asyncio.wait([task, coroutine_function()]))
 
 
+class BoundedConcurrencyTests(test_utils.TestCase):
+    # Tests for as_completed() with a limit and map().
+
+    def setUp(self):
+        super().setUp()
+        self.loop = asyncio.new_event_loop()
+        self.set_event_loop(self.loop)
+        self.started = 0
+        self.running = 0
+        self.max_running = 0
+
+    def tearDown(self):
+        self.loop.close()
+        self.loop = None
+        super().tearDown()
+
+    async def double(self, x, delay=0):
+        self.started += 1
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(delay)
+            if x is None:
+                raise ValueError
+            return x * 2
+        finally:
+            self.running -= 1
+
+    def test_as_completed_limit(self):
+        pulled = []
+
+        def coros():
+            for i in range(10):
+                pulled.append(i)
+                yield self.double(i, (10 - i) / 1000)
+
+        async def test():
+            results = []
+            for f in asyncio.as_completed(coros(), limit=3):
+                # The iterable is consumed lazily.
+                self.assertLessEqual(len(pulled), len(results) + 3 + 1)
+                results.append(await f)
+            return results
+
+        results = self.loop.run_until_complete(test())
+        self.assertEqual(sorted(results), [i * 2 for i in range(10)])
+        self.assertEqual(self.max_running, 3)
+
+    def test_as_completed_limit_empty(self):
+        async def test():
+            return [await f for f in asyncio.as_completed([], limit=3)]
+
+        self.assertEqual(self.loop.run_until_complete(test()), [])
+
+    def test_as_completed_limit_timeout(self):
+        async def test():
+            coros = (self.double(i, 10) for i in range(5))
+            results = []
+            for f in asyncio.as_completed(coros, limit=2, timeout=0.01):
+                try:
+                    results.append(await f)
+                except asyncio.TimeoutError:
+                    results.append(None)
+            others = asyncio.all_tasks() - {asyncio.current_task()}
+            self.assertEqual(len(others), 2)
+            for task in others:
+                task.cancel()
+            await asyncio.wait(others)
+            return results
+
+        # One coroutine is yielded per item, the ones of the items not
+        # started raising TimeoutError too.
+        self.assertEqual(self.loop.run_until_complete(test()),
+                         [None] * 5)
+        self.assertEqual(self.started, 2)
+
+    def test_as_completed_limit_timeout_collect_first(self):
+        async def test():
+            coros = [self.double(i, 10) for i in range(4)]
+            fs = list(asyncio.as_completed(iter(coros), limit=1,
+                                           timeout=0.01))
+            self.assertEqual(len(fs), 4)
+            await asyncio.sleep(0.02)
+            for f in fs:
+                with self.assertRaises(asyncio.TimeoutError):
+                    await f
+            others = asyncio.all_tasks() - {asyncio.current_task()}
+            for task in others:
+                task.cancel()
+            await asyncio.wait(others)
+            # The coroutines which were not started were closed.
+            return [coro.cr_frame is None for coro in coros]
+
+        self.assertEqual(self.loop.run_until_complete(test()), [True] * 4)
+        self.assertEqual(self.started, 1)
+
+    def test_as_completed_limit_backpressure(self):
+        async def test():
+            coros = (self.double(i) for i in range(10))
+            fs = asyncio.as_completed(coros, limit=2)
+            self.assertEqual(await next(fs), 0)
+            await asyncio.sleep(0.01)
+            # Only one call runs while the result of the other is unused.
+            self.assertEqual(self.started, 3)
+            return [0] + [await f for f in fs]
+
+        self.assertEqual(sorted(self.loop.run_until_complete(test())),
+                         [i * 2 for i in range(10)])
+
+    def test_as_completed_limit_collect_first(self):
+        # One coroutine is yielded per item, even when they are all
+        # collected before any of them is awaited.
+        async def test():
+            coros = (self.double(i) for i in range(5))
+            fs = list(asyncio.as_completed(coros, limit=2))
+            self.assertEqual(len(fs), 5)
+            self.assertEqual(self.started, 0)
+            return [await f for f in fs]
+
+        self.assertEqual(sorted(self.loop.run_until_complete(test())),
+                         [i * 2 for i in range(5)])
+        self.assertEqual(self.max_running, 2)
+
+    def test_as_completed_limit_duplicates(self):
+        async def test():
+            fut = self.loop.create_future()
+            self.loop.call_soon(fut.set_result, 'spam')
+            fs = asyncio.as_completed([fut, fut, fut], limit=2)
+            return [await f for f in fs]
+
+        self.assertEqual(self.loop.run_until_complete(test()),
+                         ['spam'] * 3)
+
+    def test_as_completed_limit_invalid(self):
+        with self.assertRaises(ValueError):
+            list(asyncio.as_completed([], limit=0))
+        coro = self.double(1)
+        with self.assertRaises(TypeError):
+            list(asyncio.as_completed(coro, limit=1))
+        coro.close()
+
+    def test_map_not_exported(self):
+        # 'from asyncio import *' must not shadow the builtin map().
+        self.assertIs(asyncio.map, tasks.map)
+        self.assertNotIn('map', asyncio.__all__)
+        self.assertNotIn('map', tasks.__all__)
+
+    def test_map(self):
+        async def test():
+            return [r async for r in asyncio.map(
+                self.double, range(10), [0.005, 0] * 5, limit=4)]
+
+        results = self.loop.run_until_complete(test())
+        self.assertEqual(sorted(results), [i * 2 for i in range(10)])
+        self.assertNotEqual(results, sorted(results))
+        self.assertEqual(self.max_running, 4)
+
+    def test_map_ordered(self):
+        async def test():
+            return [r async for r in asyncio.map(
+                self.double, range(10), [0.005, 0] * 5, limit=4,
+                ordered=True)]
+
+        results = self.loop.run_until_complete(test())
+        self.assertEqual(results, [i * 2 for i in range(10)])
+        self.assertEqual(self.max_running, 4)
+
+    def test_map_backpressure(self):
+        async def test():
+            async for r in asyncio.map(self.double, range(10), limit=2):
+                await asyncio.sleep(0.01)
+                # Results not yielded yet count against the limit.
+                self.assertLessEqual(self.running, 1)
+
+        self.loop.run_until_complete(test())
+        self.assertEqual(self.max_running, 2)
+
+    def test_map_exception(self):
+        async def test():
+            results = []
+            with self.assertRaises(ValueError):
+                async for r in asyncio.map(self.double, [1, None, 2, 3],
+                                           [0, 0, 1, 1], limit=3):
+                    results.append(r)
+            return results
+
+        self.assertEqual(self.loop.run_until_complete(test()), [2])
+        # The pending calls are cancelled.
+        self.loop.run_until_complete(asyncio.sleep(0))
+        self.assertEqual(self.running, 0)
+
+    def test_map_aclose(self):
+        async def test():
+            agen = asyncio.map(self.double, range(10), [0, 1] * 5, limit=3)
+            self.assertEqual(await agen.__anext__(), 0)
+            await agen.aclose()
+            await asyncio.sleep(0)
+            self.assertEqual(self.running, 0)
+
+        self.loop.run_until_complete(test())
+
+    def test_map_invalid_limit(self):
+        async def test():
+            async for r in asyncio.map(self.double, [1], limit=0):
+                pass
+
+        with self.assertRaises(ValueError):
+            self.loop.run_until_complete(test())
+
+
 class CompatibilityTests(test_utils.TestCase):
     # Tests for checking a bridge between old-styled coroutines
     # and async/await syntax
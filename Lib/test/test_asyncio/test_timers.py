@@ -0,0 +1,201 @@
+"""Tests for timers.py"""
+
+import random
+import unittest
+from unittest import mock
+
+import asyncio
+from asyncio import events
+from test.test_asyncio import utils as test_utils
+
+
+def tearDownModule():
+    asyncio.set_event_loop_policy(None)
+
+
+class TimerWheelTests(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.loop = mock.Mock()
+        self.loop.get_debug.return_value = False
+
+    def timer(self, when):
+        return events.TimerHandle(when, lambda: None, (), self.loop)
+
+    def advance(self, wheel, now):
+        ready = []
+        wheel.advance(now, ready)
+        return [timer.when() for timer in ready]
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            asyncio.TimerWheel(0)
+        with self.assertRaises(ValueError):
+            asyncio.TimerWheel(slots=100)
+        with self.assertRaises(ValueError):
+            asyncio.TimerWheel(levels=0)
+
+    def test_add_advance(self):
+        wheel = asyncio.TimerWheel(1, slots=4, levels=2)
+        wheel.start(0)
+        for when in (3, 0.5, 2.5, 1):
+            wheel.add(self.timer(when))
+        self.assertEqual(len(wheel), 4)
+        self.assertEqual(self.advance(wheel, 0.9), [])
+        self.assertEqual(self.advance(wheel, 1), [0.5, 1])
+        # Deadlines are rounded up to the resolution.
+        self.assertEqual(self.advance(wheel, 2.9), [])
+        self.assertEqual(self.advance(wheel, 3.5), [2.5, 3])
+        self.assertEqual(len(wheel), 0)
+
+    def test_timers_never_early(self):
+        wheel = asyncio.TimerWheel(0.01, slots=8, levels=3)
+        wheel.start(100)
+        whens = [100 + random.uniform(0, 10) for _ in range(500)]
+        timers = [self.timer(when) for when in whens]
+        for timer in timers:
+            wheel.add(timer)
+        now = 100
+        fired = []
+        while len(wheel):
+            now += random.uniform(0, 0.2)
+            for when in self.advance(wheel, now):
+                self.assertLessEqual(when, now)
+                self.assertGreater(when, now - 0.2 - 0.01)
+                fired.append(when)
+        self.assertEqual(fired, sorted(whens))
+        self.assertFalse(any(timer._scheduled for timer in timers))
+
+    def test_remove(self):
+        wheel = asyncio.TimerWheel(1, slots=4, levels=2)
+        wheel.start(0)
+        timers = [self.timer(when) for when in (1, 2, 7, 100)]
+        for timer in timers:
+            wheel.add(timer)
+            self.assertTrue(timer._scheduled)
+        for timer in timers[1:]:
+            wheel.remove(timer)
+            self.assertFalse(timer._scheduled)
+        wheel.remove(timers[1])
+        self.assertEqual(len(wheel), 1)
+        self.assertEqual(self.advance(wheel, 200), [1])
+
+    def test_overflow(self):
+        wheel = asyncio.TimerWheel(1, slots=2, levels=2)
+        wheel.start(0)
+        for when in (50, 3, 20):
+            wheel.add(self.timer(when))
+        self.assertEqual(self.advance(wheel, 19), [3])
+        self.assertEqual(self.advance(wheel, 49), [20])
+        self.assertEqual(self.advance(wheel, 50), [50])
+
+    def test_due(self):
+        wheel = asyncio.TimerWheel(1, slots=4)
+        wheel.start(10)
+        wheel.add(self.timer(5))
+        self.assertEqual(wheel.next_deadline(), 10)
+        self.assertEqual(self.advance(wheel, 10), [5])
+
+    def test_next_deadline(self):
+        wheel = asyncio.TimerWheel(1, slots=4, levels=2)
+        wheel.start(0)
+        self.assertIsNone(wheel.next_deadline())
+        wheel.add(self.timer(2.5))
+        self.assertEqual(wheel.next_deadline(), 3)
+        wheel.add(self.timer(13))
+        self.assertEqual(self.advance(wheel, 3), [2.5])
+        # The timer is in the upper level: wake up when it moves down.
+        self.assertEqual(wheel.next_deadline(), 4)
+        self.assertEqual(self.advance(wheel, 12), [])
+        self.assertEqual(wheel.next_deadline(), 13)
+
+    def test_clear(self):
+        wheel = asyncio.TimerWheel(1)
+        wheel.start(0)
+        timers = [self.timer(when) for when in (1, 1000, 10 ** 9)]
+        for timer in timers:
+            wheel.add(timer)
+        self.assertCountEqual(wheel.timers(), timers)
+        wheel.clear()
+        self.assertEqual(len(wheel), 0)
+        self.assertEqual(wheel.timers(), [])
+        self.assertFalse(any(timer._scheduled for timer in timers))
+
+    def test_start(self):
+        wheel = asyncio.TimerWheel(1)
+        wheel.start(0)
+        wheel.add(self.timer(1))
+        with self.assertRaises(RuntimeError):
+            wheel.start(0)
+
+
+class LoopTimerWheelTests(test_utils.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.loop = asyncio.new_event_loop()
+        self.set_event_loop(self.loop)
+
+    def test_set_timer_wheel(self):
+        self.assertIsNone(self.loop.get_timer_wheel())
+        with self.assertRaises(TypeError):
+            self.loop.set_timer_wheel(object())
+        wheel = asyncio.TimerWheel(0.001)
+        self.loop.set_timer_wheel(wheel)
+        self.assertIs(self.loop.get_timer_wheel(), wheel)
+        self.loop.set_timer_wheel(None)
+        self.assertIsNone(self.loop.get_timer_wheel())
+
+    def test_call_later(self):
+        self.loop.set_timer_wheel(asyncio.TimerWheel(0.001))
+        calls = []
+        t0 = self.loop.time()
+        for delay in (0.03, 0.01, 0.02, 0):
+            self.loop.call_later(delay, calls.append, delay)
+        handle = self.loop.call_later(0.015, calls.append, 'cancelled')
+        handle.cancel()
+        self.assertEqual(len(self.loop.get_timer_wheel()), 4)
+        self.loop.call_later(0.04, self.loop.stop)
+        self.loop.run_forever()
+        self.assertGreaterEqual(self.loop.time() - t0, 0.04)
+        self.assertEqual(calls, [0, 0.01, 0.02, 0.03])
+        self.assertEqual(len(self.loop.get_timer_wheel()), 0)
+
+    def test_move_timers(self):
+        calls = []
+        self.loop.call_later(0.02, calls.append, 2)
+        self.loop.call_later(0.01, calls.append, 1)
+        self.loop.call_later(0.01, calls.append, 'cancelled').cancel()
+        wheel = asyncio.TimerWheel(0.001)
+        self.loop.set_timer_wheel(wheel)
+        self.assertEqual(self.loop._scheduled, [])
+        self.assertEqual(len(wheel), 2)
+        self.loop.call_later(0.03, calls.append, 3)
+        self.loop.set_timer_wheel(None)
+        self.assertEqual(len(wheel), 0)
+        self.assertEqual(len(self.loop._scheduled), 3)
+        self.loop.set_timer_wheel(asyncio.TimerWheel(0.001))
+        self.loop.run_until_complete(asyncio.sleep(0.04))
+        self.assertEqual(calls, [1, 2, 3])
+
+    def test_timeouts(self):
+        self.loop.set_timer_wheel(asyncio.TimerWheel(0.001))
+
+        async def main():
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(asyncio.sleep(10), 0.01)
+            return await asyncio.wait_for(asyncio.sleep(0, 'ok'), 10)
+
+        self.assertEqual(self.loop.run_until_complete(main()), 'ok')
+
+    def test_close(self):
+        wheel = asyncio.TimerWheel(0.001)
+        self.loop.set_timer_wheel(wheel)
+        self.loop.call_later(10, lambda: None)
+        self.loop.close()
+        self.assertEqual(len(wheel), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,11 +12,13 @@ import itertools
 import logging
 from logging.handlers import QueueHandler
 import os
+import pickle
 import queue
 import sys
 import threading
 import time
 import unittest
+from unittest import mock
 import weakref
 from pickle import PicklingError
 
@@ -98,6 +100,24 @@ def make_dummy_object(_):
     return MyObject()
 
 
+def describe_buffer(buf):
+    return type(buf).__name__, bytes(buf[:4]), len(buf)
+
+
+def describe_buffers(bufs):
+    return [(type(buf).__name__, bytes(buf)[:4], len(buf),
+             memoryview(buf).readonly)
+            for buf in bufs]
+
+
+def reverse_buffer(buf):
+    return bytearray(buf)[::-1]
+
+
+def make_buffer(size):
+    return pickle.PickleBuffer(bytearray(b'x' * size))
+
+
 class BaseTestCase(unittest.TestCase):
     def setUp(self):
         self._thread_key = support.threading_setup()
@@ -153,6 +173,10 @@ class ThreadPoolMixin(ExecutorMixin):
     executor_type = futures.ThreadPoolExecutor
 
 
+class WorkStealingMixin(ExecutorMixin):
+    executor_type = futures.WorkStealingThreadPoolExecutor
+
+
 class ProcessPoolForkMixin(ExecutorMixin):
     executor_type = futures.ProcessPoolExecutor
     ctx = "fork"
@@ -180,6 +204,7 @@ class ProcessPoolForkserverMixin(ExecutorMixin):
 
 def create_executor_tests(mixin, bases=(BaseTestCase,),
                           executor_mixins=(ThreadPoolMixin,
+                                           WorkStealingMixin,
                                            ProcessPoolForkMixin,
                                            ProcessPoolForkserverMixin,
                                            ProcessPoolSpawnMixin)):
@@ -481,6 +506,32 @@ class ThreadPoolShutdownTest(ThreadPoolMixin, ExecutorShutdownTest, BaseTestCase
         self.assertEqual(out.strip(), b"apple")
 
 
+class WorkStealingShutdownTest(WorkStealingMixin, ExecutorShutdownTest,
+                               BaseTestCase):
+    def _prime_executor(self):
+        pass
+
+    def test_cancel_futures_nested(self):
+        # Calls queued in the deques of the workers are cancelled too.
+        submitted = threading.Semaphore(0)
+        event = threading.Event()
+        fs = []
+        def submit_nested():
+            fs.extend(self.executor.submit(time.sleep, .1)
+                      for _ in range(20))
+            submitted.release()
+            event.wait()
+        parents = [self.executor.submit(submit_nested) for _ in range(2)]
+        for _ in parents:
+            submitted.acquire()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        event.set()
+        self.executor.shutdown(wait=True)
+        self.assertTrue(any(fut.cancelled() for fut in fs))
+        for fut in parents + fs:
+            self.assertTrue(fut.done())
+
+
 class ProcessPoolShutdownTest(ExecutorShutdownTest):
     def _prime_executor(self):
         pass
@@ -672,6 +723,10 @@ class ThreadPoolWaitTests(ThreadPoolMixin, WaitTests, BaseTestCase):
             sys.setswitchinterval(oldswitchinterval)
 
 
+class WorkStealingWaitTests(WorkStealingMixin, ThreadPoolWaitTests):
+    pass
+
+
 create_executor_tests(WaitTests,
                       executor_mixins=(ProcessPoolForkMixin,
                                        ProcessPoolForkserverMixin,
@@ -787,6 +842,41 @@ class ExecutorTest:
                 list(self.executor.map(pow, range(10), range(10), chunksize=3)),
                 list(map(pow, range(10), range(10))))
 
+    def test_map_buffersize(self):
+        ints = itertools.count()
+        results = self.executor.map(pow, ints, itertools.repeat(2),
+                                    buffersize=4)
+        self.assertEqual([next(results) for _ in range(10)],
+                         [i ** 2 for i in range(10)])
+        # The infinite iterable is consumed lazily.
+        self.assertLessEqual(next(ints), 10 + 4 + 1)
+        results.close()
+
+        self.assertEqual(
+                list(self.executor.map(pow, range(10), range(10),
+                                       chunksize=3, buffersize=2)),
+                list(map(pow, range(10), range(10))))
+
+    def test_map_buffersize_invalid(self):
+        for buffersize in (0, -1):
+            with self.assertRaises(ValueError):
+                self.executor.map(str, range(4), buffersize=buffersize)
+
+    def test_map_buffersize_executor_collected(self):
+        results = self.executor.map(abs, range(8), buffersize=2)
+        self.assertEqual(next(results), 0)
+        executor = self.executor
+        self.executor = None
+        executor.shutdown()
+        executor_ref = weakref.ref(executor)
+        del executor
+        support.gc_collect()
+        # The iterator does not keep the executor alive; the calls already
+        # submitted complete, the others aren't.
+        self.assertIsNone(executor_ref())
+        self.assertEqual(list(results), [1, 2])
+        self.executor = self.executor_type(max_workers=1)
+
     def test_map_exception(self):
         i = self.executor.map(divmod, [1, 1, 1, 1], [2, 3, 0, 5])
         self.assertEqual(i.__next__(), (0, 1))
@@ -884,6 +974,72 @@ class ThreadPoolExecutorTest(ThreadPoolMixin, ExecutorTest, BaseTestCase):
         executor.shutdown(wait=True)
 
 
+def nested_fib(executor, n):
+    if n < 2:
+        return n
+    f1 = executor.submit(nested_fib, executor, n - 1)
+    f2 = executor.submit(nested_fib, executor, n - 2)
+    return f1.result() + f2.result()
+
+
+class WorkStealingThreadPoolExecutorTest(WorkStealingMixin,
+                                         ThreadPoolExecutorTest):
+    def test_nested_waits(self):
+        # Waiting for nested calls doesn't deadlock even with a single
+        # worker thread: the waiting thread runs them.
+        executor = self.executor_type(max_workers=1)
+        self.assertEqual(executor.submit(nested_fib, executor, 15).result(),
+                         610)
+        self.assertEqual(len(executor._threads), 1)
+        executor.shutdown(wait=True)
+
+    def test_nested_exception(self):
+        def parent():
+            return self.executor.submit(divmod, 1, 0).exception()
+        exc = self.executor.submit(parent).result()
+        self.assertIsInstance(exc, ZeroDivisionError)
+        # The call ran in the thread waiting for it: the traceback holds
+        # the frames of that thread in a reference cycle.
+        del exc
+        support.gc_collect()
+
+    def test_nested_map(self):
+        def parent(n):
+            return sum(self.executor.map(abs, range(-n, n)))
+        self.assertEqual(list(self.executor.map(parent, range(10))),
+                         [n * n for n in range(10)])
+
+    def test_stealing(self):
+        # The nested calls run in parallel, so the idle workers stole them
+        # from the deque of the thread which submitted them.
+        barrier = threading.Barrier(self.worker_count - 1)
+        def parent():
+            fs = [self.executor.submit(barrier.wait, support.SHORT_TIMEOUT)
+                  for _ in range(barrier.parties)]
+            return sorted(f.result() for f in fs)
+        self.assertEqual(self.executor.submit(parent).result(),
+                         list(range(barrier.parties)))
+
+    def test_nested_result_timeout(self):
+        event = threading.Event()
+        blocked = self.executor.submit(event.wait)
+        def parent():
+            t = time.monotonic()
+            with self.assertRaises(futures.TimeoutError):
+                blocked.result(timeout=0.1)
+            return time.monotonic() - t
+        self.assertGreaterEqual(self.executor.submit(parent).result(), 0.09)
+        event.set()
+        self.assertTrue(blocked.result())
+
+    def test_foreign_future(self):
+        # Futures of other executors are waited for as usual.
+        with futures.ThreadPoolExecutor(max_workers=1) as other:
+            def parent():
+                return other.submit(mul, 6, 7).result()
+            self.assertEqual(self.executor.submit(parent).result(), 42)
+
+
 class ProcessPoolExecutorTest(ExecutorTest):
 
     @unittest.skipUnless(sys.platform=='win32', 'Windows-only process limit')
@@ -920,6 +1076,31 @@ class ProcessPoolExecutorTest(ExecutorTest):
             ref)
         self.assertRaises(ValueError, bad_map)
 
+    def test_map_auto_chunksize(self):
+        ref = list(map(pow, range(200), range(200)))
+        self.assertEqual(
+            list(self.executor.map(pow, range(200), range(200),
+                                   chunksize=None)),
+            ref)
+        self.assertEqual(
+            list(self.executor.map(pow, range(200), range(200),
+                                   chunksize=None, buffersize=1)),
+            ref)
+        self.assertEqual(list(self.executor.map(pow, [], chunksize=None)), [])
+
+        ints = itertools.count()
+        results = self.executor.map(abs, ints, chunksize=None)
+        self.assertEqual([next(results) for _ in range(100)], list(range(100)))
+        results.close()
+        # At most 2 * worker_count chunks are outstanding.
+        self.assertLessEqual(next(ints), 100 + 2 * self.worker_count *
+                             futures.process._MAX_AUTO_CHUNKSIZE)
+
+        results = self.executor.map(divmod, [1, 1, 1], [2, 0, 5],
+                                    chunksize=None)
+        self.assertEqual(next(results), (0, 1))
+        self.assertRaises(ZeroDivisionError, next, results)
+
     @classmethod
     def _test_traceback(cls):
         raise RuntimeError(123) # some comment
@@ -970,6 +1151,122 @@ create_executor_tests(ProcessPoolExecutorTest,
                                        ProcessPoolForkserverMixin,
                                        ProcessPoolSpawnMixin))
 
+
+class SharedMemoryTransportTest:
+    worker_count = 2
+    executor_kwargs = dict(shared_memory_threshold=1024)
+
+    def segment_names(self):
+        return {name for name in os.listdir('/dev/shm')
+                if name.startswith('psm_')}
+
+    def setUp(self):
+        if not os.path.isdir('/dev/shm'):
+            self.skipTest('requires /dev/shm')
+        self.segments_before = self.segment_names()
+        super().setUp()
+
+    def tearDown(self):
+        super().tearDown()
+        self.assertEqual(self.segment_names(), self.segments_before)
+        self.assertEqual(futures.process._mapped_segments, [])
+
+    @contextlib.contextmanager
+    def count_segments(self):
+        # Counts the segments of the arguments sent and of the results
+        # received.
+        counts = {'sent': 0, 'received': 0}
+        process = futures.process
+        dumps_shared = process._dumps_shared
+        loads_shared = process._loads_shared
+
+        def counting_dumps(obj, threshold):
+            payload, segments = dumps_shared(obj, threshold)
+            counts['sent'] += len(segments)
+            return payload, segments
+
+        def counting_loads(payload):
+            counts['received'] += len(payload.segments)
+            return loads_shared(payload)
+
+        with mock.patch.object(process, '_dumps_shared', counting_dumps), \
+             mock.patch.object(process, '_loads_shared', counting_loads):
+            yield counts
+
+    def test_arguments_and_results(self):
+        for size, segments in ((10, 0), (100000, 1)):
+            data = bytearray(os.urandom(size))
+            with self.count_segments() as counts:
+                self.assertEqual(
+                    self.executor.submit(reverse_buffer, data).result(),
+                    data[::-1])
+            self.assertEqual(counts['sent'], segments)
+            if sys.platform != 'win32':
+                self.assertEqual(counts['received'], segments)
+
+    def test_argument_types(self):
+        # bytes, bytearray and memoryview objects keep their type, also
+        # inside containers.
+        data = b'abcd' * 1000
+        args = [data, bytearray(data), memoryview(data),
+                memoryview(bytearray(data)).cast('I', [10, 100])]
+        with self.count_segments() as counts:
+            result = self.executor.submit(describe_buffers, args).result()
+        self.assertEqual(counts['sent'], 4)
+        self.assertEqual(result, [('bytes', b'abcd', 4000, True),
+                                  ('bytearray', b'abcd', 4000, False),
+                                  ('memoryview', b'abcd', 4000, True),
+                                  ('memoryview', b'abcd', 10, False)])
+
+    def test_out_of_band_buffers(self):
+        # Large buffers are read from the shared memory without a copy.
+        data = pickle.PickleBuffer(bytearray(b'abcd' * 1000))
+        self.assertEqual(self.executor.submit(describe_buffer, data).result(),
+                         ('memoryview', b'abcd', 4000))
+        data = pickle.PickleBuffer(bytearray(b'abcd'))
+        self.assertEqual(self.executor.submit(describe_buffer, data).result(),
+                         ('bytearray', b'abcd', 4))
+
+    def test_result_kept_mapped(self):
+        result = self.executor.submit(make_buffer, 5000).result()
+        self.assertIsInstance(result, memoryview)
+        self.assertEqual(bytes(result), b'x' * 5000)
+        self.assertEqual(len(futures.process._mapped_segments), 1)
+        result.release()
+        # The segment is closed with the next ones.
+        self.assertEqual(self.executor.submit(make_buffer, 10).result(),
+                         b'x' * 10)
+        self.assertEqual(futures.process._mapped_segments, [])
+
+    def test_map(self):
+        data = [bytearray([i]) * 2000 for i in range(10)]
+        with self.count_segments() as counts:
+            self.assertEqual(
+                list(self.executor.map(reverse_buffer, data, chunksize=3)),
+                data)
+        self.assertEqual(counts['sent'], 10)
+        if sys.platform != 'win32':
+            self.assertEqual(counts['received'], 10)
+
+    def test_exception(self):
+        future = self.executor.submit(reverse_buffer, bytearray(5000), 1)
+        self.assertRaises(TypeError, future.result)
+
+    def test_pickling_error(self):
+        future = self.executor.submit(reverse_buffer,
+                                      [bytearray(5000), ErrorAtPickle()])
+        self.assertRaises(PicklingError, future.result)
+
+    def test_invalid_threshold(self):
+        with self.assertRaises(ValueError):
+            futures.ProcessPoolExecutor(shared_memory_threshold=-1)
+
+
+create_executor_tests(SharedMemoryTransportTest,
+                      executor_mixins=(ProcessPoolForkMixin,
+                                       ProcessPoolForkserverMixin,
+                                       ProcessPoolSpawnMixin))
+
 def hide_process_stderr():
     import io
     sys.stderr = io.StringIO()
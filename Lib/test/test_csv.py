@@ -1,14 +1,18 @@
 # Copyright (C) 2001,2002 Python Software Foundation
 # csv package unit tests
 
+import array
+import collections.abc
 import copy
 import sys
 import unittest
+from unittest import mock
 from io import StringIO
 from tempfile import TemporaryFile
 import csv
 import gc
 import pickle
+import re
 from test import support
 from itertools import permutations
 from textwrap import dedent
@@ -230,6 +234,41 @@ class Test_Csv(unittest.TestCase):
             fileobj.seek(0)
             self.assertEqual(fileobj.read(), 'a\r\n""\r\n')
 
+    def test_writerows_batched(self):
+        class CountingFile(StringIO):
+            writes = 0
+            def write(self, buf):
+                self.writes += 1
+                return super().write(buf)
+        fileobj = CountingFile()
+        writer = csv.writer(fileobj)
+        rows = [['a', i, None] for i in range(10000)]
+        writer.writerows(rows)
+        self.assertEqual(fileobj.getvalue(),
+                         ''.join('a,%d,\r\n' % i for i in range(10000)))
+        writes = fileobj.writes
+        self.assertLess(writes, 10)
+        writer.writerows([])
+        self.assertEqual(fileobj.writes, writes)
+
+    def test_writerows_error_writes_previous_rows(self):
+        class BadItem:
+            def __str__(self):
+                raise OSError
+        fileobj = StringIO()
+        writer = csv.writer(fileobj)
+        with self.assertRaises(OSError):
+            writer.writerows([['a', 'b'], ['c', BadItem()], ['d']])
+        self.assertEqual(fileobj.getvalue(), 'a,b\r\n')
+        def rows():
+            yield ['e']
+            raise KeyError
+        with self.assertRaises(KeyError):
+            writer.writerows(rows())
+        self.assertEqual(fileobj.getvalue(), 'a,b\r\ne\r\n')
+        writer.writerow(['f'])
+        self.assertEqual(fileobj.getvalue(), 'a,b\r\ne\r\nf\r\n')
+
     @support.cpython_only
     def test_writerows_legacy_strings(self):
         import _testcapi
@@ -331,6 +370,76 @@ class Test_Csv(unittest.TestCase):
         self.assertRaises(StopIteration, next, r)
         self.assertEqual(r.line_num, 3)
 
+    def test_read_columns(self):
+        r = csv.reader(['a,b,c', '1,2', '', '"3\n4",5,6,7'])
+        self.assertEqual(r.read_columns(),
+                         [['a', '1', '3\n4'], ['b', '2', '5'],
+                          ['c', None, '6'], [None, None, '7']])
+        self.assertEqual(r.line_num, 4)
+        self.assertEqual(r.read_columns(), [])
+        self.assertEqual(csv.reader([]).read_columns(), [])
+
+    def test_read_columns_rows(self):
+        r = csv.reader(['x,y', '1,2', '3,4', '5,6'])
+        self.assertEqual(next(r), ['x', 'y'])
+        self.assertEqual(r.read_columns(2), [['1', '3'], ['2', '4']])
+        self.assertEqual(list(r), [['5', '6']])
+        self.assertEqual(r.read_columns(0), [])
+
+    def test_read_columns_dtypes(self):
+        r = csv.reader(['1,2.5,a,b', '-3, 4,c,d'])
+        self.assertEqual(r.read_columns(dtypes=[int, float, str]),
+                         [[1, -3], [2.5, 4.0], ['a', 'c'], ['b', 'd']])
+        r = csv.reader(['1,"a"'], quoting=csv.QUOTE_NONNUMERIC)
+        self.assertEqual(r.read_columns(dtypes=[int, None]), [[1], ['a']])
+        r = csv.reader(['1,x'])
+        self.assertRaises(ValueError, r.read_columns, dtypes=[int, int])
+        r = csv.reader(['1'])
+        self.assertRaises(TypeError, r.read_columns, dtypes=[list])
+        self.assertRaises(TypeError, r.read_columns, dtypes=1)
+
+    def test_read_columns_conversion_error(self):
+        # The rest of the bad record is read: the reader continues with the
+        # next record, but the records read by the failed call are lost.
+        r = csv.reader(['1,2', 'x,"3', 'y",z', '4,5'])
+        self.assertRaises(ValueError, r.read_columns, dtypes=[int])
+        self.assertEqual(r.line_num, 3)
+        self.assertEqual(r.read_columns(dtypes=[int]), [[4], ['5']])
+        r = csv.reader(['1,x', '2,3'], quoting=csv.QUOTE_NONNUMERIC)
+        self.assertRaises(ValueError, r.read_columns, 1)
+        self.assertEqual(r.read_columns(), [[2.0], [3.0]])
+
+    def test_read_columns_array_missing_field(self):
+        r = csv.reader(['1,2', '', '3', '4,5'])
+        with self.assertRaisesRegex(csv.Error, 'line 3: .*column 1'):
+            r.read_columns(dtypes=['q', 'q'])
+        self.assertEqual(r.read_columns(dtypes=['q', 'q']),
+                         [array.array('q', [4]), array.array('q', [5])])
+        r = csv.reader(['1', '2,3', '4'])
+        with self.assertRaisesRegex(csv.Error, 'line 2: column 1'):
+            r.read_columns(dtypes=['q', 'q'])
+        self.assertEqual(r.read_columns(), [['4']])
+        # Other columns are still padded with None.
+        self.assertEqual(csv.reader(['1,2', '3']).read_columns(dtypes=['q']),
+                         [array.array('q', [1, 3]), ['2', None]])
+        for dtype in ('x', 'qq', '\0', '\u0162'):
+            self.assertRaises(TypeError, csv.reader(['1']).read_columns,
+                              dtypes=[dtype])
+
+    def test_read_columns_errors(self):
+        r = csv.reader(['a,b', 'c,"d'], strict=True)
+        self.assertRaises(csv.Error, r.read_columns)
+        self.assertRaises(csv.Error, csv.reader([b'a']).read_columns)
+
+    def test_read_columns_function(self):
+        result = csv.read_columns(['1;2.5;a', '3;4;b'], delimiter=';',
+                                  dtypes=['q', 'd'])
+        self.assertEqual(result, [array.array('q', [1, 3]),
+                                  array.array('d', [2.5, 4.0]),
+                                  ['a', 'b']])
+        self.assertEqual(csv.read_columns(['a', 'b', 'c'], rows=2),
+                         [['a', 'b']])
+
     def test_roundtrip_quoteed_newlines(self):
         with TemporaryFile("w+", newline='') as fileobj:
             writer = csv.writer(fileobj)
@@ -635,6 +744,58 @@ class TestDictFields(unittest.TestCase):
         self.assertEqual(fileobj.getvalue(),
                          "f1,f2,f3\r\n1,abc,f\r\n2,5,xyz\r\n")
 
+    def test_write_multiple_dict_rows_restval(self):
+        fileobj = StringIO()
+        writer = csv.DictWriter(fileobj, fieldnames=["f1", "f2", "f3"],
+                                restval="-")
+        writer.writerows([{"f1": 1}, {}, {"f3": None, "f2": 2}])
+        self.assertEqual(fileobj.getvalue(), "1,-,-\r\n-,-,-\r\n-,2,\r\n")
+
+    def test_write_multiple_dict_rows_mapping(self):
+        class Row(collections.abc.Mapping):
+            def __init__(self, **kw):
+                self.data = kw
+            def __getitem__(self, key):
+                return self.data[key]
+            def __iter__(self):
+                return iter(self.data)
+            def __len__(self):
+                return len(self.data)
+        fileobj = StringIO()
+        writer = csv.DictWriter(fileobj, fieldnames=["f1", "f2"])
+        writer.writerows([Row(f1=1, f2=2), Row(f2=3), OrderedDict(f1=4)])
+        self.assertEqual(fileobj.getvalue(), "1,2\r\n,3\r\n4,\r\n")
+        with self.assertRaises(ValueError) as cx:
+            writer.writerows([Row(f3=5)])
+        self.assertIn("'f3'", str(cx.exception))
+
+    def test_write_multiple_dict_rows_extras(self):
+        fileobj = StringIO()
+        writer = csv.DictWriter(fileobj, fieldnames=["f1", "f2"])
+        with self.assertRaises(ValueError) as cx:
+            writer.writerows([{"f1": 1}, {"f2": 2, "f4": 4, 5: 5}, {}])
+        exception = str(cx.exception)
+        self.assertIn("'f4'", exception)
+        self.assertIn("5", exception)
+        self.assertNotIn("'f2'", exception)
+        self.assertEqual(fileobj.getvalue(), "1,\r\n")
+        self.assertRaises(AttributeError, writer.writerows, [["f1"]])
+
+        fileobj = StringIO()
+        writer = csv.DictWriter(fileobj, fieldnames=["f1", "f2"],
+                                extrasaction="ignore")
+        writer.writerows([{"f1": 1, "f3": 3}, {"f4": 4}])
+        self.assertEqual(fileobj.getvalue(), "1,\r\n,\r\n")
+
+    def test_write_multiple_dict_rows_subclass(self):
+        class UpperDictWriter(csv.DictWriter):
+            def _dict_to_list(self, rowdict):
+                return [str(v).upper() for v in super()._dict_to_list(rowdict)]
+        fileobj = StringIO()
+        writer = UpperDictWriter(fileobj, fieldnames=["f1", "f2"])
+        writer.writerows([{"f1": "a", "f2": "b"}])
+        self.assertEqual(fileobj.getvalue(), "A,B\r\n")
+
     def test_write_no_fields(self):
         fileobj = StringIO()
         self.assertRaises(TypeError, csv.DictWriter, fileobj)
@@ -1051,6 +1212,66 @@ Stonecutters Seafood and Chop House+ Lemont+ IL+ 12/19/02+ Week Back
         dialect = sniffer.sniff(self.sample9)
         self.assertTrue(dialect.doublequote)
 
+    def test_find_quoted(self):
+        # _find_quoted() must find the same matches as the regular
+        # expressions Sniffer used to search the sample with.
+        patterns = [
+            r'(?P<delim>[^\w\n"\'])(?P<space> ?)(?P<quote>["\']).*?(?P=quote)(?P=delim)',
+            r'(?:^|\n)(?P<quote>["\']).*?(?P=quote)(?P<delim>[^\w\n"\'])(?P<space> ?)',
+            r'(?P<delim>[^\w\n"\'])(?P<space> ?)(?P<quote>["\']).*?(?P=quote)(?:$|\n)',
+            r'(?:^|\n)(?P<quote>["\']).*?(?P=quote)(?:$|\n)',
+        ]
+        def expected(data):
+            for pattern in patterns:
+                regexp = re.compile(pattern, re.DOTALL | re.MULTILINE)
+                matches = [(m['quote'], m.groupdict().get('delim'),
+                            m.groupdict().get('space'))
+                           for m in regexp.finditer(data)]
+                if matches:
+                    return matches
+            return []
+        samples = [self.sample1, self.sample2, self.header1, self.sample3,
+                   self.sample4, self.sample5, self.sample6, self.sample7,
+                   self.header2, self.sample8, self.sample9,
+                   "", "'", "''", "'a'", ",'a", "'a',", ",'a',", ", 'a',",
+                   ",'a', 'b',\n'c'", "'a'\n'b'", "\n'a'\n", ";'a;b';'c'",
+                   "''''", ",'a\n,'b',", "'a\"b',\"c'\n", ", ', '\n",
+                   " '\n' ", "''a'',", "x'a'x, 'b'\t'c'\t"]
+        for sample in samples:
+            with self.subTest(sample=sample):
+                self.assertEqual(csv._find_quoted(sample), expected(sample))
+
+    def test_has_doublequote(self):
+        samples = ['', '"""', 'a"""', '"a"b"', ',"a""b",', 'a,"""",b',
+                   ',""",\n', '"a"\n"b"', ' "x" "y" ', '+"a""b"+c', '""\n"']
+        for sample in samples:
+            for delim in ('', ',', '+', ' '):
+                regexp = re.compile(
+                    r"((%(delim)s)|^)\W*%(quote)s[^%(delim)s\n]*%(quote)s"
+                    r"[^%(delim)s\n]*%(quote)s\W*((%(delim)s)|$)"
+                    % {'delim': re.escape(delim), 'quote': '"'}, re.MULTILINE)
+                with self.subTest(sample=sample, delim=delim):
+                    self.assertEqual(csv._has_doublequote(sample, '"', delim),
+                                     bool(regexp.search(sample)))
+
+    def test_sniff_unbalanced_quotes(self):
+        # Unbalanced quotes used to make sniff() take quadratic time.
+        sniffer = csv.Sniffer()
+        dialect = sniffer.sniff(',"a' * 20000)
+        self.assertEqual(dialect.delimiter, ',')
+        self.assertEqual(dialect.quotechar, '"')
+        dialect = sniffer.sniff('a;"b\n' * 5000)
+        self.assertEqual(dialect.delimiter, ';')
+
+    def test_sample_limit(self):
+        sample = self.sample1 + 'x:y:z\n' * 1000
+        self.assertNotEqual(csv.Sniffer().sniff(sample).delimiter, ',')
+        sniffer = csv.Sniffer(sample_limit=len(self.sample1) + 3)
+        self.assertEqual(sniffer.sniff(sample).delimiter, ',')
+        self.assertIs(sniffer.has_header(sample), False)
+        sniffer = csv.Sniffer(sample_limit=10)
+        self.assertEqual(sniffer.sniff('a;b;c;d;e;f;g').delimiter, ';')
+
 class NUL:
     def write(s, *args):
         pass
@@ -1198,6 +1419,102 @@ class KeyOrderingTest(unittest.TestCase):
             ])
 
 
+class TestParallelReader(unittest.TestCase):
+    rows = [[str(i), 'a\r\n"b"' if i % 3 else 'c', 'd,e' * (i % 5)]
+            for i in range(500)]
+
+    def setUp(self):
+        self.addCleanup(support.unlink, support.TESTFN)
+        with open(support.TESTFN, 'w', encoding='utf-8', newline='') as f:
+            csv.writer(f).writerows(self.rows)
+
+    def test_chunk_boundaries(self):
+        with open(support.TESTFN, 'rb') as f:
+            data = f.read()
+            size = len(data)
+            chunks = list(csv._chunk_boundaries(f, size, 1000, b'"'))
+        self.assertGreater(len(chunks), 5)
+        self.assertEqual(chunks[0][0], 0)
+        self.assertEqual(chunks[-1][1], size)
+        for (start, end), (next_start, _) in zip(chunks, chunks[1:]):
+            self.assertEqual(end, next_start)
+        rows = []
+        for start, end in chunks:
+            text = data[start:end].decode('utf-8')
+            rows.extend(csv.reader(StringIO(text, newline='')))
+        self.assertEqual(rows, self.rows)
+
+    def test_parallel_reader(self):
+        result = csv.parallel_reader(support.TESTFN, workers=2,
+                                     chunksize=1000, encoding='utf-8',
+                                     strict=True)
+        self.assertEqual(list(result), self.rows)
+
+    def test_parallel_reader_columns(self):
+        batches = list(csv.parallel_reader(support.TESTFN, workers=2,
+                                           chunksize=4000, encoding='utf-8',
+                                           columns=True, strict=True))
+        self.assertGreater(len(batches), 1)
+        self.assertEqual([int(x) for batch in batches for x in batch[0]],
+                         list(range(500)))
+
+    def test_parallel_reader_single_chunk(self):
+        result = csv.parallel_reader(support.TESTFN, encoding='utf-8')
+        self.assertEqual(list(result), self.rows)
+        # escaped newlines prevent splitting the file
+        result = csv.parallel_reader(support.TESTFN, chunksize=100,
+                                     encoding='utf-8', escapechar='\\',
+                                     strict=True)
+        self.assertEqual(list(result), self.rows)
+
+    def test_parallel_reader_stray_quotes(self):
+        # the stray quote makes the quoted newlines look like record ends
+        rows = [['a"b', 'c']] + [['x', 'y\nz']] * 100
+        with open(support.TESTFN, 'w', encoding='utf-8', newline='') as f:
+            f.write('a"b,c\r\n')
+            csv.writer(f).writerows(rows[1:])
+        # a non-strict dialect is not split
+        with mock.patch.object(csv, '_chunk_boundaries') as boundaries:
+            result = csv.parallel_reader(support.TESTFN, chunksize=100,
+                                         encoding='utf-8')
+            self.assertEqual(list(result), rows)
+        boundaries.assert_not_called()
+        # a strict one is, and the wrong split is reported
+        result = csv.parallel_reader(support.TESTFN, workers=2,
+                                     chunksize=100, encoding='utf-8',
+                                     strict=True)
+        self.assertRaises(csv.Error, list, result)
+
+    def test_parallel_reader_close(self):
+        from concurrent.futures import ProcessPoolExecutor
+        submit = ProcessPoolExecutor.submit
+        submitted = []
+        def counting_submit(executor, *args, **kwargs):
+            future = submit(executor, *args, **kwargs)
+            submitted.append(future)
+            return future
+        with mock.patch.object(ProcessPoolExecutor, 'submit',
+                               counting_submit):
+            result = csv.parallel_reader(support.TESTFN, workers=2,
+                                         chunksize=1000, encoding='utf-8',
+                                         strict=True)
+            self.assertEqual(next(result), self.rows[0])
+            # at most 2 * workers chunks are submitted ahead
+            self.assertLessEqual(len(submitted), 5)
+            result.close()
+        # the other chunks are never submitted, and the submitted ones
+        # that did not start are cancelled
+        self.assertLessEqual(len(submitted), 5)
+        for future in submitted:
+            self.assertTrue(future.running() or future.done())
+
+    def test_parallel_reader_errors(self):
+        self.assertRaises(ValueError, list,
+                          csv.parallel_reader(support.TESTFN, chunksize=0))
+        self.assertRaises(csv.Error, list,
+                          csv.parallel_reader(support.TESTFN, dialect='spam'))
+
+
 class MiscTestCase(unittest.TestCase):
     def test__all__(self):
         extra = {'__doc__', '__version__'}
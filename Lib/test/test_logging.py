@@ -39,6 +39,7 @@ import re
 import signal
 import socket
 import struct
+import string
 import sys
 import tempfile
 from test.support.script_helper import assert_python_ok, assert_python_failure
@@ -1168,6 +1169,161 @@ class MemoryHandlerTest(BaseTest):
         self.assert_log_lines(lines)  # no change
 
 
+class BlockingHandler(logging.Handler):
+    """A handler which records what it handles, optionally waiting for an
+    event before handling each record."""
+
+    def __init__(self, level=logging.NOTSET):
+        logging.Handler.__init__(self, level)
+        self.records = []
+        self.threads = set()
+        self.entered = threading.Event()
+        self.proceed = threading.Event()
+        self.proceed.set()
+
+    def emit(self, record):
+        self.entered.set()
+        self.proceed.wait()
+        self.threads.add(threading.current_thread())
+        self.records.append(record)
+
+
+class AsyncHandlerTest(BaseTest):
+
+    """Tests for the AsyncHandler."""
+
+    expected_log_pat = r"^[\w.]+ -> (\w+): (\d+)$"
+
+    def setUp(self):
+        BaseTest.setUp(self)
+        self.async_logger = logging.getLogger('async')
+        self.async_logger.propagate = False
+        self.addCleanup(setattr, self.async_logger, 'handlers', [])
+
+    def make_handler(self, *handlers, **kwargs):
+        handler = logging.handlers.AsyncHandler(handlers, **kwargs)
+        self.addCleanup(handler.close)
+        self.async_logger.addHandler(handler)
+        return handler
+
+    def test_flush(self):
+        self.make_handler(self.root_hdlr)
+        for i in range(5):
+            self.async_logger.info(self.next_message())
+        self.async_logger.handlers[0].flush()
+        self.assert_log_lines([('INFO', str(i)) for i in range(1, 6)])
+
+    def test_flush_while_logging(self):
+        # flush() returns even if other threads never let the buffer empty.
+        class SlowHandler(logging.Handler):
+            def emit(self, record):
+                time.sleep(0.001)
+        handler = self.make_handler(SlowHandler())
+        done = threading.Event()
+        def log():
+            while not done.is_set():
+                self.async_logger.error('spam')
+        threads = [threading.Thread(target=log) for _ in range(2)]
+        for t in threads:
+            t.start()
+        try:
+            time.sleep(0.05)
+            flusher = threading.Thread(target=handler.flush)
+            flusher.start()
+            flusher.join(support.SHORT_TIMEOUT)
+            self.assertFalse(flusher.is_alive())
+        finally:
+            done.set()
+            for t in threads:
+                t.join()
+
+    def test_writer_thread(self):
+        target = BlockingHandler()
+        handler = self.make_handler(target)
+        self.async_logger.error('spam')
+        handler.flush()
+        self.assertEqual([r.msg for r in target.records], ['spam'])
+        self.assertEqual(target.threads, {handler._thread})
+        self.assertIsNot(handler._thread, threading.current_thread())
+
+    def test_handler_level(self):
+        info = BlockingHandler(logging.INFO)
+        error = BlockingHandler(logging.ERROR)
+        handler = self.make_handler(info, error)
+        self.async_logger.debug('debug')
+        self.async_logger.info('info')
+        self.async_logger.error('error')
+        handler.flush()
+        self.assertEqual([r.msg for r in info.records], ['info', 'error'])
+        self.assertEqual([r.msg for r in error.records], ['error'])
+
+    def fill(self, handler, target, n):
+        # Keep the writer thread busy with one record, then log n more.
+        target.proceed.clear()
+        self.async_logger.info('first')
+        self.assertTrue(target.entered.wait(support.SHORT_TIMEOUT))
+        for i in range(n):
+            self.async_logger.info('%d', i)
+
+    def test_overflow_drop(self):
+        target = BlockingHandler()
+        handler = self.make_handler(target, capacity=2, overflow='drop')
+        self.fill(handler, target, 5)
+        self.assertEqual(handler.dropped, 3)
+        target.proceed.set()
+        handler.flush()
+        self.assertEqual([r.getMessage() for r in target.records],
+                         ['first', '0', '1'])
+
+    def test_overflow_count(self):
+        target = BlockingHandler()
+        handler = self.make_handler(target, capacity=2, overflow='count')
+        self.fill(handler, target, 5)
+        self.assertEqual(handler.dropped, 3)
+        target.proceed.set()
+        handler.flush()
+        messages = [r.getMessage() for r in target.records]
+        self.assertEqual(messages[:3], ['first', '0', '1'])
+        self.assertEqual(len(messages), 4)
+        self.assertIn('3 log records were dropped', messages[3])
+        self.assertEqual(target.records[3].levelno, logging.WARNING)
+
+    def test_overflow_block(self):
+        target = BlockingHandler()
+        handler = self.make_handler(target, capacity=1)
+        self.fill(handler, target, 1)
+        t = threading.Thread(target=self.async_logger.info, args=('blocked',))
+        t.start()
+        t.join(0.1)
+        self.assertTrue(t.is_alive())
+        target.proceed.set()
+        t.join()
+        handler.flush()
+        self.assertEqual(handler.dropped, 0)
+        self.assertEqual([r.getMessage() for r in target.records],
+                         ['first', '0', 'blocked'])
+
+    def test_close(self):
+        target = BlockingHandler()
+        handler = self.make_handler(target)
+        self.fill(handler, target, 3)
+        thread = handler._thread
+        target.proceed.set()
+        handler.close()
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(target.records), 4)
+        # Records emitted after close are handled synchronously.
+        self.async_logger.info('late')
+        self.assertEqual(target.records[-1].msg, 'late')
+        self.assertEqual(target.threads - {thread},
+                         {threading.current_thread()})
+
+    def test_invalid_arguments(self):
+        AsyncHandler = logging.handlers.AsyncHandler
+        self.assertRaises(ValueError, AsyncHandler, [], overflow='spam')
+        self.assertRaises(ValueError, AsyncHandler, [], capacity=0)
+
+
 class ExceptionFormatter(logging.Formatter):
     """A special exception formatter."""
     def formatException(self, ei):
@@ -1750,6 +1906,104 @@ def _get_temp_domain_socket():
     os.remove(fn)
     return fn
 
+class JSONSocketHandlerTest(BaseTest):
+
+    """Test for JSONSocketHandler and JSONRecordReceiver objects."""
+
+    def setUp(self):
+        BaseTest.setUp(self)
+        self.received = []
+        self.handled = threading.Semaphore(0)
+
+        test = self
+        class Receiver(logging.handlers.JSONRecordReceiver):
+            def handleRecord(self, record):
+                test.received.append(record)
+                test.handled.release()
+
+        self.server = Receiver('localhost', 0)
+        self.addCleanup(self.server.server_close)
+        thread = threading.Thread(target=self.server.serve_forever,
+                                  kwargs={'poll_interval': 0.01})
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(self.server.shutdown)
+
+    def make_handler(self, **kwargs):
+        handler = logging.handlers.JSONSocketHandler(
+            'localhost', self.server.server_address[1], **kwargs)
+        self.addCleanup(handler.close)
+        logger = logging.getLogger('json')
+        logger.propagate = False
+        logger.addHandler(handler)
+        self.addCleanup(logger.removeHandler, handler)
+        return logger, handler
+
+    def wait_handled(self, n):
+        for _ in range(n):
+            self.assertTrue(self.handled.acquire(timeout=support.SHORT_TIMEOUT))
+
+    def test_format(self):
+        handler = logging.handlers.JSONSocketHandler('localhost', 0)
+        self.addCleanup(handler.close)
+        record = logging.makeLogRecord({'msg': 'spam %s', 'args': ('eggs',),
+                                        'obj': object()})
+        data = handler.makePickle(record)
+        slen = struct.unpack('>L', data[:4])[0]
+        self.assertEqual(slen, len(data) - 4)
+        d = json.loads(data[4:].decode('utf-8'))
+        self.assertEqual(d['msg'], 'spam eggs')
+        self.assertIsNone(d['args'])
+        self.assertTrue(d['obj'].startswith('<object object at '))
+        self.assertEqual(d['created'], record.created)
+
+    def test_receiver_imported_lazily(self):
+        code = ('import sys, logging.handlers; '
+                'print("socketserver" in sys.modules); '
+                'logging.handlers.JSONRecordReceiver; '
+                'print("socketserver" in sys.modules)')
+        rc, out, err = assert_python_ok('-c', code)
+        self.assertEqual(out.split(), [b'False', b'True'])
+
+    def test_output(self):
+        logger, handler = self.make_handler()
+        logger.info('spam %d', 1)
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            logger.exception('eggs')
+        self.wait_handled(2)
+        first, second = self.received
+        self.assertEqual(first.msg, 'spam 1')
+        self.assertEqual(first.name, 'json')
+        self.assertEqual(first.levelno, logging.INFO)
+        self.assertEqual(second.msg, 'eggs')
+        self.assertIn('ZeroDivisionError', second.exc_text)
+
+    def test_batching(self):
+        logger, handler = self.make_handler(capacity=3)
+        sent = []
+        send = handler.send
+        def counting_send(data):
+            sent.append(data)
+            send(data)
+        handler.send = counting_send
+        logger.info('1')
+        logger.info('2')
+        self.assertEqual(sent, [])
+        logger.info('3')
+        self.assertEqual(len(sent), 1)
+        logger.info('4')
+        logger.error('5')
+        self.assertEqual(len(sent), 2)
+        logger.info('6')
+        handler.flush()
+        self.assertEqual(len(sent), 3)
+        self.wait_handled(6)
+        self.assertEqual([r.msg for r in self.received],
+                         ['1', '2', '3', '4', '5', '6'])
+
+
 @unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Unix sockets required")
 class UnixSocketHandlerTest(SocketHandlerTest):
 
@@ -2814,6 +3068,39 @@ class ConfigDictTest(BaseTest):
         }
     }
 
+    # Configuration with an AsyncHandler wrapping two other handlers, one of
+    # which sorts after it and is therefore configured later.
+    config_async = {
+        'version': 1,
+        'formatters': {
+            'form1' : {
+                'format' : '%(levelname)s ++ %(message)s',
+            },
+        },
+        'handlers' : {
+            'hand1' : {
+                'class' : 'logging.StreamHandler',
+                'formatter' : 'form1',
+                'level' : 'NOTSET',
+                'stream'  : 'ext://sys.stdout',
+            },
+            'async' : {
+                'class' : 'logging.handlers.AsyncHandler',
+                'handlers' : ['hand1', 'zbuffer'],
+                'capacity' : 100,
+                'overflow' : 'drop',
+            },
+            'zbuffer' : {
+                'class' : 'logging.handlers.BufferingHandler',
+                'capacity' : 10,
+            },
+        },
+        'root' : {
+            'level' : 'WARNING',
+            'handlers' : ['async'],
+        },
+    }
+
     # Configuration with custom logging.Formatter subclass as '()' key and 'validate' set to False
     custom_formatter_class_validate = {
         'version': 1,
@@ -3332,6 +3619,20 @@ class ConfigDictTest(BaseTest):
         self.assertIsInstance(handler.formatter._style,
                               logging.StringTemplateStyle)
 
+    def test_config_async(self):
+        with support.captured_stdout() as output:
+            self.apply_config(self.config_async)
+            handler = logging.root.handlers[0]
+            self.assertIsInstance(handler, logging.handlers.AsyncHandler)
+            self.assertEqual(handler.capacity, 100)
+            self.assertEqual(handler.overflow, 'drop')
+            hand1, zbuffer = handler.handlers
+            self.assertEqual(hand1.name, 'hand1')
+            self.assertIsInstance(zbuffer, logging.handlers.BufferingHandler)
+            logging.warning(self.next_message())
+            handler.flush()
+        self.assert_log_lines([('WARNING', '1')], stream=output)
+
     def test_custom_formatter_class_with_validate(self):
         self.apply_config(self.custom_formatter_class_validate)
         handler = logging.getLogger("my_test_logger_custom_formatter").handlers[0]
@@ -3692,6 +3993,64 @@ if hasattr(logging.handlers, 'QueueListener'):
                 # Make sure all tasks are done and .join won't block.
                 log_queue.task_done()
 
+        def make_records(self, n):
+            return [logging.makeLogRecord({'msg': str(i),
+                                           'levelno': logging.INFO})
+                    for i in range(n)]
+
+        def test_batch_size(self):
+            class BatchListener(logging.handlers.QueueListener):
+                def handle_batch(self, records):
+                    batches.append(len(records))
+                    super().handle_batch(records)
+
+            batches = []
+            log_queue = queue.Queue()
+            handler = BlockingHandler()
+            for record in self.make_records(7):
+                log_queue.put_nowait(record)
+            listener = BatchListener(log_queue, handler, batch_size=3)
+            listener.start()
+            listener.stop()
+            self.assertEqual(batches, [3, 3, 1])
+            self.assertEqual([r.msg for r in handler.records],
+                             [str(i) for i in range(7)])
+            with self.assertRaises(ValueError):
+                log_queue.task_done()
+            self.assertRaises(ValueError, logging.handlers.QueueListener,
+                              log_queue, batch_size=0)
+
+        def test_handler_threads(self):
+            log_queue = queue.Queue()
+            slow = BlockingHandler()
+            fast = BlockingHandler()
+            error = BlockingHandler(logging.ERROR)
+            slow.proceed.clear()
+            listener = logging.handlers.QueueListener(
+                log_queue, slow, fast, error, respect_handler_level=True,
+                batch_size=10, handler_threads=True)
+            listener.start()
+            records = self.make_records(5)
+            records[2].levelno = logging.ERROR
+            for record in records:
+                log_queue.put_nowait(record)
+            log_queue.join()
+            # The fast handlers are not held up by the slow one.
+            self.assertTrue(slow.entered.wait(support.SHORT_TIMEOUT))
+            deadline = time.monotonic() + support.SHORT_TIMEOUT
+            while len(fast.records) < 5 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual([r.msg for r in fast.records],
+                             [str(i) for i in range(5)])
+            self.assertEqual(slow.records, [])
+            slow.proceed.set()
+            listener.stop()
+            self.assertEqual([r.msg for r in slow.records],
+                             [str(i) for i in range(5)])
+            self.assertEqual([r.msg for r in error.records], ['2'])
+            self.assertEqual(len(fast.threads | slow.threads | error.threads),
+                             3)
+
 
 ZERO = datetime.timedelta(0)
 
@@ -3785,6 +4144,31 @@ class FormatterTest(unittest.TestCase):
         f = logging.Formatter('${asctime}--', style='$')
         self.assertTrue(f.usesTime())
 
+    def test_uses_time_format_changed(self):
+        # usesTime() is computed when the format of the style is set.
+        for style, fmt in (('%', '%(asctime)s'), ('{', '{asctime}'),
+                           ('$', '$asctime')):
+            f = logging.Formatter(style=style)
+            self.assertFalse(f.usesTime())
+            f._style._fmt = fmt
+            self.assertTrue(f.usesTime())
+
+    def test_dollars_compiled(self):
+        # $-style formats are translated to %-style formats, falling back
+        # to string.Template when that isn't possible.
+        compile = logging.StringTemplateStyle._compile
+        self.assertEqual(compile(string.Template('$$%${a}%$b $$c')),
+                         '$%%%(a)s%%%(b)s $c')
+        self.assertIsNone(compile(string.Template('${a} $ b')))
+        self.assertIsNone(compile(string.Template('${a} ${b')))
+        r = self.get_record()
+        f = logging.Formatter('${message} $', style='$', validate=False)
+        self.assertRaisesRegex(ValueError, 'Invalid placeholder', f.format, r)
+        r.args = None
+        r.msg = '%(message)s %d'
+        f = logging.Formatter('%${message}%$$', style='$')
+        self.assertEqual(f.format(r), '%%(message)s %d%$')
+
     def test_format_validate(self):
         # Check correct formatting
         # Percentage style
@@ -3952,6 +4336,30 @@ class FormatterTest(unittest.TestCase):
         f.format(r)
         self.assertEqual(r.asctime, '1993-04-21 08:03:00,123')
 
+    def test_time_cached(self):
+        # The formatted time is reused for records created within the same
+        # second, unless the date format or the converter is changed.
+        r = self.get_record()
+        r.created = 735379380.25
+        r.msecs = 250
+        f = logging.Formatter()
+        f.converter = time.gmtime
+        self.assertEqual(f.formatTime(r), '1993-04-21 08:03:00,250')
+        r.created = 735379380.75
+        r.msecs = 750
+        self.assertEqual(f.formatTime(r), '1993-04-21 08:03:00,750')
+        self.assertEqual(f.formatTime(r, '%H:%M'), '08:03')
+        self.assertEqual(f.formatTime(r), '1993-04-21 08:03:00,750')
+        r.created = 735379381.0
+        self.assertEqual(f.formatTime(r, '%H:%M:%S'), '08:03:01')
+        f.converter = lambda secs: time.gmtime(secs + 3600)
+        self.assertEqual(f.formatTime(r, '%H:%M:%S'), '09:03:01')
+        r.created = -0.5
+        f.converter = time.gmtime
+        self.assertEqual(f.formatTime(r, '%H:%M:%S'), '23:59:59')
+        r.created = 0.5
+        self.assertEqual(f.formatTime(r, '%H:%M:%S'), '00:00:00')
+
 class TestBufferingFormatter(logging.BufferingFormatter):
     def formatHeader(self, records):
         return '[(%d)' % len(records)
@@ -4339,6 +4747,77 @@ class LogRecordTest(BaseTest):
             logging.logProcesses = log_processes
             logging.logMultiprocessing = log_multiprocessing
 
+class LazyLogRecordTest(BaseTest):
+
+    def make_records(self, pathname=__file__):
+        args = ('name', logging.INFO, pathname, 42, 'msg %s', ('arg',),
+                None, 'func')
+        return logging.LogRecord(*args), logging.LazyLogRecord(*args)
+
+    def test_attributes(self):
+        for pathname in (__file__, 'spam', None):
+            eager, lazy = self.make_records(pathname)
+            for name in ('name', 'msg', 'args', 'levelname', 'levelno',
+                         'pathname', 'filename', 'module', 'lineno',
+                         'funcName', 'thread', 'threadName', 'process',
+                         'processName', 'exc_info', 'exc_text',
+                         'stack_info'):
+                self.assertEqual(getattr(lazy, name), getattr(eager, name),
+                                 name)
+            self.assertEqual(lazy.getMessage(), 'msg arg')
+            self.assertRaises(AttributeError, getattr, lazy, 'spam')
+
+    def test_computed_once(self):
+        lazy = self.make_records()[1]
+        self.assertNotIn('filename', dict.keys(lazy.__dict__))
+        self.assertEqual(lazy.filename, 'test_logging.py')
+        self.assertIn('filename', dict.keys(lazy.__dict__))
+        lazy.filename = 'spam'
+        self.assertEqual(lazy.filename, 'spam')
+
+    def test_dict(self):
+        eager, lazy = self.make_records()
+        self.assertIn('module', lazy.__dict__)
+        self.assertEqual(lazy.__dict__['module'], 'test_logging')
+        self.assertEqual(set(dict(lazy.__dict__)), set(eager.__dict__))
+        self.assertEqual(set(lazy.__dict__.copy()), set(eager.__dict__))
+
+    def test_format(self):
+        for style, fmt in (('%', '%(filename)s:%(module)s:%(processName)s'),
+                           ('{', '{filename}:{module}:{processName}'),
+                           ('$', '${filename}:${module}:${processName}')):
+            eager, lazy = self.make_records()
+            formatter = logging.Formatter(fmt, style=style)
+            self.assertEqual(formatter.format(lazy), formatter.format(eager))
+            self.assertTrue(formatter.format(lazy).startswith(
+                            'test_logging.py:test_logging:'))
+
+    def test_copy_and_pickle(self):
+        eager, lazy = self.make_records()
+        for other in (copy.copy(lazy), pickle.loads(pickle.dumps(lazy))):
+            self.assertIsInstance(other, logging.LazyLogRecord)
+            self.assertEqual(set(other.__dict__), set(eager.__dict__))
+            self.assertEqual(other.filename, 'test_logging.py')
+
+    def test_factory(self):
+        orig_factory = logging.getLogRecordFactory()
+        self.addCleanup(logging.setLogRecordFactory, orig_factory)
+        logging.setLogRecordFactory(logging.LazyLogRecord)
+        h = RecordingHandler()
+        self.root_logger.addHandler(h)
+        self.addCleanup(self.root_logger.removeHandler, h)
+        self.root_logger.warning('spam', extra={'foo': 'bar'})
+        record = h.records[0]
+        self.assertIsInstance(record, logging.LazyLogRecord)
+        self.assertEqual(record.foo, 'bar')
+        self.assertEqual(record.funcName, 'test_factory')
+        self.assertEqual(record.filename, 'test_logging.py')
+        self.assertRaises(KeyError, self.root_logger.warning, 'spam',
+                          extra={'module': 'eggs'})
+        record = logging.makeLogRecord({'filename': 'eggs.py'})
+        self.assertEqual(record.filename, 'eggs.py')
+
+
 class BasicConfigTest(unittest.TestCase):
 
     """Test suite for logging.basicConfig."""
@@ -4524,6 +5003,20 @@ class BasicConfigTest(unittest.TestCase):
         self.assertEqual(new_string_io.getvalue().strip(),
                          'WARNING:root:warn\nINFO:root:info')
 
+    def test_async(self):
+        stream = io.StringIO()
+        logging.basicConfig(stream=stream, async_=True)
+        self.assertEqual(len(logging.root.handlers), 1)
+        handler = logging.root.handlers[0]
+        self.assertIsInstance(handler, logging.handlers.AsyncHandler)
+        self.assertEqual(len(handler.handlers), 1)
+        self.assertIsInstance(handler.handlers[0], logging.StreamHandler)
+        self.assertEqual(handler.handlers[0].formatter._style._fmt,
+                         logging.BASIC_FORMAT)
+        logging.error('Log an error')
+        handler.flush()
+        self.assertEqual(stream.getvalue(), 'ERROR:root:Log an error\n')
+
     def test_encoding(self):
         try:
             encoding = 'utf-8'
@@ -4816,6 +5309,34 @@ class LoggerTest(BaseTest):
         self.assertEqual(len(called), 1)
         self.assertEqual('Stack (most recent call last):\n', called[0])
 
+    def test_find_caller_filename_cache(self):
+        support.patch(self, logging, '_codeFilenames', {})
+        support.patch(self, logging, '_CODE_FILENAMES_MAX', 3)
+        self.logger.warning('test')
+        code = sys._getframe().f_code
+        self.assertEqual(logging._codeFilenames[id(code)],
+                         (code, os.path.normcase(code.co_filename)))
+        self.assertEqual(self.recording.records[-1].funcName,
+                         'test_find_caller_filename_cache')
+        for i in range(3):
+            func = eval('lambda logger: logger.warning("test")')
+            func(self.logger)
+            self.assertEqual(self.recording.records[-1].funcName, '<lambda>')
+            self.assertLessEqual(len(logging._codeFilenames), 3)
+
+    def test_find_caller_same_code_other_file(self):
+        # Code objects compare equal when only their filenames differ.
+        support.patch(self, logging, '_codeFilenames', {})
+        source = 'def log(logger):\n    logger.warning("test")\n'
+        for filename, funcName in ((logging.__file__,
+                                    'test_find_caller_same_code_other_file'),
+                                   ('other.py', 'log')):
+            namespace = {}
+            exec(compile(source, filename, 'exec'), namespace)
+            namespace['log'](self.logger)
+            record = self.recording.records[-1]
+            self.assertEqual(record.funcName, funcName)
+
     def test_find_caller_with_stacklevel(self):
         the_level = 1
 
@@ -5015,6 +5536,52 @@ class FileHandlerTest(BaseFileTest):
         self.assertTrue(os.path.exists(self.fn))
         fh.close()
 
+    def read_log(self):
+        with open(self.fn, encoding='ascii') as f:
+            return f.read()
+
+    def test_buffer_size(self):
+        fh = logging.FileHandler(self.fn, bufferSize=12)
+        fh.handle(logging.makeLogRecord({'msg': 'spam'}))
+        fh.handle(logging.makeLogRecord({'msg': 'eggs'}))
+        self.assertEqual(self.read_log(), '')
+        fh.handle(logging.makeLogRecord({'msg': 'ham'}))
+        self.assertEqual(self.read_log(), 'spam\neggs\nham\n')
+        fh.handle(logging.makeLogRecord({'msg': 'spam'}))
+        self.assertEqual(self.read_log(), 'spam\neggs\nham\n')
+        fh.close()
+        self.assertEqual(self.read_log(), 'spam\neggs\nham\nspam\n')
+
+    def test_flush_interval(self):
+        fh = logging.FileHandler(self.fn, flushInterval=3600)
+        fh.handle(logging.makeLogRecord({'msg': 'spam'}))
+        self.assertEqual(self.read_log(), '')
+        fh._lastFlush -= 3600
+        fh.handle(logging.makeLogRecord({'msg': 'eggs'}))
+        self.assertEqual(self.read_log(), 'spam\neggs\n')
+        fh.handle(logging.makeLogRecord({'msg': 'ham'}))
+        self.assertEqual(self.read_log(), 'spam\neggs\n')
+        fh.flush()
+        self.assertEqual(self.read_log(), 'spam\neggs\nham\n')
+        fh.handle(logging.makeLogRecord({'msg': 'spam'}))
+        timer = fh._flushTimer
+        self.assertTrue(timer.is_alive())
+        fh.close()
+        timer.join(support.SHORT_TIMEOUT)
+        self.assertFalse(timer.is_alive())
+
+    def test_flush_interval_timer(self):
+        # Records are flushed even if no other record is emitted.
+        fh = logging.FileHandler(self.fn, flushInterval=0.01)
+        fh.handle(logging.makeLogRecord({'msg': 'spam'}))
+        fh.handle(logging.makeLogRecord({'msg': 'eggs'}))
+        deadline = time.monotonic() + support.SHORT_TIMEOUT
+        while self.read_log() != 'spam\neggs\n' and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.read_log(), 'spam\neggs\n')
+        self.assertIsNone(fh._flushTimer)
+        fh.close()
+
 class RotatingFileHandlerTest(BaseFileTest):
     def next_rec(self):
         return logging.LogRecord('n', logging.DEBUG, 'p', 1,
@@ -5031,6 +5598,45 @@ class RotatingFileHandlerTest(BaseFileTest):
         self.assertTrue(rh.shouldRollover(self.next_rec()))
         rh.close()
 
+    def test_size_tracking(self):
+        class CountingFormatter(logging.Formatter):
+            count = 0
+            def format(self, record):
+                self.count += 1
+                return logging.Formatter.format(self, record)
+
+        with open(self.fn, 'w') as f:
+            f.write('0123456789\n')
+        rh = logging.handlers.RotatingFileHandler(
+            self.fn, backupCount=1, maxBytes=16, bufferSize=1000)
+        formatter = CountingFormatter()
+        rh.setFormatter(formatter)
+        rh.emit(self.next_rec())        # 11 + 2 bytes
+        rh.emit(self.next_rec())        # 13 + 2 bytes
+        rh.emit(self.next_rec())        # 15 + 2 bytes, rolls over
+        self.assertEqual(formatter.count, 3)
+        self.assertLogFile(self.fn + ".1")
+        rh.close()
+        with open(self.fn + ".1") as f:
+            self.assertEqual(f.read(), '0123456789\n1\n2\n')
+        with open(self.fn) as f:
+            self.assertEqual(f.read(), '3\n')
+
+    def test_size_tracking_non_ascii(self):
+        # The size is tracked in bytes, not characters.
+        for encoding in ('utf-8', 'utf-16'):
+            with self.subTest(encoding=encoding):
+                rh = logging.handlers.RotatingFileHandler(
+                    self.fn, encoding=encoding, backupCount=1, maxBytes=1000)
+                for i in range(100):
+                    rh.emit(logging.makeLogRecord(
+                        {'msg': '\u65e5\u672c\u8a9e %d' % i}))
+                rh.close()
+                self.assertLessEqual(os.path.getsize(self.fn + '.1'), 1000)
+                self.assertGreater(os.path.getsize(self.fn + '.1'), 900)
+                os.remove(self.fn + '.1')
+                os.remove(self.fn)
+
     def test_file_created(self):
         # checks that the file is created and assumes it was created
         # by us
@@ -5328,13 +5934,15 @@ class MiscTestCase(unittest.TestCase):
 def test_main():
     tests = [
         BuiltinLevelsTest, BasicFilterTest, CustomLevelsAndFiltersTest,
-        HandlerTest, MemoryHandlerTest, ConfigFileTest, SocketHandlerTest,
-        DatagramHandlerTest, MemoryTest, EncodingTest, WarningsTest,
+        HandlerTest, MemoryHandlerTest, AsyncHandlerTest, ConfigFileTest,
+        SocketHandlerTest, JSONSocketHandlerTest, DatagramHandlerTest,
+        MemoryTest, EncodingTest, WarningsTest,
         ConfigDictTest, ManagerTest, FormatterTest, BufferingFormatterTest,
         StreamHandlerTest, LogRecordFactoryTest, ChildLoggerTest,
         QueueHandlerTest, ShutdownTest, ModuleLevelMiscTest, BasicConfigTest,
         LoggerAdapterTest, LoggerTest, SMTPHandlerTest, FileHandlerTest,
         RotatingFileHandlerTest,  LastResortTest, LogRecordTest,
+        LazyLogRecordTest,
         ExceptionTest, SysLogHandlerTest, IPv6SysLogHandlerTest, HTTPHandlerTest,
         NTEventLogHandlerTest, TimedRotatingFileHandlerTest,
         UnixSocketHandlerTest, UnixDatagramHandlerTest, UnixSysLogHandlerTest,
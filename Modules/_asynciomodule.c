@@ -1680,6 +1680,7 @@ class _asyncio.Task "TaskObj *" "&Task_Type"
 /*[clinic end generated code: output=da39a3ee5e6b4b0d input=719dcef0fcc03b37]*/
 
 static int task_call_step_soon(TaskObj *, PyObject *);
+static int task_eager_start(TaskObj *);
 static PyObject * task_wakeup(TaskObj *, PyObject *);
 static PyObject * task_step(TaskObj *, PyObject *);
 
@@ -1944,6 +1945,41 @@ leave_task(PyObject *loop, PyObject *task)
     return _PyDict_DelItem_KnownHash(current_tasks, loop, hash);
 }
 
+
+/* Make task the current task of loop, or clear it if task is None, and
+   return a new reference to the previous current task, or None. */
+static PyObject *
+swap_current_task(PyObject *loop, PyObject *task)
+{
+    PyObject *prev_task;
+    Py_hash_t hash;
+    hash = PyObject_Hash(loop);
+    if (hash == -1) {
+        return NULL;
+    }
+    prev_task = _PyDict_GetItem_KnownHash(current_tasks, loop, hash);
+    if (prev_task == NULL) {
+        if (PyErr_Occurred()) {
+            return NULL;
+        }
+        prev_task = Py_None;
+    }
+    Py_INCREF(prev_task);
+
+    int res;
+    if (task == Py_None) {
+        res = _PyDict_DelItem_KnownHash(current_tasks, loop, hash);
+    }
+    else {
+        res = _PyDict_SetItem_KnownHash(current_tasks, loop, task, hash);
+    }
+    if (res < 0) {
+        Py_DECREF(prev_task);
+        return NULL;
+    }
+    return prev_task;
+}
+
 /* ----- Task */
 
 /*[clinic input]
@@ -1953,14 +1989,15 @@ _asyncio.Task.__init__
     *
     loop: object = None
     name: object = None
+    eager_start: bool = False
 
 A coroutine wrapped in a Future.
 [clinic start generated code]*/
 
 static int
 _asyncio_Task___init___impl(TaskObj *self, PyObject *coro, PyObject *loop,
-                            PyObject *name)
-/*[clinic end generated code: output=88b12b83d570df50 input=352a3137fe60091d]*/
+                            PyObject *name, int eager_start)
+/*[clinic end generated code: output=0e505cba3b853ad5 input=f29f6d18104e54f4]*/
 {
     if (future_init((FutureObj*)self, loop)) {
         return -1;
@@ -2001,10 +2038,26 @@ _asyncio_Task___init___impl(TaskObj *self, PyObject *coro, PyObject *loop,
         return -1;
     }
 
-    if (task_call_step_soon(self, NULL)) {
+    if (register_task((PyObject*)self) < 0) {
         return -1;
     }
-    return register_task((PyObject*)self);
+    if (eager_start) {
+        _Py_IDENTIFIER(is_running);
+        PyObject *res = _PyObject_CallMethodIdNoArgs(self->task_loop,
+                                                     &PyId_is_running);
+        if (res == NULL) {
+            return -1;
+        }
+        int is_running = PyObject_IsTrue(res);
+        Py_DECREF(res);
+        if (is_running < 0) {
+            return -1;
+        }
+        if (is_running) {
+            return task_eager_start(self);
+        }
+    }
+    return task_call_step_soon(self, NULL);
 }
 
 static int
@@ -2952,6 +3005,51 @@ task_step(TaskObj *task, PyObject *exc)
     }
 }
 
+static int
+task_eager_start(TaskObj *task)
+{
+    /* Run the first step now, in the task's context, the creator of the
+       task being suspended as current task meanwhile. */
+    PyObject *prev_task = swap_current_task(task->task_loop,
+                                            (PyObject*)task);
+    if (prev_task == NULL) {
+        return -1;
+    }
+    if (PyContext_Enter(task->task_context) < 0) {
+        Py_XDECREF(swap_current_task(task->task_loop, prev_task));
+        Py_DECREF(prev_task);
+        return -1;
+    }
+
+    int retval = 0;
+    PyObject *res = task_step_impl(task, NULL);
+    if (res == NULL) {
+        retval = -1;
+    }
+    else {
+        Py_DECREF(res);
+    }
+
+    PyObject *et, *ev, *tb;
+    PyErr_Fetch(&et, &ev, &tb);
+    if (PyContext_Exit(task->task_context) < 0) {
+        retval = -1;
+        _PyErr_ChainExceptions(et, ev, tb);
+        PyErr_Fetch(&et, &ev, &tb);
+    }
+    PyObject *cur_task = swap_current_task(task->task_loop, prev_task);
+    Py_DECREF(prev_task);
+    if (cur_task == NULL) {
+        retval = -1;
+        _PyErr_ChainExceptions(et, ev, tb);
+    }
+    else {
+        Py_DECREF(cur_task);
+        PyErr_Restore(et, ev, tb);
+    }
+    return retval;
+}
+
 static PyObject *
 task_wakeup(TaskObj *task, PyObject *o)
 {
@@ -3184,6 +3282,26 @@ _asyncio__leave_task_impl(PyObject *module, PyObject *loop, PyObject *task)
 }
 
 
+/*[clinic input]
+_asyncio._swap_current_task
+
+    loop: object
+    task: object
+
+Make task the current task of loop, or clear it if task is None.
+
+Return the previous current task of loop, or None.
+[clinic start generated code]*/
+
+static PyObject *
+_asyncio__swap_current_task_impl(PyObject *module, PyObject *loop,
+                                 PyObject *task)
+/*[clinic end generated code: output=9f88de958df74c7e input=bc8976aa86892a15]*/
+{
+    return swap_current_task(loop, task);
+}
+
+
 /*********************** PyRunningLoopHolder ********************/
 
 
@@ -3369,6 +3487,7 @@ static PyMethodDef asyncio_methods[] = {
     _ASYNCIO__UNREGISTER_TASK_METHODDEF
     _ASYNCIO__ENTER_TASK_METHODDEF
     _ASYNCIO__LEAVE_TASK_METHODDEF
+    _ASYNCIO__SWAP_CURRENT_TASK_METHODDEF
     {NULL, NULL}
 };
 
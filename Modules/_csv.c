@@ -102,6 +102,15 @@ typedef struct {
     Py_ssize_t field_len;       /* length of current field */
     int numeric_field;          /* treat field as numeric */
     unsigned long line_num;     /* Source-file line number */
+
+    PyObject *columns;          /* column lists, set by read_columns() */
+    Py_ssize_t num_rows;        /* number of rows stored in columns */
+    Py_ssize_t field_index;     /* column of the current field */
+    char *converters;           /* per-column conversion codes */
+    Py_ssize_t num_converters;  /* length of converters */
+    PyObject *error_type;       /* conversion error of the current record, */
+    PyObject *error_value;      /* raised once the record is read */
+    PyObject *error_tb;
 } ReaderObj;
 
 static PyTypeObject Reader_Type;
@@ -118,6 +127,7 @@ typedef struct {
     Py_UCS4 *rec;            /* buffer for parser.join */
     Py_ssize_t rec_size;        /* size of allocated record */
     Py_ssize_t rec_len;         /* length of record */
+    Py_ssize_t rec_start;       /* start of current record in a batch */
     int num_fields;             /* number of fields in record */
 } WriterObj;
 
@@ -524,6 +534,122 @@ _call_dialect(PyObject *dialect_inst, PyObject *kwargs)
 /*
  * READER
  */
+
+/* Column conversion codes used by read_columns() */
+#define CONVERT_NONE    0
+#define CONVERT_INT     1
+#define CONVERT_FLOAT   2
+/* Flag of the array columns, which can't hold None for missing fields */
+#define CONVERT_REQUIRED 4
+
+static char
+column_code(ReaderObj *self, Py_ssize_t i)
+{
+    if (i < self->num_converters)
+        return self->converters[i];
+    return CONVERT_NONE;
+}
+
+static PyObject *
+column_convert(ReaderObj *self, PyObject *field)
+{
+    switch (column_code(self, self->field_index) & ~CONVERT_REQUIRED) {
+    case CONVERT_INT:
+        if (PyUnicode_Check(field))
+            return PyLong_FromUnicodeObject(field, 10);
+        return PyNumber_Long(field);
+    case CONVERT_FLOAT:
+        if (PyUnicode_Check(field))
+            return PyFloat_FromString(field);
+        return PyNumber_Float(field);
+    default:
+        Py_INCREF(field);
+        return field;
+    }
+}
+
+/* Keep a conversion error until the end of the record, so that the reader
+ * stops at a record boundary; the rest of the record is not converted. */
+static int
+column_defer_error(ReaderObj *self)
+{
+    if (!PyErr_ExceptionMatches(PyExc_ValueError) &&
+        !PyErr_ExceptionMatches(_csvstate_global->error_obj))
+        return -1;
+    if (self->error_type != NULL)
+        PyErr_Clear();  /* the first error of the record is raised */
+    else
+        PyErr_Fetch(&self->error_type, &self->error_value, &self->error_tb);
+    self->field_index++;
+    return 0;
+}
+
+static int
+column_append(ReaderObj *self, PyObject *field)
+{
+    PyObject *column, *value;
+    Py_ssize_t i;
+    int rc;
+
+    if (self->error_type != NULL) {
+        /* skip the rest of a record which failed to convert */
+        self->field_index++;
+        return 0;
+    }
+    if (self->field_index == PyList_GET_SIZE(self->columns)) {
+        /* New column: earlier rows had no value for it */
+        if (self->num_rows &&
+            column_code(self, self->field_index) & CONVERT_REQUIRED) {
+            PyErr_Format(_csvstate_global->error_obj,
+                         "line %lu: column %zd is missing from the "
+                         "previous records",
+                         self->line_num, self->field_index);
+            return column_defer_error(self);
+        }
+        column = PyList_New(self->num_rows);
+        if (column == NULL)
+            return -1;
+        for (i = 0; i < self->num_rows; i++) {
+            Py_INCREF(Py_None);
+            PyList_SET_ITEM(column, i, Py_None);
+        }
+        rc = PyList_Append(self->columns, column);
+        Py_DECREF(column);
+        if (rc < 0)
+            return -1;
+    }
+    column = PyList_GET_ITEM(self->columns, self->field_index);
+    value = column_convert(self, field);
+    if (value == NULL)
+        return column_defer_error(self);
+    rc = PyList_Append(column, value);
+    Py_DECREF(value);
+    if (rc < 0)
+        return -1;
+    self->field_index++;
+    return 0;
+}
+
+static int
+column_end_row(ReaderObj *self)
+{
+    Py_ssize_t i;
+
+    /* Short row: pad the remaining columns */
+    for (i = self->field_index; i < PyList_GET_SIZE(self->columns); i++) {
+        if (column_code(self, i) & CONVERT_REQUIRED) {
+            PyErr_Format(_csvstate_global->error_obj,
+                         "line %lu: no field for column %zd",
+                         self->line_num, i);
+            return -1;
+        }
+        if (PyList_Append(PyList_GET_ITEM(self->columns, i), Py_None) < 0)
+            return -1;
+    }
+    self->num_rows++;
+    return 0;
+}
+
 static int
 parse_save_field(ReaderObj *self)
 {
@@ -541,9 +667,14 @@ parse_save_field(ReaderObj *self)
         tmp = PyNumber_Float(field);
         Py_DECREF(field);
         if (tmp == NULL)
-            return -1;
+            return self->columns != NULL ? column_defer_error(self) : -1;
         field = tmp;
     }
+    if (self->columns != NULL) {
+        int rc = column_append(self, field);
+        Py_DECREF(field);
+        return rc;
+    }
     if (PyList_Append(self->fields, field) < 0) {
         Py_DECREF(field);
         return -1;
@@ -767,27 +898,30 @@ parse_process_char(ReaderObj *self, Py_UCS4 c)
 static int
 parse_reset(ReaderObj *self)
 {
-    Py_XSETREF(self->fields, PyList_New(0));
-    if (self->fields == NULL)
-        return -1;
+    if (self->columns == NULL) {
+        Py_XSETREF(self->fields, PyList_New(0));
+        if (self->fields == NULL)
+            return -1;
+    }
     self->field_len = 0;
+    self->field_index = 0;
     self->state = START_RECORD;
     self->numeric_field = 0;
     return 0;
 }
 
-static PyObject *
-Reader_iternext(ReaderObj *self)
+/* Parse one record from the input iterator.  Return 1 if a record was
+ * parsed, 0 at the end of input and -1 on error.
+ */
+static int
+parse_record(ReaderObj *self)
 {
-    PyObject *fields = NULL;
     Py_UCS4 c;
     Py_ssize_t pos, linelen;
     unsigned int kind;
     void *data;
     PyObject *lineobj;
 
-    if (parse_reset(self) < 0)
-        return NULL;
     do {
         lineobj = PyIter_Next(self->input_iter);
         if (lineobj == NULL) {
@@ -800,7 +934,7 @@ Reader_iternext(ReaderObj *self)
                 else if (parse_save_field(self) >= 0)
                     break;
             }
-            return NULL;
+            return PyErr_Occurred() ? -1 : 0;
         }
         if (!PyUnicode_Check(lineobj)) {
             PyErr_Format(_csvstate_global->error_obj,
@@ -810,11 +944,11 @@ Reader_iternext(ReaderObj *self)
                          Py_TYPE(lineobj)->tp_name
                 );
             Py_DECREF(lineobj);
-            return NULL;
+            return -1;
         }
         if (PyUnicode_READY(lineobj) == -1) {
             Py_DECREF(lineobj);
-            return NULL;
+            return -1;
         }
         ++self->line_num;
         kind = PyUnicode_KIND(lineobj);
@@ -827,25 +961,213 @@ Reader_iternext(ReaderObj *self)
                 Py_DECREF(lineobj);
                 PyErr_Format(_csvstate_global->error_obj,
                              "line contains NUL");
-                goto err;
+                return -1;
             }
             if (parse_process_char(self, c) < 0) {
                 Py_DECREF(lineobj);
-                goto err;
+                return -1;
             }
             pos++;
         }
         Py_DECREF(lineobj);
         if (parse_process_char(self, 0) < 0)
-            goto err;
+            return -1;
     } while (self->state != START_RECORD);
 
+    return 1;
+}
+
+static PyObject *
+Reader_iternext(ReaderObj *self)
+{
+    PyObject *fields;
+
+    if (self->columns != NULL) {
+        PyErr_SetString(PyExc_RuntimeError,
+                        "reader is busy in read_columns()");
+        return NULL;
+    }
+    if (parse_reset(self) < 0)
+        return NULL;
+    if (parse_record(self) <= 0)
+        return NULL;
+
     fields = self->fields;
     self->fields = NULL;
-err:
     return fields;
 }
 
+/* Return the conversion code of an array typecode, or CONVERT_NONE */
+static char
+typecode_converter(PyObject *item)
+{
+    Py_UCS4 c;
+
+    if (!PyUnicode_Check(item) || PyUnicode_READY(item) < 0 ||
+        PyUnicode_GET_LENGTH(item) != 1)
+        return CONVERT_NONE;
+    c = PyUnicode_READ_CHAR(item, 0);
+    if (c == '\0' || c > 127)
+        return CONVERT_NONE;
+    if (strchr("bBhHiIlLqQ", (int)c) != NULL)
+        return CONVERT_INT | CONVERT_REQUIRED;
+    if (strchr("fd", (int)c) != NULL)
+        return CONVERT_FLOAT | CONVERT_REQUIRED;
+    return CONVERT_NONE;
+}
+
+static int
+reader_set_converters(ReaderObj *self, PyObject *dtypes)
+{
+    PyObject *seq, *item;
+    Py_ssize_t i, n;
+    char code;
+
+    seq = PySequence_Fast(dtypes, "dtypes must be a sequence");
+    if (seq == NULL)
+        return -1;
+    n = PySequence_Fast_GET_SIZE(seq);
+    self->converters = PyMem_Malloc(n ? n : 1);
+    if (self->converters == NULL) {
+        Py_DECREF(seq);
+        PyErr_NoMemory();
+        return -1;
+    }
+    self->num_converters = n;
+    for (i = 0; i < n; i++) {
+        item = PySequence_Fast_GET_ITEM(seq, i);
+        if (item == Py_None || item == (PyObject *)&PyUnicode_Type)
+            self->converters[i] = CONVERT_NONE;
+        else if (item == (PyObject *)&PyLong_Type)
+            self->converters[i] = CONVERT_INT;
+        else if (item == (PyObject *)&PyFloat_Type)
+            self->converters[i] = CONVERT_FLOAT;
+        else if ((code = typecode_converter(item)) != CONVERT_NONE)
+            self->converters[i] = code;
+        else {
+            PyErr_Format(PyExc_TypeError,
+                         "dtypes items must be str, int, float, None or "
+                         "an array typecode, not %.200R", item);
+            Py_DECREF(seq);
+            return -1;
+        }
+    }
+    Py_DECREF(seq);
+    return 0;
+}
+
+/* Replace the columns read with an array typecode by array.array objects */
+static int
+reader_make_arrays(ReaderObj *self, PyObject *dtypes)
+{
+    PyObject *seq, *array_type = NULL, *array;
+    Py_ssize_t i, n;
+    int rc = -1;
+
+    seq = PySequence_Fast(dtypes, "dtypes must be a sequence");
+    if (seq == NULL)
+        return -1;
+    n = Py_MIN(PySequence_Fast_GET_SIZE(seq), PyList_GET_SIZE(self->columns));
+    for (i = 0; i < n; i++) {
+        PyObject *item = PySequence_Fast_GET_ITEM(seq, i);
+        if (!(self->converters[i] & CONVERT_REQUIRED))
+            continue;
+        if (array_type == NULL) {
+            PyObject *module = PyImport_ImportModule("array");
+            if (module == NULL)
+                goto done;
+            array_type = PyObject_GetAttrString(module, "array");
+            Py_DECREF(module);
+            if (array_type == NULL)
+                goto done;
+        }
+        array = PyObject_CallFunctionObjArgs(
+            array_type, item, PyList_GET_ITEM(self->columns, i), NULL);
+        if (array == NULL)
+            goto done;
+        PyList_SetItem(self->columns, i, array);
+    }
+    rc = 0;
+
+done:
+    Py_XDECREF(array_type);
+    Py_DECREF(seq);
+    return rc;
+}
+
+PyDoc_STRVAR(Reader_read_columns_doc,
+"read_columns(rows=-1, dtypes=None)\n"
+"\n"
+"Read up to *rows* records (all remaining records if negative) and\n"
+"return them as a list of columns, each column being a list of\n"
+"fields.  Blank lines are skipped; missing fields of short rows are\n"
+"filled with None.  *dtypes* is an optional sequence giving the type\n"
+"(str, int, float or None) each column is converted to, or an array\n"
+"typecode to return the column as an array.array, whose missing\n"
+"fields are an error.");
+
+static PyObject *
+Reader_read_columns(ReaderObj *self, PyObject *args, PyObject *kwargs)
+{
+    static char *kwlist[] = {"rows", "dtypes", NULL};
+    Py_ssize_t rows = -1;
+    PyObject *dtypes = Py_None;
+    PyObject *columns = NULL;
+    int rc;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "|nO:read_columns", kwlist,
+                                     &rows, &dtypes))
+        return NULL;
+    if (self->columns != NULL) {
+        PyErr_SetString(PyExc_RuntimeError,
+                        "reader is busy in read_columns()");
+        return NULL;
+    }
+    if (dtypes != Py_None && reader_set_converters(self, dtypes) < 0)
+        goto done;
+    self->columns = PyList_New(0);
+    if (self->columns == NULL)
+        goto done;
+    self->num_rows = 0;
+
+    while (rows < 0 || self->num_rows < rows) {
+        if (parse_reset(self) < 0)
+            goto done;
+        rc = parse_record(self);
+        if (rc < 0)
+            goto done;
+        if (rc == 0)
+            break;
+        if (self->error_type != NULL) {
+            /* the whole record was read: raise its conversion error */
+            PyErr_Restore(self->error_type, self->error_value,
+                          self->error_tb);
+            self->error_type = self->error_value = self->error_tb = NULL;
+            goto done;
+        }
+        /* unlike iteration, blank lines do not produce a row */
+        if (self->field_index == 0)
+            continue;
+        if (column_end_row(self) < 0)
+            goto done;
+    }
+    if (dtypes != Py_None && reader_make_arrays(self, dtypes) < 0)
+        goto done;
+    columns = self->columns;
+    Py_INCREF(columns);
+
+done:
+    Py_CLEAR(self->error_type);
+    Py_CLEAR(self->error_value);
+    Py_CLEAR(self->error_tb);
+    Py_CLEAR(self->columns);
+    PyMem_Free(self->converters);
+    self->converters = NULL;
+    self->num_converters = 0;
+    self->num_rows = 0;
+    return columns;
+}
+
 static void
 Reader_dealloc(ReaderObj *self)
 {
@@ -853,8 +1175,10 @@ Reader_dealloc(ReaderObj *self)
     Py_XDECREF(self->dialect);
     Py_XDECREF(self->input_iter);
     Py_XDECREF(self->fields);
+    Py_XDECREF(self->columns);
     if (self->field != NULL)
         PyMem_Free(self->field);
+    PyMem_Free(self->converters);
     PyObject_GC_Del(self);
 }
 
@@ -864,6 +1188,7 @@ Reader_traverse(ReaderObj *self, visitproc visit, void *arg)
     Py_VISIT(self->dialect);
     Py_VISIT(self->input_iter);
     Py_VISIT(self->fields);
+    Py_VISIT(self->columns);
     return 0;
 }
 
@@ -873,6 +1198,7 @@ Reader_clear(ReaderObj *self)
     Py_CLEAR(self->dialect);
     Py_CLEAR(self->input_iter);
     Py_CLEAR(self->fields);
+    Py_CLEAR(self->columns);
     return 0;
 }
 
@@ -884,6 +1210,8 @@ PyDoc_STRVAR(Reader_Type_doc,
 );
 
 static struct PyMethodDef Reader_methods[] = {
+    { "read_columns", (PyCFunction)(void(*)(void))Reader_read_columns,
+        METH_VARARGS | METH_KEYWORDS, Reader_read_columns_doc},
     { NULL, NULL }
 };
 #define R_OFF(x) offsetof(ReaderObj, x)
@@ -946,6 +1274,11 @@ csv_reader(PyObject *module, PyObject *args, PyObject *keyword_args)
     self->field = NULL;
     self->field_size = 0;
     self->line_num = 0;
+    self->columns = NULL;
+    self->num_rows = 0;
+    self->converters = NULL;
+    self->num_converters = 0;
+    self->error_type = self->error_value = self->error_tb = NULL;
 
     if (parse_reset(self) < 0) {
         Py_DECREF(self);
@@ -981,11 +1314,23 @@ static void
 join_reset(WriterObj *self)
 {
     self->rec_len = 0;
+    self->rec_start = 0;
+    self->num_fields = 0;
+}
+
+/* Start a new record after the ones already in the buffer */
+static void
+join_start_record(WriterObj *self)
+{
+    self->rec_start = self->rec_len;
     self->num_fields = 0;
 }
 
 #define MEM_INCR 32768
 
+/* writerows() writes its output once this many characters are buffered */
+#define WRITE_BATCH_SIZE (2 * MEM_INCR)
+
 /* Calculate new record length or append field to record.  Return new
  * record length.
  */
@@ -1152,109 +1497,251 @@ join_append_lineterminator(WriterObj *self)
     return 1;
 }
 
-PyDoc_STRVAR(csv_writerow_doc,
-"writerow(iterable)\n"
-"\n"
-"Construct and write a CSV record from an iterable of fields.  Non-string\n"
-"elements will be converted to string.");
+/* Append one field to the current record.  Return 0 on success and
+ * -1 on error.
+ */
+static int
+join_field(WriterObj *self, PyObject *field)
+{
+    int append_ok;
+    int quoted;
 
-static PyObject *
-csv_writerow(WriterObj *self, PyObject *seq)
+    switch (self->dialect->quoting) {
+    case QUOTE_NONNUMERIC:
+        quoted = !PyNumber_Check(field);
+        break;
+    case QUOTE_ALL:
+        quoted = 1;
+        break;
+    default:
+        quoted = 0;
+        break;
+    }
+
+    if (PyUnicode_Check(field)) {
+        append_ok = join_append(self, field, quoted);
+    }
+    else if (field == Py_None) {
+        append_ok = join_append(self, NULL, quoted);
+    }
+    else {
+        PyObject *str;
+
+        str = PyObject_Str(field);
+        if (str == NULL)
+            return -1;
+        append_ok = join_append(self, str, quoted);
+        Py_DECREF(str);
+    }
+    return append_ok ? 0 : -1;
+}
+
+/* Finish the current record: quote a single empty field and add the line
+ * terminator.  Return 0 on success and -1 on error.
+ */
+static int
+join_end_record(WriterObj *self)
 {
-    DialectObj *dialect = self->dialect;
-    PyObject *iter, *field, *line, *result;
+    if (self->num_fields > 0 && self->rec_len == self->rec_start) {
+        if (self->dialect->quoting == QUOTE_NONE) {
+            PyErr_Format(_csvstate_global->error_obj,
+                "single empty field record must be quoted");
+            return -1;
+        }
+        self->num_fields--;
+        if (!join_append(self, NULL, 1))
+            return -1;
+    }
+
+    if (!join_append_lineterminator(self))
+        return -1;
+    return 0;
+}
+
+/* Build a record from an iterable of fields */
+static int
+join_record(WriterObj *self, PyObject *seq)
+{
+    PyObject *iter, *field;
 
     iter = PyObject_GetIter(seq);
-    if (iter == NULL)
-        return PyErr_Format(_csvstate_global->error_obj,
-                            "iterable expected, not %.200s",
-                            Py_TYPE(seq)->tp_name);
+    if (iter == NULL) {
+        PyErr_Format(_csvstate_global->error_obj,
+                     "iterable expected, not %.200s",
+                     Py_TYPE(seq)->tp_name);
+        return -1;
+    }
 
-    /* Join all fields in internal buffer.
-     */
-    join_reset(self);
+    join_start_record(self);
     while ((field = PyIter_Next(iter))) {
-        int append_ok;
-        int quoted;
-
-        switch (dialect->quoting) {
-        case QUOTE_NONNUMERIC:
-            quoted = !PyNumber_Check(field);
-            break;
-        case QUOTE_ALL:
-            quoted = 1;
-            break;
-        default:
-            quoted = 0;
-            break;
+        int rc = join_field(self, field);
+        Py_DECREF(field);
+        if (rc < 0) {
+            Py_DECREF(iter);
+            return -1;
         }
+    }
+    Py_DECREF(iter);
+    if (PyErr_Occurred())
+        return -1;
 
-        if (PyUnicode_Check(field)) {
-            append_ok = join_append(self, field, quoted);
-            Py_DECREF(field);
-        }
-        else if (field == Py_None) {
-            append_ok = join_append(self, NULL, quoted);
-            Py_DECREF(field);
+    return join_end_record(self);
+}
+
+/* Raise ValueError if rowdict has keys that are not in fieldset */
+static int
+check_dict_keys(PyObject *rowdict, PyObject *fieldset)
+{
+    PyObject *keys, *iter, *key, *wrong, *sep, *msg;
+    int rc;
+
+    if (PyDict_CheckExact(rowdict)) {
+        Py_ssize_t pos = 0;
+        int found = 1;
+
+        while (PyDict_Next(rowdict, &pos, &key, NULL)) {
+            found = PySet_Contains(fieldset, key);
+            if (found <= 0)
+                break;
         }
-        else {
-            PyObject *str;
+        if (found < 0)
+            return -1;
+        if (found)
+            return 0;
+    }
 
-            str = PyObject_Str(field);
-            Py_DECREF(field);
-            if (str == NULL) {
-                Py_DECREF(iter);
-                return NULL;
-            }
-            append_ok = join_append(self, str, quoted);
-            Py_DECREF(str);
+    /* Slow path: collect the offending keys for the error message */
+    keys = PyMapping_Keys(rowdict);
+    if (keys == NULL)
+        return -1;
+    iter = PyObject_GetIter(keys);
+    Py_DECREF(keys);
+    if (iter == NULL)
+        return -1;
+    wrong = PyList_New(0);
+    if (wrong == NULL) {
+        Py_DECREF(iter);
+        return -1;
+    }
+    while ((key = PyIter_Next(iter))) {
+        rc = PySet_Contains(fieldset, key);
+        if (rc == 0) {
+            PyObject *repr = PyObject_Repr(key);
+            rc = repr == NULL ? -1 : PyList_Append(wrong, repr);
+            Py_XDECREF(repr);
         }
-        if (!append_ok) {
+        Py_DECREF(key);
+        if (rc < 0) {
             Py_DECREF(iter);
-            return NULL;
+            Py_DECREF(wrong);
+            return -1;
         }
     }
     Py_DECREF(iter);
-    if (PyErr_Occurred())
-        return NULL;
+    if (PyErr_Occurred() || PyList_GET_SIZE(wrong) == 0) {
+        Py_DECREF(wrong);
+        return PyErr_Occurred() ? -1 : 0;
+    }
+    sep = PyUnicode_FromString(", ");
+    if (sep == NULL) {
+        Py_DECREF(wrong);
+        return -1;
+    }
+    msg = PyUnicode_Join(sep, wrong);
+    Py_DECREF(sep);
+    Py_DECREF(wrong);
+    if (msg == NULL)
+        return -1;
+    PyErr_Format(PyExc_ValueError,
+                 "dict contains fields not in fieldnames: %U", msg);
+    Py_DECREF(msg);
+    return -1;
+}
 
-    if (self->num_fields > 0 && self->rec_len == 0) {
-        if (dialect->quoting == QUOTE_NONE) {
-            PyErr_Format(_csvstate_global->error_obj,
-                "single empty field record must be quoted");
-            return NULL;
+/* Build a record from the values of rowdict in fieldnames order */
+static int
+join_dict_record(WriterObj *self, PyObject *rowdict, PyObject *fieldnames,
+                 PyObject *restval, PyObject *fieldset)
+{
+    _Py_IDENTIFIER(get);
+    Py_ssize_t i;
+
+    if (fieldset != Py_None && check_dict_keys(rowdict, fieldset) < 0)
+        return -1;
+
+    join_start_record(self);
+    for (i = 0; i < PyTuple_GET_SIZE(fieldnames); i++) {
+        PyObject *key = PyTuple_GET_ITEM(fieldnames, i);
+        PyObject *field;
+        int rc;
+
+        if (PyDict_CheckExact(rowdict)) {
+            field = PyDict_GetItemWithError(rowdict, key);
+            if (field == NULL) {
+                if (PyErr_Occurred())
+                    return -1;
+                field = restval;
+            }
+            Py_INCREF(field);
         }
-        self->num_fields--;
-        if (!join_append(self, NULL, 1))
-            return NULL;
+        else {
+            field = _PyObject_CallMethodIdObjArgs(rowdict, &PyId_get,
+                                                  key, restval, NULL);
+            if (field == NULL)
+                return -1;
+        }
+        rc = join_field(self, field);
+        Py_DECREF(field);
+        if (rc < 0)
+            return -1;
     }
 
-    /* Add line terminator.
-     */
-    if (!join_append_lineterminator(self)) {
-        return NULL;
-    }
+    return join_end_record(self);
+}
+
+/* Write the complete records in the buffer and empty it */
+static PyObject *
+join_flush(WriterObj *self)
+{
+    PyObject *line, *result;
 
     line = PyUnicode_FromKindAndData(PyUnicode_4BYTE_KIND,
-                                     (void *) self->rec, self->rec_len);
-    if (line == NULL) {
+                                     (void *) self->rec, self->rec_start);
+    join_reset(self);
+    if (line == NULL)
         return NULL;
-    }
     result = PyObject_CallOneArg(self->write, line);
     Py_DECREF(line);
     return result;
 }
 
-PyDoc_STRVAR(csv_writerows_doc,
-"writerows(iterable of iterables)\n"
+PyDoc_STRVAR(csv_writerow_doc,
+"writerow(iterable)\n"
 "\n"
-"Construct and write a series of iterables to a csv file.  Non-string\n"
+"Construct and write a CSV record from an iterable of fields.  Non-string\n"
 "elements will be converted to string.");
 
 static PyObject *
-csv_writerows(WriterObj *self, PyObject *seqseq)
+csv_writerow(WriterObj *self, PyObject *seq)
+{
+    join_reset(self);
+    if (join_record(self, seq) < 0)
+        return NULL;
+    self->rec_start = self->rec_len;
+    return join_flush(self);
+}
+
+/* Write the rows of an iterable, batching the output so that the write
+ * method is called once per WRITE_BATCH_SIZE characters rather than once
+ * per row.  If fieldnames is not NULL, the rows are dicts which are
+ * projected onto fieldnames as DictWriter does.
+ */
+static PyObject *
+writer_write_rows(WriterObj *self, PyObject *seqseq, PyObject *fieldnames,
+                  PyObject *restval, PyObject *fieldset)
 {
     PyObject *row_iter, *row_obj, *result;
+    int rc;
 
     row_iter = PyObject_GetIter(seqseq);
     if (row_iter == NULL) {
@@ -1262,25 +1749,97 @@ csv_writerows(WriterObj *self, PyObject *seqseq)
                         "writerows() argument must be iterable");
         return NULL;
     }
+    join_reset(self);
     while ((row_obj = PyIter_Next(row_iter))) {
-        result = csv_writerow(self, row_obj);
+        if (fieldnames != NULL)
+            rc = join_dict_record(self, row_obj, fieldnames, restval,
+                                  fieldset);
+        else
+            rc = join_record(self, row_obj);
         Py_DECREF(row_obj);
-        if (!result) {
-            Py_DECREF(row_iter);
-            return NULL;
+        if (rc < 0)
+            goto error;
+        self->rec_start = self->rec_len;
+        if (self->rec_len >= WRITE_BATCH_SIZE) {
+            result = join_flush(self);
+            if (result == NULL) {
+                Py_DECREF(row_iter);
+                return NULL;
+            }
+            Py_DECREF(result);
         }
-        else
-             Py_DECREF(result);
     }
     Py_DECREF(row_iter);
+    row_iter = NULL;
     if (PyErr_Occurred())
-        return NULL;
+        goto error;
+    if (self->rec_start > 0) {
+        result = join_flush(self);
+        if (result == NULL)
+            return NULL;
+        Py_DECREF(result);
+    }
     Py_RETURN_NONE;
+
+error:
+    Py_XDECREF(row_iter);
+    /* Write the rows preceding the failing one, as if they had been
+       written one at a time. */
+    if (self->rec_start > 0) {
+        PyObject *exc, *val, *tb;
+
+        PyErr_Fetch(&exc, &val, &tb);
+        result = join_flush(self);
+        if (result == NULL)
+            _PyErr_ChainExceptions(exc, val, tb);
+        else {
+            Py_DECREF(result);
+            PyErr_Restore(exc, val, tb);
+        }
+    }
+    join_reset(self);
+    return NULL;
+}
+
+PyDoc_STRVAR(csv_writerows_doc,
+"writerows(iterable of iterables)\n"
+"\n"
+"Construct and write a series of iterables to a csv file.  Non-string\n"
+"elements will be converted to string.");
+
+static PyObject *
+csv_writerows(WriterObj *self, PyObject *seqseq)
+{
+    return writer_write_rows(self, seqseq, NULL, NULL, NULL);
+}
+
+PyDoc_STRVAR(csv_writedicts_doc,
+"_writedicts(rowdicts, fieldnames, restval, fieldset)\n"
+"\n"
+"Write a series of dicts, each projected onto the fieldnames tuple.\n"
+"Missing keys are written as restval.  Unless fieldset is None, dicts\n"
+"with keys not in fieldset raise ValueError.  Used by csv.DictWriter.");
+
+static PyObject *
+csv_writedicts(WriterObj *self, PyObject *args)
+{
+    PyObject *rowdicts, *fieldnames, *restval, *fieldset;
+
+    if (!PyArg_ParseTuple(args, "OO!OO:_writedicts", &rowdicts,
+                          &PyTuple_Type, &fieldnames, &restval, &fieldset))
+        return NULL;
+    if (fieldset != Py_None && !PyAnySet_Check(fieldset)) {
+        PyErr_SetString(PyExc_TypeError, "fieldset must be a set or None");
+        return NULL;
+    }
+    return writer_write_rows(self, rowdicts, fieldnames, restval, fieldset);
 }
 
 static struct PyMethodDef Writer_methods[] = {
     { "writerow", (PyCFunction)csv_writerow, METH_O, csv_writerow_doc},
     { "writerows", (PyCFunction)csv_writerows, METH_O, csv_writerows_doc},
+    { "_writedicts", (PyCFunction)csv_writedicts, METH_VARARGS,
+        csv_writedicts_doc},
     { NULL, NULL }
 };
 
@@ -1376,6 +1935,7 @@ csv_writer(PyObject *module, PyObject *args, PyObject *keyword_args)
     self->rec = NULL;
     self->rec_size = 0;
     self->rec_len = 0;
+    self->rec_start = 0;
     self->num_fields = 0;
 
     if (!PyArg_UnpackTuple(args, "", 1, 2, &output_file, &dialect)) {
@@ -0,0 +1,257 @@
+"""Benchmarks for the asyncio event loop and transports.
+
+Each benchmark runs clients and a server over loopback connections on a
+fresh event loop and reports the throughput seen by the clients, so that
+transport and event loop changes can be compared between interpreters.
+With --tls the connections use TLS, which compared to a run without it
+shows the cost of the SSL transport.  Run with -h for the options; results
+are given in MiB/s of payload (higher is better).
+
+"""
+import argparse
+import asyncio
+import os
+import ssl
+import sys
+import time
+
+
+# SSL contexts of the servers and clients, set by --tls.
+_SERVER_SSL = None
+_CLIENT_SSL = None
+
+_CERTFILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         os.pardir, os.pardir, 'Lib', 'test', 'keycert.pem')
+
+
+class _Sink(asyncio.BufferedProtocol):
+    """Server protocol discarding everything it receives."""
+
+    def __init__(self, total, done):
+        self.buffer = bytearray(256 * 1024)
+        self.remaining = total
+        self.done = done
+
+    def get_buffer(self, sizehint):
+        return self.buffer
+
+    def buffer_updated(self, nbytes):
+        self.remaining -= nbytes
+        if self.remaining <= 0 and not self.done.done():
+            self.done.set_result(None)
+
+    def connection_lost(self, exc):
+        if not self.done.done():
+            self.done.set_result(None)
+
+
+async def _send(size, count, send):
+    loop = asyncio.get_running_loop()
+    done = loop.create_future()
+    server = await loop.create_server(
+        lambda: _Sink(size * count, done), '127.0.0.1', 0, ssl=_SERVER_SSL)
+    async with server:
+        addr = server.sockets[0].getsockname()
+        reader, writer = await asyncio.open_connection(*addr, ssl=_CLIENT_SSL)
+        chunk = b'x' * size
+        t0 = time.perf_counter()
+        await send(writer, chunk, count)
+        await done
+        elapsed = time.perf_counter() - t0
+        writer.close()
+        await writer.wait_closed()
+    return size * count / elapsed / 2**20
+
+
+# Writes are issued in batches between calls to drain(), which is where
+# a protocol would normally yield to the event loop.
+_BATCH = 64
+
+
+async def _write(writer, chunk, count):
+    for i in range(count):
+        writer.write(chunk)
+        if i % _BATCH == _BATCH - 1:
+            await writer.drain()
+    await writer.drain()
+
+
+async def _writelines(writer, chunk, count):
+    batch = [chunk] * _BATCH
+    for _ in range(count // _BATCH):
+        writer.writelines(batch)
+        await writer.drain()
+    writer.writelines([chunk] * (count % _BATCH))
+    await writer.drain()
+
+
+async def _join(writer, chunk, count):
+    batch = [chunk] * _BATCH
+    for _ in range(count // _BATCH):
+        writer.write(b''.join(batch))
+        await writer.drain()
+    writer.write(b''.join([chunk] * (count % _BATCH)))
+    await writer.drain()
+
+
+def write():
+    """StreamWriter.write() per chunk"""
+    return lambda size, count: _send(size, count, _write)
+
+
+def writelines():
+    """StreamWriter.writelines() per batch"""
+    return lambda size, count: _send(size, count, _writelines)
+
+
+def join_write():
+    """StreamWriter.write() of a joined batch"""
+    return lambda size, count: _send(size, count, _join)
+
+
+# Concurrent connections of the request/response benchmarks, and the most
+# requests they make per timing: a round trip costs far more than a write.
+_CLIENTS = 16
+_MAX_REQUESTS = 20000
+
+
+async def _serve(handler, client, size, count):
+    # Run _CLIENTS clients sharing count requests of size bytes.
+    count = min(count, _MAX_REQUESTS)
+    server = await asyncio.start_server(handler, '127.0.0.1', 0,
+                                        ssl=_SERVER_SSL)
+    async with server:
+        addr = server.sockets[0].getsockname()
+        conns = [await asyncio.open_connection(*addr, ssl=_CLIENT_SSL)
+                 for _ in range(_CLIENTS)]
+        per_client = max(1, count // _CLIENTS)
+        t0 = time.perf_counter()
+        await asyncio.gather(*[client(reader, writer, size, per_client)
+                               for reader, writer in conns])
+        elapsed = time.perf_counter() - t0
+        for reader, writer in conns:
+            writer.close()
+            await writer.wait_closed()
+    return size * per_client * _CLIENTS / elapsed / 2**20
+
+
+async def _echo_handler(reader, writer):
+    while data := await reader.read(2**16):
+        writer.write(data)
+        await writer.drain()
+    writer.close()
+
+
+async def _echo_client(reader, writer, size, count):
+    chunk = b'x' * size
+    for _ in range(count):
+        writer.write(chunk)
+        await reader.readexactly(size)
+
+
+async def _http_handler(reader, writer):
+    bodies = {}
+    while True:
+        try:
+            request = await reader.readuntil(b'\r\n\r\n')
+        except asyncio.IncompleteReadError:
+            break
+        size = int(request.split(b' ', 2)[1][1:])
+        if size not in bodies:
+            bodies[size] = b'x' * size
+        writer.write(b'HTTP/1.1 200 OK\r\n'
+                     b'Content-Type: application/octet-stream\r\n'
+                     b'Content-Length: %d\r\n\r\n' % size)
+        writer.write(bodies[size])
+        await writer.drain()
+    writer.close()
+
+
+async def _http_client(reader, writer, size, count):
+    request = b'GET /%d HTTP/1.1\r\nHost: localhost\r\n\r\n' % size
+    for _ in range(count):
+        writer.write(request)
+        headers = await reader.readuntil(b'\r\n\r\n')
+        length = headers.split(b'Content-Length: ', 1)[1].split(b'\r\n', 1)[0]
+        await reader.readexactly(int(length))
+
+
+def echo():
+    """Echo round trips, 16 connections"""
+    return lambda size, count: _serve(_echo_handler, _echo_client,
+                                      size, count)
+
+
+def http():
+    """HTTP/1.1 keep-alive GETs, 16 connections"""
+    return lambda size, count: _serve(_http_handler, _http_client,
+                                      size, count)
+
+
+BENCHMARKS = [
+    write,
+    writelines,
+    join_write,
+    echo,
+    http,
+]
+
+
+def run(bench, size, count, repeat):
+    measure = bench()
+    return max(asyncio.run(measure(size, count)) for _ in range(repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('-s', '--size', type=int, action='append',
+                        help='chunk size in bytes; can be given several '
+                             'times (default: 64, 1024, 65536)')
+    parser.add_argument('-t', '--total', type=int, default=64,
+                        help='MiB sent per timing (default: %(default)s)')
+    parser.add_argument('-r', '--repeat', type=int, default=3,
+                        help='timings per benchmark, the best of which is '
+                             'reported (default: %(default)s)')
+    parser.add_argument('--tls', action='store_true',
+                        help='use TLS connections')
+    parser.add_argument('--cert', default=_CERTFILE,
+                        help='certificate and key file of the server with '
+                             '--tls (default: Lib/test/keycert.pem)')
+    parser.add_argument('benchmarks', nargs='*', metavar='benchmark',
+                        help='names of the benchmarks to run (default: all)')
+    args = parser.parse_args()
+
+    names = {bench.__name__: bench for bench in BENCHMARKS}
+    unknown = set(args.benchmarks) - names.keys()
+    if unknown:
+        parser.error('unknown benchmarks: %s (choose from %s)'
+                     % (', '.join(sorted(unknown)), ', '.join(names)))
+    selected = [names[name] for name in args.benchmarks] or BENCHMARKS
+    sizes = args.size or [64, 1024, 65536]
+
+    global _SERVER_SSL, _CLIENT_SSL
+    if args.tls:
+        _SERVER_SSL = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        _SERVER_SSL.load_cert_chain(args.cert)
+        _CLIENT_SSL = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        _CLIENT_SSL.check_hostname = False
+        _CLIENT_SSL.verify_mode = ssl.CERT_NONE
+
+    loop = asyncio.new_event_loop()
+    print(sys.version.split('\n')[0])
+    print('Event loop:', type(loop).__name__)
+    if args.tls:
+        print('TLS:', ssl.OPENSSL_VERSION)
+    loop.close()
+    width = max(len(bench.__doc__) for bench in selected)
+    for size in sizes:
+        count = max(1, args.total * 2**20 // size)
+        print('%d byte chunks:' % size)
+        for bench in selected:
+            mibs = run(bench, size, count, args.repeat)
+            print('  {:<{}}  {:8.1f} MiB/s'.format(bench.__doc__, width, mibs))
+            sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
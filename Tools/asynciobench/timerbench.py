@@ -0,0 +1,160 @@
+"""Benchmarks for the timer schedulers of the asyncio event loop.
+
+Each benchmark keeps a large number of timers scheduled, as a server with
+many connections each having a read timeout does, and is run with the
+default heap of timers and with an asyncio.TimerWheel.  Run with -h for the
+options; results are given in microseconds per operation (lower is better).
+
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+
+
+# Operations between two iterations of the event loop.
+_BATCH = 1000
+
+
+def _noop():
+    pass
+
+
+async def _reset(timers, count):
+    # Every operation pushes back the timeout of one connection.
+    loop = asyncio.get_running_loop()
+    handles = [loop.call_later(30 + random.random(), _noop)
+               for _ in range(timers)]
+    t0 = time.perf_counter()
+    for i in range(count):
+        j = i % timers
+        handles[j].cancel()
+        handles[j] = loop.call_later(30 + random.random(), _noop)
+        if i % _BATCH == _BATCH - 1:
+            await asyncio.sleep(0)
+    elapsed = time.perf_counter() - t0
+    for handle in handles:
+        handle.cancel()
+    return elapsed / count
+
+
+async def _wait_for(timers, count):
+    # Requests answered before their timeout, timers connections waiting.
+    loop = asyncio.get_running_loop()
+    waiters = [loop.create_future() for _ in range(timers)]
+    tasks = [asyncio.ensure_future(asyncio.wait_for(waiter, 30))
+             for waiter in waiters]
+    await asyncio.sleep(0)
+    t0 = time.perf_counter()
+    for i in range(count):
+        j = i % timers
+        waiters[j].set_result(None)
+        await tasks[j]
+        waiters[j] = loop.create_future()
+        tasks[j] = asyncio.ensure_future(asyncio.wait_for(waiters[j], 30))
+    elapsed = time.perf_counter() - t0
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return elapsed / count
+
+
+async def _expire(timers, count):
+    # Timers actually firing, spread over a tenth of a second.
+    loop = asyncio.get_running_loop()
+    done = loop.create_future()
+    remaining = count
+
+    def fire():
+        nonlocal remaining
+        remaining -= 1
+        if not remaining:
+            done.set_result(None)
+
+    t0 = time.perf_counter()
+    for _ in range(count):
+        loop.call_later(random.random() * 0.1, fire)
+    await done
+    return (time.perf_counter() - t0) / count
+
+
+def reset():
+    """Reset a timeout (cancel + call_later)"""
+    return _reset
+
+
+def wait_for():
+    """wait_for() completing before its timeout"""
+    return _wait_for
+
+
+def expire():
+    """call_later() of a timer firing within 0.1s"""
+    return _expire
+
+
+BENCHMARKS = [
+    reset,
+    wait_for,
+    expire,
+]
+
+SCHEDULERS = {
+    'heap': lambda: None,
+    'wheel': lambda: asyncio.TimerWheel(0.001),
+}
+
+
+async def _main(bench, scheduler, timers, count):
+    asyncio.get_running_loop().set_timer_wheel(SCHEDULERS[scheduler]())
+    return await bench()(timers, count)
+
+
+def run(bench, scheduler, timers, count, repeat):
+    return min(asyncio.run(_main(bench, scheduler, timers, count))
+               for _ in range(repeat)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('-t', '--timers', type=int, action='append',
+                        help='number of timers kept scheduled; can be given '
+                             'several times (default: 1000, 100000)')
+    parser.add_argument('-n', '--number', type=int, default=200000,
+                        help='operations per timing (default: %(default)s)')
+    parser.add_argument('-r', '--repeat', type=int, default=3,
+                        help='timings per benchmark, the best of which is '
+                             'reported (default: %(default)s)')
+    parser.add_argument('-s', '--scheduler', choices=SCHEDULERS,
+                        action='append',
+                        help='timer scheduler; can be given several times '
+                             '(default: all)')
+    parser.add_argument('benchmarks', nargs='*', metavar='benchmark',
+                        help='names of the benchmarks to run (default: all)')
+    args = parser.parse_args()
+
+    names = {bench.__name__: bench for bench in BENCHMARKS}
+    unknown = set(args.benchmarks) - names.keys()
+    if unknown:
+        parser.error('unknown benchmarks: %s (choose from %s)'
+                     % (', '.join(sorted(unknown)), ', '.join(names)))
+    selected = [names[name] for name in args.benchmarks] or BENCHMARKS
+    schedulers = args.scheduler or list(SCHEDULERS)
+
+    print(sys.version.split('\n')[0])
+    width = max(len(bench.__doc__) for bench in selected)
+    for timers in args.timers or [1000, 100000]:
+        print('%d timers:' % timers)
+        print('  {:<{}}'.format('', width)
+              + ''.join('  {:>13}'.format(name) for name in schedulers))
+        for bench in selected:
+            results = [run(bench, scheduler, timers, args.number, args.repeat)
+                       for scheduler in schedulers]
+            print('  {:<{}}'.format(bench.__doc__, width)
+                  + ''.join('  {:8.2f} usec'.format(usec) for usec in results))
+            sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
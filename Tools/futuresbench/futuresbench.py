@@ -0,0 +1,123 @@
+"""Benchmarks for the thread pool executors of concurrent.futures.
+
+Each benchmark runs on a ThreadPoolExecutor and on a
+WorkStealingThreadPoolExecutor.  The recursive benchmarks are
+divide-and-conquer algorithms whose calls submit their halves and wait for
+them: a ThreadPoolExecutor deadlocks once all its threads wait, so it is
+given one thread per call which can wait at the same time, a
+WorkStealingThreadPoolExecutor only --workers threads.  Run with -h for
+the options; results are given in milliseconds (lower is better).
+
+"""
+import argparse
+import sys
+import time
+from concurrent import futures
+
+
+def _sum(executor, start, stop, depth):
+    # Sum of range(start, stop), splitting it in halves depth times.
+    if not depth:
+        return sum(range(start, stop))
+    middle = (start + stop) // 2
+    left = executor.submit(_sum, executor, start, middle, depth - 1)
+    right = executor.submit(_sum, executor, middle, stop, depth - 1)
+    return left.result() + right.result()
+
+
+def _fib(executor, n, cutoff):
+    if n < cutoff:
+        a, b = 0, 1
+        for _ in range(n):
+            a, b = b, a + b
+        return a
+    f1 = executor.submit(_fib, executor, n - 1, cutoff)
+    f2 = executor.submit(_fib, executor, n - 2, cutoff)
+    return f1.result() + f2.result()
+
+
+def recursive_sum(executor_type, workers):
+    """sum() of 2**20 ints split in 256 calls"""
+    depth = 8
+    if executor_type is futures.ThreadPoolExecutor:
+        workers = 2 ** depth
+    n = 2 ** 20
+    with executor_type(workers) as executor:
+        t0 = time.perf_counter()
+        result = executor.submit(_sum, executor, 0, n, depth).result()
+        elapsed = time.perf_counter() - t0
+    assert result == n * (n - 1) // 2
+    return elapsed
+
+
+def recursive_fib(executor_type, workers):
+    """fib(22), one call per number above 10"""
+    if executor_type is futures.ThreadPoolExecutor:
+        # The longest chain of waiting calls is 12 deep, but all the
+        # calls of a level can wait at the same time.
+        workers = 1000
+    with executor_type(workers) as executor:
+        t0 = time.perf_counter()
+        result = executor.submit(_fib, executor, 22, 10).result()
+        elapsed = time.perf_counter() - t0
+    assert result == 17711
+    return elapsed
+
+
+def flat(executor_type, workers):
+    """10000 calls submitted from the main thread"""
+    with executor_type(workers) as executor:
+        t0 = time.perf_counter()
+        fs = [executor.submit(abs, i) for i in range(10000)]
+        for f in fs:
+            f.result()
+        elapsed = time.perf_counter() - t0
+    return elapsed
+
+
+BENCHMARKS = [
+    recursive_sum,
+    recursive_fib,
+    flat,
+]
+
+EXECUTORS = [
+    futures.ThreadPoolExecutor,
+    futures.WorkStealingThreadPoolExecutor,
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('-w', '--workers', type=int, default=4,
+                        help='threads of the work-stealing executor '
+                             '(default: %(default)s)')
+    parser.add_argument('-r', '--repeat', type=int, default=5,
+                        help='timings per benchmark, the best of which is '
+                             'reported (default: %(default)s)')
+    parser.add_argument('benchmarks', nargs='*', metavar='benchmark',
+                        help='names of the benchmarks to run (default: all)')
+    args = parser.parse_args()
+
+    names = {bench.__name__: bench for bench in BENCHMARKS}
+    unknown = set(args.benchmarks) - names.keys()
+    if unknown:
+        parser.error('unknown benchmarks: %s (choose from %s)'
+                     % (', '.join(sorted(unknown)), ', '.join(names)))
+    selected = [names[name] for name in args.benchmarks] or BENCHMARKS
+
+    print(sys.version.split('\n')[0])
+    width = max(len(bench.__doc__) for bench in selected)
+    exe_width = max(len(exe.__name__) for exe in EXECUTORS)
+    for bench in selected:
+        for executor_type in EXECUTORS:
+            best = min(bench(executor_type, args.workers)
+                       for _ in range(args.repeat))
+            print('{:<{}}  {:<{}}  {:8.2f} ms'.format(
+                bench.__doc__, width, executor_type.__name__, exe_width,
+                best * 1e3))
+            sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
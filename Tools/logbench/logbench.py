@@ -0,0 +1,177 @@
+"""Micro-benchmarks for the logging package.
+
+Each benchmark measures one stage of a logging call, so that the cost of
+creating records, finding the caller, formatting and handling can be
+compared between interpreters and between changes to the package.  Run with
+-h for the options; results are given in microseconds per operation (lower
+is better).
+
+"""
+import argparse
+import io
+import logging
+import logging.handlers
+import sys
+import timeit
+
+
+def make_logger(name, handler, level=logging.DEBUG):
+    logger = logging.getLogger('logbench.' + name)
+    logger.propagate = False
+    logger.handlers[:] = [handler]
+    logger.setLevel(level)
+    return logger
+
+
+def make_record(factory=logging.LogRecord):
+    return factory('logbench', logging.INFO, __file__, 42,
+                   'message %d', (42,), None, 'make_record')
+
+
+def disabled_call():
+    """Call filtered out by level"""
+    logger = make_logger('disabled', logging.NullHandler(), logging.WARNING)
+    return lambda: logger.debug('message %d', 42)
+
+
+def log_record():
+    """LogRecord creation"""
+    return make_record
+
+
+def lazy_log_record():
+    """LazyLogRecord creation"""
+    return lambda: make_record(logging.LazyLogRecord)
+
+
+def find_caller():
+    """Logger.findCaller()"""
+    logger = make_logger('caller', logging.NullHandler())
+    return logger.findCaller
+
+
+def _formatter(fmt, style):
+    formatter = logging.Formatter(fmt, style=style)
+    record = make_record()
+    return lambda: formatter.format(record)
+
+
+def format_percent():
+    """Formatter.format(), % style"""
+    return _formatter('%(asctime)s %(levelname)-8s %(name)s: %(message)s',
+                      '%')
+
+
+def format_str():
+    """Formatter.format(), {} style"""
+    return _formatter('{asctime} {levelname:<8} {name}: {message}', '{')
+
+
+def format_template():
+    """Formatter.format(), $ style"""
+    return _formatter('${asctime} ${levelname} ${name}: ${message}', '$')
+
+
+def format_time():
+    """Formatter.formatTime()"""
+    formatter = logging.Formatter()
+    record = make_record()
+    return lambda: formatter.formatTime(record)
+
+
+def _stream_call(factory):
+    handler = logging.StreamHandler(io.StringIO())
+    handler.setFormatter(logging.Formatter(
+        '%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    logger = make_logger('stream', handler)
+
+    def call():
+        logger.info('message %d', 42)
+        # Keep memory use flat.
+        handler.stream.seek(0)
+        handler.stream.truncate()
+
+    def setup():
+        old_factory = logging.getLogRecordFactory()
+        logging.setLogRecordFactory(factory)
+        return old_factory
+    return call, setup
+
+
+def stream_call():
+    """Logger.info() to a StreamHandler"""
+    return _stream_call(logging.LogRecord)
+
+
+def stream_call_lazy():
+    """Logger.info() to a StreamHandler, LazyLogRecord"""
+    return _stream_call(logging.LazyLogRecord)
+
+
+def async_call():
+    """Logger.info() to an AsyncHandler"""
+    handler = logging.handlers.AsyncHandler([logging.NullHandler()],
+                                            overflow='drop')
+    logger = make_logger('async', handler)
+    return lambda: logger.info('message %d', 42)
+
+
+BENCHMARKS = [
+    disabled_call,
+    log_record,
+    lazy_log_record,
+    find_caller,
+    format_percent,
+    format_str,
+    format_template,
+    format_time,
+    stream_call,
+    stream_call_lazy,
+    async_call,
+]
+
+
+def run(bench, number, repeat):
+    func = bench()
+    restore = None
+    if isinstance(func, tuple):
+        func, setup = func
+        old_factory = setup()
+        restore = lambda: logging.setLogRecordFactory(old_factory)
+    try:
+        timer = timeit.Timer(func)
+        return min(timer.repeat(repeat, number)) / number * 1e6
+    finally:
+        if restore is not None:
+            restore()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('-n', '--number', type=int, default=20000,
+                        help='calls per timing (default: %(default)s)')
+    parser.add_argument('-r', '--repeat', type=int, default=5,
+                        help='timings per benchmark, the best of which is '
+                             'reported (default: %(default)s)')
+    parser.add_argument('benchmarks', nargs='*', metavar='benchmark',
+                        help='names of the benchmarks to run (default: all)')
+    args = parser.parse_args()
+
+    names = {bench.__name__: bench for bench in BENCHMARKS}
+    unknown = set(args.benchmarks) - names.keys()
+    if unknown:
+        parser.error('unknown benchmarks: %s (choose from %s)'
+                     % (', '.join(sorted(unknown)), ', '.join(names)))
+    selected = [names[name] for name in args.benchmarks] or BENCHMARKS
+
+    print(sys.version.split('\n')[0])
+    width = max(len(bench.__doc__) for bench in selected)
+    for bench in selected:
+        usec = run(bench, args.number, args.repeat)
+        print('{:<{}}  {:8.2f} usec'.format(bench.__doc__, width, usec))
+        sys.stdout.flush()
+    logging.shutdown()
+
+
+if __name__ == '__main__':
+    main()